@@ -0,0 +1,85 @@
+# Description: Reader for compiled animation files made by tools/anim_compiler.py
+#
+# Layout (little-endian):
+#   header     b"PANI", version u8, glyph count u8, animation count u8
+#   glyphs     per glyph: name length u8, name
+#   index      per animation: name length u8, name, frame offset u32, frame count u16
+#   frames     per frame: left glyph u8, right glyph u8, delay ms u16, brightness u8
+# A glyph or brightness of NONE means the frame leaves it unchanged.
+
+import struct
+
+MAGIC = b"PANI"
+VERSION = 1
+NONE = 0xFF
+FRAME_FORMAT = "<BBHB"
+FRAME_SIZE = struct.calcsize(FRAME_FORMAT)
+INDEX_FORMAT = "<IH"
+INDEX_SIZE = struct.calcsize(INDEX_FORMAT)
+
+
+class AnimFile:
+    """Compiled animations, read one animation at a time from the file"""
+
+    def __init__(self, file_name):
+        self.file = open(file_name, "rb")
+        try:
+            header = self.file.read(len(MAGIC) + 3)
+            if header[: len(MAGIC)] != MAGIC or header[len(MAGIC)] != VERSION:
+                raise ValueError("Not a compiled animation file: " + file_name)
+        except Exception:
+            self.file.close()
+            raise
+        glyph_count = header[len(MAGIC) + 1]
+        anim_count = header[len(MAGIC) + 2]
+        self.glyph_names = [self._read_name() for _ in range(glyph_count)]
+        self.index = {}
+        for _ in range(anim_count):
+            name = self._read_name()
+            self.index[name] = struct.unpack(
+                INDEX_FORMAT, self.file.read(INDEX_SIZE)
+            )
+        self._frame = bytearray(FRAME_SIZE)
+        self._glyphs = {}
+
+    def _read_name(self):
+        length = self.file.read(1)[0]
+        return self.file.read(length).decode()
+
+    def _glyphs_for(self, font):
+        """Glyph table resolved against font, built once per font"""
+        glyphs = self._glyphs.get(id(font))
+        if glyphs is None:
+            glyphs = [font[name] for name in self.glyph_names]
+            self._glyphs[id(font)] = glyphs
+        return glyphs
+
+    def __contains__(self, anim_name):
+        return anim_name in self.index
+
+    def names(self):
+        return list(self.index)
+
+    def frames(self, anim_name, font):
+        """Stream an animation's frames as (left, right, brightness,
+        delay_ms), with None for whatever a frame leaves unchanged"""
+        offset, count = self.index[anim_name]
+        glyphs = self._glyphs_for(font)
+        frame = self._frame
+        for _ in range(count):
+            # Seek every frame so interleaved animations don't disturb each other
+            self.file.seek(offset)
+            self.file.readinto(frame)
+            offset += FRAME_SIZE
+            left, right, delay_ms, brightness = struct.unpack(
+                FRAME_FORMAT, frame
+            )
+            yield (
+                None if left == NONE else glyphs[left],
+                None if right == NONE else glyphs[right],
+                None if brightness == NONE else brightness,
+                delay_ms,
+            )
+
+    def close(self):
+        self.file.close()
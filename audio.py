@@ -0,0 +1,128 @@
+# Description: Microphone sampled from a timer into a ring buffer, with a peak/RMS envelope for reacting to sound
+#
+# The timer only stores readings. envelope() works through whatever has
+# arrived since it was last called, in integer maths: a slow running
+# average takes out the microphone's DC offset, the peak envelope jumps up
+# on loud samples and decays over PEAK_DECAY_SHIFT, and a running mean
+# square gives the RMS. Levels are in 12 bit ADC units, 0 to 2047 either
+# side of the offset.
+
+import machine
+from array import array
+from time import ticks_add, ticks_diff, ticks_ms
+
+SAMPLE_HZ = 2000  # Plenty for loudness, which is all that's needed
+RING_SAMPLES = 256  # Newest samples kept, 128 ms at SAMPLE_HZ
+DC_SHIFT = 8  # Offset average over 2**8 samples
+PEAK_DECAY_SHIFT = 7  # Peak loses 1/2**7 of itself per sample, to a third in ~64 ms
+MS_SHIFT = 5  # Mean square over about 2**5 samples
+
+LOUD = 400  # Peak level that counts as a noise to react to
+# Peak levels for straightX2, straightX3 and straightX4
+LEVELS = (LOUD, 900, 1600)
+GLYPHS = ("straight", "straightX2", "straightX3", "straightX4")
+
+
+def isqrt(n):
+    """Integer square root, rounding down"""
+    if n <= 0:
+        return 0
+    x = n
+    y = (x + 1) >> 1
+    while y < x:
+        x = y
+        y = (x + n // x) >> 1
+    return x
+
+
+def glyph_for(level):
+    """Eye glyph name for a peak level, wider for louder"""
+    size = 0
+    while size < len(LEVELS) and level >= LEVELS[size]:
+        size += 1
+    return GLYPHS[size]
+
+
+def brightness_for(level, max_brightness):
+    """Brightness for a peak level, from 0 when quiet up to max_brightness"""
+    brightness = level * (max_brightness + 1) // LEVELS[-1]
+    return max_brightness if brightness > max_brightness else brightness
+
+
+class AudioSampler:
+    """Reads an ADC pin at SAMPLE_HZ from a timer into a ring buffer"""
+
+    def __init__(self, pin, timer_id=-1, rate_hz=SAMPLE_HZ, ring_samples=RING_SAMPLES):
+        self.adc = machine.ADC(machine.Pin(pin))
+        self.rate_hz = rate_hz
+        self.ring = array("H", [0] * ring_samples)
+        # Sample counts, wrapping at a multiple of the ring size so they
+        # stay small ints. head is only moved by the timer.
+        self.head = 0
+        self.tail = 0  # Samples worked into the envelope
+        self._wrap = ring_samples << 16
+        self.overruns = 0  # Times samples were overwritten before being read
+        self.peak = 0
+        self.rms = 0
+        self.onset_ms = None  # When the peak last went over LOUD, if not shown yet
+        self.latency_ms = 0  # From the last onset to the frame showing it
+        self.max_latency_ms = 0
+        self._dc = 2048 << 4  # Offset in 12.4 fixed point, starting mid scale
+        self._mean_square = 0
+        self.timer = machine.Timer(timer_id)
+        self.timer.init(mode=machine.Timer.PERIODIC, freq=rate_hz, callback=self._tick)
+
+    def _tick(self, timer):
+        # Runs from the timer: no allocation in here
+        self.ring[self.head % len(self.ring)] = self.adc.read_u16()
+        self.head = (self.head + 1) % self._wrap
+
+    def envelope(self):
+        """Work through new samples and return the peak level"""
+        head = self.head
+        ring = self.ring
+        size = len(ring)
+        pending = (head - self.tail) % self._wrap
+        if pending > size:
+            self.overruns += 1
+            pending = size
+        start = head - pending
+        now = ticks_ms()
+        dc = self._dc
+        peak = self.peak
+        mean_square = self._mean_square
+        was_loud = peak >= LOUD
+        for n in range(pending):
+            sample = ring[(start + n) % size] >> 4
+            dc += ((sample << 4) - dc) >> DC_SHIFT
+            level = sample - (dc >> 4)
+            if level < 0:
+                level = -level
+            if level > peak:
+                peak = level
+            else:
+                peak -= peak >> PEAK_DECAY_SHIFT
+            mean_square += (level * level - mean_square) >> MS_SHIFT
+            if not was_loud and peak >= LOUD:
+                was_loud = True
+                # When this sample was taken, counting back from the newest
+                self.onset_ms = ticks_add(now, -(pending - 1 - n) * 1000 // self.rate_hz)
+        self.tail = head
+        self._dc = dc
+        self.peak = peak
+        self._mean_square = mean_square
+        self.rms = isqrt(mean_square)
+        return peak
+
+    def shown(self):
+        """Call once a frame reacting to the sound is on its way to the
+        display, to measure the latency from the sound to it"""
+        if self.onset_ms is None:
+            return
+        self.latency_ms = ticks_diff(ticks_ms(), self.onset_ms)
+        if self.latency_ms > self.max_latency_ms:
+            self.max_latency_ms = self.latency_ms
+        self.onset_ms = None
+
+    def deinit(self):
+        self.timer.deinit()
@@ -0,0 +1,166 @@
+# Description: 8x8 glyphs packed into 64 bit integers, composited with whole-glyph shifts and masks
+#
+# Row 0 is the top byte and each row keeps its MSB leftmost, the same as
+# the glyph rows in matrix_fonts, so pixel (x, y) is bit 63 - (8 * y + x).
+# Moving, layering and clipping a glyph is then a few integer operations
+# instead of a Python loop over its rows.
+#
+# >>> eye = pack(matrix_fonts.eyes["noEyeball"])
+# >>> pupil = shift(pack(PUPIL), dx, dy)
+# >>> to_rows(layer(eye, 0, pupil), rows)  # Cut the pupil out of the white
+#
+# On MicroPython, integers this big live on the heap, so each operation
+# allocates a little. Fine for composing a frame, not for a timer callback.
+
+FULL = 0xFFFFFFFFFFFFFFFF
+EMPTY = 0
+
+# Pixels in the leftmost / rightmost n columns of every row, for n = 0 to 8
+_LEFT_COLS = [0] * 9
+_RIGHT_COLS = [0] * 9
+for _n in range(1, 9):
+    _LEFT_COLS[_n] = _LEFT_COLS[_n - 1] | (0x8080808080808080 >> (_n - 1))
+    _RIGHT_COLS[_n] = _RIGHT_COLS[_n - 1] | (0x0101010101010101 << (_n - 1))
+
+# Each byte with its bits in reverse order
+_REVERSED = bytes(
+    sum(((b >> bit) & 1) << (7 - bit) for bit in range(8)) for b in range(256)
+)
+
+
+def pack(glyph):
+    """Pack 8 glyph rows into one integer"""
+    board = 0
+    for row in range(8):
+        board = board << 8 | (glyph[row] & 0xFF)
+    return board
+
+
+def to_rows(board, rows=None):
+    """Unpack a board into 8 rows, reusing rows if given, e.g. for
+    max7219_matrix.blit"""
+    if rows is None:
+        rows = bytearray(8)
+    # One call rather than a loop, as this is the only per-row step left
+    rows[0:8] = board.to_bytes(8, "big")
+    return rows
+
+
+def pack_table(table):
+    """Every glyph of a font table, by name, as boards"""
+    return {name: pack(table[name]) for name in table}
+
+
+def shift_left(board, n=1):
+    """Move every pixel n columns left. Pixels pushed off the edge are lost."""
+    if n >= 8:
+        return EMPTY
+    return (board & ~_LEFT_COLS[n] & FULL) << n
+
+
+def shift_right(board, n=1):
+    if n >= 8:
+        return EMPTY
+    return (board & ~_RIGHT_COLS[n] & FULL) >> n
+
+
+def shift_up(board, n=1):
+    return (board << 8 * n) & FULL
+
+
+def shift_down(board, n=1):
+    return board >> 8 * n
+
+
+def shift(board, dx, dy):
+    """Move every pixel dx columns right and dy rows down, either of which
+    can be negative"""
+    if dx > 0:
+        board = shift_right(board, dx)
+    elif dx < 0:
+        board = shift_left(board, -dx)
+    if dy > 0:
+        board = shift_down(board, dy)
+    elif dy < 0:
+        board = shift_up(board, -dy)
+    return board
+
+
+def invert(board):
+    return board ^ FULL
+
+
+def rect(x, y, width, height):
+    """Mask of a rectangle of pixels, clipped to the glyph"""
+    if x < 0:
+        width += x
+        x = 0
+    if y < 0:
+        height += y
+        y = 0
+    width = min(width, 8 - x)
+    height = min(height, 8 - y)
+    if width <= 0 or height <= 0:
+        return EMPTY
+    row = ((0xFF00 >> width) & 0xFF) >> x
+    mask = 0
+    for _ in range(height):
+        mask = mask << 8 | row
+    return mask << 8 * (8 - y - height)
+
+
+def clip(board, mask):
+    """Keep only the pixels under mask, e.g. a rect()"""
+    return board & mask
+
+
+def layer(base, top, mask=None):
+    """top drawn over base. Where mask is set, the result is top's pixel,
+    lit or not; elsewhere it is base's. Without a mask, lit pixels of top
+    are drawn over base."""
+    if mask is None:
+        return base | top
+    return (base & ~mask & FULL) | (top & mask)
+
+
+def transpose(board):
+    """Swap rows and columns, mirroring the glyph about the top left to
+    bottom right diagonal, in three masked swaps"""
+    t = 0x0F0F0F0F00000000 & (board ^ (board << 28))
+    board ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (board ^ (board << 14))
+    board ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (board ^ (board << 7))
+    board ^= t ^ (t >> 7)
+    return board
+
+
+def mirror(board):
+    """Flip left to right"""
+    rows = board.to_bytes(8, "big")
+    board = 0
+    for row in rows:
+        board = board << 8 | _REVERSED[row]
+    return board
+
+
+def flip(board):
+    """Flip top to bottom"""
+    return int.from_bytes(board.to_bytes(8, "little"), "big")
+
+
+def rotate(board, quarters=1):
+    """Turn clockwise by quarters of a turn"""
+    quarters %= 4
+    if quarters == 1:
+        return mirror(transpose(board))
+    if quarters == 2:
+        return mirror(flip(board))
+    if quarters == 3:
+        return flip(transpose(board))
+    return board
+
+
+def scroll_pair(left, right, n):
+    """The view n columns into the pair of glyphs left then right"""
+    return shift_left(left, n) | shift_right(right, 8 - n)
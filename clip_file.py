@@ -0,0 +1,106 @@
+# Description: Streaming player for delta-encoded clips made by tools/clip_encoder.py
+#
+# Layout (little-endian):
+#   header   b"PCLP", version u8, modules u8, frame count u32
+#   frames   per frame: kind u8, delay ms u16, then by kind
+#              KEY     modules * 8 rows, every module's rows in blit order
+#              DELTA   a bit per row (modules bytes, bit 0 of the first byte
+#                      is row 0), then one byte per set bit to XOR that row with
+#              REPEAT  nothing, the frame before is held again
+# Keyframes come every so often so playback can start over cleanly.
+#
+# The file is read through a small buffer and only the current frame is kept,
+# so a clip of any length plays in the same few hundred bytes.
+
+import struct
+
+MAGIC = b"PCLP"
+VERSION = 1
+HEADER_FORMAT = "<4sBBI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_FORMAT = "<BH"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+KEY = 0
+DELTA = 1
+REPEAT = 2
+
+READ_AHEAD = 64  # Bytes read from the file at a time, at least one whole frame
+
+
+class ClipFile:
+    """A clip on the filesystem, played a frame at a time"""
+
+    def __init__(self, file_name):
+        self.file = open(file_name, "rb")
+        try:
+            magic, version, modules, count = struct.unpack(HEADER_FORMAT, self.file.read(HEADER_SIZE))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not a clip file: " + file_name)
+        except Exception:
+            # Not left open, e.g. for a file named over serial that isn't a clip
+            self.file.close()
+            raise
+        self.modules = modules
+        self.count = count
+        self.frame = bytearray(modules * 8)  # The current frame's rows
+        size = max(READ_AHEAD, RECORD_SIZE + modules * 8 + modules)
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._mask = bytearray(modules)
+        self._start = 0
+        self._end = 0
+
+    def _take(self, size):
+        """The next size bytes of the file, as a view into the buffer"""
+        if self._end - self._start < size:
+            # Move what's left to the front and top up behind it
+            left = self._end - self._start
+            buffer = self._buffer
+            for p in range(left):
+                buffer[p] = buffer[self._start + p]
+            read = self.file.readinto(self._view[left:])
+            self._start = 0
+            self._end = left + (read or 0)
+            if self._end < size:
+                raise ValueError("Clip file ends mid-frame")
+        start = self._start
+        self._start += size
+        return self._view[start : start + size]
+
+    def rows(self, module):
+        """The current frame's 8 rows for a module, a view into frame"""
+        return memoryview(self.frame)[module * 8 : module * 8 + 8]
+
+    def frames(self):
+        """Step through the clip, yielding each frame's delay in ms once
+        frame holds it"""
+        self.file.seek(HEADER_SIZE)
+        self._start = self._end = 0
+        frame = self.frame
+        rows = len(frame)
+        for _ in range(self.count):
+            kind, delay_ms = struct.unpack(RECORD_FORMAT, self._take(RECORD_SIZE))
+            if kind == KEY:
+                frame[:] = self._take(rows)
+            elif kind == DELTA:
+                # Copied out, as taking the changes may move the buffer
+                mask = self._mask
+                mask[:] = self._take(self.modules)
+                changed = 0
+                for byte in mask:
+                    while byte:
+                        changed += byte & 1
+                        byte >>= 1
+                changes = self._take(changed)
+                n = 0
+                for row in range(rows):
+                    if mask[row >> 3] & (1 << (row & 7)):
+                        frame[row] ^= changes[n]
+                        n += 1
+            elif kind != REPEAT:
+                raise ValueError("Unknown clip frame kind: %d" % kind)
+            yield delay_ms
+
+    def close(self):
+        self.file.close()
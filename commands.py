@@ -0,0 +1,160 @@
+# Description: Commands read from USB serial or a UART without blocking, queued by priority
+#
+# One command per line:
+#   say <text>      scroll text
+#   anim <name>     play an animation from eyes_ani.bin, or <name>.clip
+#   bright <0-15>   set the eyes' brightness
+# Start a line with ! to jump the queue, e.g. "!say Boo!".
+#
+# The reader only ever reads what select.poll says is waiting, so it never
+# holds up the frames. The playback loop takes commands off the queue at
+# frame boundaries, see Scheduler.
+
+import select
+from time import ticks_diff, ticks_ms
+
+import telemetry
+
+SAY = "say"
+ANIM = "anim"
+BRIGHT = "bright"
+REACT = "react"  # Posted by the sound sampler, not read from serial
+
+QUEUE_LEN = 8  # Commands waiting before new low priority ones are dropped
+MAX_LINE = 200  # Longest command line kept, the rest is cut off
+READ_POLL_MS = 20  # How often the reader checks for input
+
+# Higher goes first. Brightness is applied between frames without
+# stopping what's playing, so it never has to wait behind a message.
+PRIORITY_NORMAL = 0
+PRIORITY_URGENT = 1
+PRIORITY_BRIGHT = 2
+
+
+class CommandQueue:
+    """Commands waiting to be played, highest priority first and in the
+    order they arrived within a priority. Each one is a tuple of
+    (priority, kind, argument, ticks_ms when it arrived)."""
+
+    def __init__(self, max_len=QUEUE_LEN):
+        self.max_len = max_len
+        self.dropped = 0  # Commands turned away or pushed out when full
+        self.last_latency_ms = 0  # From arriving to starting, of the last one started
+        self.max_latency_ms = 0
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def post(self, kind, argument, priority=PRIORITY_NORMAL):
+        """Queue a command. When the queue is full, the newest command of
+        the lowest priority makes way, unless that's this one. Returns
+        False if this command was dropped."""
+        items = self._items
+        if len(items) >= self.max_len:
+            if items[-1][0] >= priority:
+                self.dropped += 1
+                return False
+            items.pop()
+            self.dropped += 1
+        position = len(items)
+        while position and items[position - 1][0] < priority:
+            position -= 1
+        items.insert(position, (priority, kind, argument, ticks_ms()))
+        return True
+
+    def pop(self):
+        """The next command, or None"""
+        return self._items.pop(0) if self._items else None
+
+    def waiting(self, kind):
+        """Whether a command of this kind is queued"""
+        for item in self._items:
+            if item[1] == kind:
+                return True
+        return False
+
+    def pop_instant(self):
+        """The next command if it's one to apply between frames without
+        stopping playback, otherwise None"""
+        if self._items and self._items[0][1] == BRIGHT:
+            return self._items.pop(0)
+        return None
+
+    def started(self, command):
+        """Record how long command waited, when it starts to play"""
+        latency = ticks_diff(ticks_ms(), command[3])
+        self.last_latency_ms = latency
+        if latency > self.max_latency_ms:
+            self.max_latency_ms = latency
+        if telemetry.enabled:
+            telemetry.command_latency.add(latency)
+
+    def clear(self):
+        self._items = []
+
+
+def parse(line):
+    """(kind, argument, priority) for a command line, or None if it isn't one"""
+    line = line.strip()
+    priority = PRIORITY_NORMAL
+    if line.startswith("!"):
+        priority = PRIORITY_URGENT
+        line = line[1:].lstrip()
+    parts = line.split(" ", 1)
+    kind = parts[0].lower()
+    argument = parts[1].strip() if len(parts) > 1 else ""
+    if kind == SAY and argument:
+        # Padded so it scrolls in from and out to a blank screen
+        return SAY, " " + argument + " ", priority
+    if kind == ANIM and argument:
+        return ANIM, argument, priority
+    if kind == BRIGHT:
+        try:
+            brightness = int(argument)
+        except ValueError:
+            return None
+        if 0 <= brightness <= 15:
+            return BRIGHT, brightness, PRIORITY_BRIGHT
+    return None
+
+
+class CommandReader:
+    """Reads command lines from a binary stream, e.g. sys.stdin.buffer or a
+    machine.UART, into a CommandQueue"""
+
+    def __init__(self, stream, queue):
+        self.stream = stream
+        self.queue = queue
+        self.rejected = 0  # Lines that weren't commands
+        self.closed = False
+        self._line = bytearray()
+        self._poller = select.poll()
+        self._poller.register(stream, select.POLLIN)
+
+    def poll(self):
+        """Read whatever is waiting, without blocking, and queue any
+        complete commands"""
+        while not self.closed and self._poller.poll(0):
+            char = self.stream.read(1)
+            if not char:
+                # The other end has gone away
+                self.closed = True
+                self._poller.unregister(self.stream)
+                break
+            if char == b"\n" or char == b"\r":
+                if self._line:
+                    self._finish_line()
+            elif len(self._line) < MAX_LINE:
+                self._line.extend(char)
+
+    def _finish_line(self):
+        try:
+            command = parse(self._line.decode())
+        except UnicodeError:
+            command = None
+        self._line = bytearray()
+        if command is None:
+            self.rejected += 1
+            return
+        self.queue.post(command[0], command[1], command[2])
@@ -0,0 +1,99 @@
+# Description: Eyes drawn from gaze, pupil size and lid parameters, with a small cache of recent ones
+#
+# An eye state is (x, y, size, lid):
+#   x, y  pupil offset from the centre in pixels, right and down, -4 to 4
+#   size  pupil size, 1 (the 2x2 "straight" pupil) to 4 (almost all pupil)
+#   lid   how far the lids have closed, 0 (open) to 4 (shut)
+# Anything else is rounded and clamped to those, so a gaze tracker can
+# pass fractional positions.
+
+from collections import OrderedDict
+
+import bitboard
+
+EYE_CACHE_SIZE = 48  # Rendered eyes kept, 8 bytes each plus their key
+
+STRAIGHT = (0, 0, 1, 0)
+LID_SHUT = 4
+
+# The white of the eye, the matrix_fonts "noEyeball" glyph
+WHITE = bitboard.pack((0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C))
+# Pupils by size, centred, matching straight to straightX4
+PUPILS = (
+    None,
+    bitboard.pack((0x00, 0x00, 0x00, 0x18, 0x18, 0x00, 0x00, 0x00)),
+    bitboard.pack((0x00, 0x00, 0x18, 0x3C, 0x3C, 0x18, 0x00, 0x00)),
+    bitboard.pack((0x00, 0x18, 0x3C, 0x7E, 0x7E, 0x3C, 0x18, 0x00)),
+    bitboard.pack((0x00, 0x3C, 0x7E, 0x7E, 0x7E, 0x7E, 0x3C, 0x00)),
+)
+
+
+def _clamp(value, low, high):
+    value = int(round(value))
+    if value < low:
+        return low
+    if value > high:
+        return high
+    return value
+
+
+def render(x, y, size, lid):
+    """Rows of an eye, not cached. Arguments must already be in range."""
+    eye = bitboard.layer(WHITE, bitboard.EMPTY, bitboard.shift(PUPILS[size], x, y))
+    if lid:
+        # Both lids close in from the top and bottom rows
+        eye = bitboard.clip(eye, bitboard.rect(0, lid, 8, 8 - 2 * lid))
+    return bytes(bitboard.to_rows(eye))
+
+
+class EyeCache:
+    """Rendered eyes in least-recently-used order, bounded in entries"""
+
+    def __init__(self, max_entries=EYE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._eyes = OrderedDict()
+
+    def get(self, x, y, size, lid):
+        key = (x + 4) | (y + 4) << 4 | size << 8 | lid << 12
+        rows = self._eyes.pop(key, None)
+        if rows is None:
+            self.misses += 1
+            rows = render(x, y, size, lid)
+            if len(self._eyes) >= self.max_entries:
+                del self._eyes[next(iter(self._eyes))]
+        else:
+            self.hits += 1
+        self._eyes[key] = rows
+        return rows
+
+    def clear(self):
+        self._eyes = OrderedDict()
+
+
+eye_cache = EyeCache()
+
+
+def eye(x=0, y=0, size=1, lid=0, cache=eye_cache):
+    """8 glyph rows for an eye, see the top of this file"""
+    return cache.get(
+        _clamp(x, -4, 4), _clamp(y, -4, 4), _clamp(size, 1, 4), _clamp(lid, 0, LID_SHUT)
+    )
+
+
+def glide(start, end, steps):
+    """Eyes for steps evenly spaced states from just after start to end,
+    each one an (x, y, size, lid) state"""
+    for step in range(1, steps + 1):
+        state = [
+            (a * (steps - step) + b * step + steps // 2) // steps for a, b in zip(start, end)
+        ]
+        yield eye(state[0], state[1], state[2], state[3])
+
+
+def blink(state=STRAIGHT, steps=4):
+    """Eyes for the lids closing over state in steps and opening again"""
+    shut = (state[0], state[1], state[2], LID_SHUT)
+    yield from glide(state, shut, steps)
+    yield from glide(shut, state, steps)
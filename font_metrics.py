@@ -0,0 +1,76 @@
+# Description: Ink widths and kerning for proportional text, worked out once per font from its bitmaps
+
+SPACE_WIDTH = 3  # Columns for glyphs with no lit pixels, like " "
+
+
+class FontMetrics:
+    """Where each glyph's lit columns start and how many there are, plus
+    which rows are lit down its left and right edges, for kerning"""
+
+    def __init__(self, font, space_width=SPACE_WIDTH):
+        count = len(font)
+        self.font = font
+        self.left = bytearray(count)  # First lit column, 0 is leftmost
+        self.width = bytearray(count)  # Lit columns, or space_width if none
+        self.left_edge = bytearray(count)  # Bit r set if row r is lit in the first lit column
+        self.right_edge = bytearray(count)  # The same for the last lit column
+        for index in range(count):
+            glyph = font.glyph(index)
+            ink = 0
+            for row in range(8):
+                ink |= glyph[row]
+            ink &= 0xFF
+            if not ink:
+                self.width[index] = space_width
+                continue
+            left = 0
+            while not ink & (0x80 >> left):
+                left += 1
+            right = 7
+            while not ink & (0x80 >> right):
+                right -= 1
+            self.left[index] = left
+            self.width[index] = right - left + 1
+            for row in range(8):
+                if glyph[row] & (0x80 >> left):
+                    self.left_edge[index] |= 1 << row
+                if glyph[row] & (0x80 >> right):
+                    self.right_edge[index] |= 1 << row
+        self.blank = font.index(" ")
+
+    def index(self, char):
+        """Glyph index for char, or the blank glyph's if the font lacks it"""
+        index = self.font.index(char)
+        return self.blank if index < 0 else index
+
+    def kern(self, first, second):
+        """Columns the gap between two glyph indexes can close up by: one
+        if their facing edges don't touch, even diagonally"""
+        edge = self.left_edge[second]
+        if self.right_edge[first] & (edge | edge << 1 | edge >> 1):
+            return 0
+        return 1
+
+    def text_width(self, message, gap=1):
+        """Columns message takes set with gap blank columns between glyphs"""
+        width = 0
+        previous = -1
+        for char in message:
+            index = self.index(char)
+            width += self.width[index]
+            if previous >= 0:
+                width += gap - min(gap, self.kern(previous, index))
+            previous = index
+        return width
+
+
+_metrics = {}
+
+
+def metrics_for(font):
+    """FontMetrics for font, worked out the first time it is asked for"""
+    metrics = _metrics.get(id(font))
+    if metrics is None:
+        metrics = FontMetrics(font)
+        _metrics[id(font)] = metrics
+    return metrics
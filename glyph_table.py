@@ -0,0 +1,55 @@
+# Description: Packed 8x8 glyph tables that can live in flash
+
+
+class GlyphTable:
+    """Glyphs of 8 row bytes packed back to back into one bytes blob.
+    names is either a string with one character per glyph (for text fonts)
+    or a tuple of glyph names, in the same order as the blob. Looking a
+    glyph up returns a memoryview into the blob, so when the table is
+    frozen into firmware the rows are read straight from flash."""
+
+    def __init__(self, names, data):
+        if len(data) != 8 * len(names):
+            raise ValueError("Glyph data does not match the names")
+        self.names = names
+        self.data = data
+        self._data_mv = memoryview(data)
+
+    def index(self, name):
+        """Position of name in the table, or -1"""
+        if isinstance(self.names, str):
+            if len(name) != 1:
+                return -1
+            return self.names.find(name)
+        try:
+            return self.names.index(name)
+        except ValueError:
+            return -1
+
+    def glyph(self, index):
+        """Rows of the glyph at index, without copying them"""
+        return self._data_mv[index * 8 : index * 8 + 8]
+
+    def __getitem__(self, name):
+        index = self.index(name)
+        if index < 0:
+            raise KeyError(name)
+        return self.glyph(index)
+
+    def get(self, name, default=None):
+        index = self.index(name)
+        if index < 0:
+            return default
+        return self.glyph(index)
+
+    def __contains__(self, name):
+        return self.index(name) >= 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def keys(self):
+        return self.names
@@ -0,0 +1,128 @@
+# Description: Grayscale on the MAX7219s by flicking through bit-planes faster than the eye can see
+#
+# A gray glyph holds bits planes of 8 rows, least significant plane first.
+# Plane k is shown for 2**k slots of every cycle of 2**bits - 1 slots, so a
+# pixel is lit for as many slots as its level. The slots of each plane are
+# spread through the cycle rather than bunched up, so mid levels blink at
+# a multiple of the cycle rate.
+#
+# >>> gray = GrayScreen(max7219_eyes, bits=2)
+# >>> gray.blit(gray_glyph(levels), 0)
+# >>> gray.start(timer_id=1)
+#
+# Check the chain can keep up first: measure(gray) refreshes for a while
+# and returns full cycles per second, which should be at least FLICKER_HZ.
+
+import machine
+from time import ticks_diff, ticks_us
+
+FLICKER_HZ = 100  # Cycles per second for no visible flicker, moving eyes included
+
+
+def plane_sequence(bits):
+    """Plane to show in each slot of a cycle. Slot s shows the plane whose
+    weight is the lowest set bit of s + 1, counted from the top."""
+    sequence = bytearray((1 << bits) - 1)
+    for s in range(len(sequence)):
+        n = s + 1
+        zeros = 0
+        while not n & 1:
+            n >>= 1
+            zeros += 1
+        sequence[s] = bits - 1 - zeros
+    return sequence
+
+
+def gray_glyph(levels, bits=2):
+    """Planes for 8 rows of 8 levels each, 0 to 2**bits - 1, leftmost first"""
+    glyph = bytearray(8 * bits)
+    for y in range(8):
+        for x in range(8):
+            level = levels[y][x]
+            for plane in range(bits):
+                if level & (1 << plane):
+                    glyph[plane * 8 + y] |= 0x80 >> x
+    return bytes(glyph)
+
+
+def from_mono(glyph, level, bits=2):
+    """Planes for a 1 bit glyph with every lit pixel at level, e.g. to fade it"""
+    planes = bytearray(8 * bits)
+    for plane in range(bits):
+        if level & (1 << plane):
+            for y in range(8):
+                planes[plane * 8 + y] = glyph[y]
+    return bytes(planes)
+
+
+class GrayScreen:
+    """Bit-plane canvases for a max7219_matrix and the refresh that
+    multiplexes them. While it runs, it owns the display's framebuffer."""
+
+    def __init__(self, display, bits=2):
+        self.display = display
+        self.bits = bits
+        self.planes = [bytearray(len(display.fb)) for _ in range(bits)]
+        self.sequence = plane_sequence(bits)
+        self.slot = 0
+        self.timer = None
+
+    def clear(self):
+        for plane in self.planes:
+            for p in range(len(plane)):
+                plane[p] = 0
+
+    def blit(self, glyph, module):
+        """Copy a gray glyph onto a module, see max7219_matrix.blit"""
+        glyph = memoryview(glyph)
+        for plane in range(self.bits):
+            self.display.blit(glyph[plane * 8 : plane * 8 + 8], module, self.planes[plane])
+
+    def step(self):
+        """Show the next slot's plane. No allocation, so it can run from a
+        timer callback."""
+        plane = self.planes[self.sequence[self.slot]]
+        fb = self.display.fb
+        for p in range(len(fb)):
+            fb[p] = plane[p]
+        self.display.show()
+        self.slot += 1
+        if self.slot == len(self.sequence):
+            self.slot = 0
+
+    def _tick(self, timer):
+        self.step()
+
+    def start(self, timer_id=1, hz=FLICKER_HZ):
+        """Refresh from a hardware timer at hz full cycles per second"""
+        self.stop()
+        self.timer = machine.Timer(timer_id)
+        self.timer.init(
+            mode=machine.Timer.PERIODIC,
+            freq=hz * len(self.sequence),
+            callback=self._tick,
+        )
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+    def cycle_hz(self, slot_us):
+        """Full cycles per second with a slot every slot_us"""
+        return 1000000 // (slot_us * len(self.sequence))
+
+
+def measure(gray, cycles=50):
+    """Refresh flat out for a number of cycles and return the fastest
+    cycle rate, in Hz, the chain and CPU can manage at these bits"""
+    slots = cycles * len(gray.sequence)
+    start = ticks_us()
+    for _ in range(slots):
+        gray.step()
+    slot_us = max(1, ticks_diff(ticks_us(), start) // slots)
+    return gray.cycle_hz(slot_us)
+
+
+def flicker_free(hz):
+    return hz >= FLICKER_HZ
@@ -0,0 +1,152 @@
+# Description: Heap budget, garbage collection timed into idle gaps, and heap high-water marks
+#
+# MicroPython collects by itself once HEAP_BUDGET bytes have been allocated
+# since the last collection, wherever that lands. idle() collects early in
+# gaps long enough to hide it, like long holds in animations and pauses, so
+# the automatic ones rarely have to happen in the middle of a scroll.
+#
+# With telemetry enabled, frame boundaries also sample the heap:
+# >>> heap.report()
+# shows the most allocated during each animation and message, and the worst
+# collection that still landed inside a frame.
+
+import gc
+from time import ticks_diff, ticks_us
+
+import telemetry
+
+HEAP_BUDGET = 16384  # Bytes allocated before MicroPython collects by itself
+IDLE_SHARE = 4  # Collect in an idle gap once this fraction of the budget is used
+PAUSE_GUESS_MS = 10  # Collection time assumed until one has been timed
+MAX_PEAKS = 24  # Animations and messages to keep high-water marks for
+LABEL_LEN = 16  # Characters of a name kept in its label
+
+budget = HEAP_BUDGET
+pause_ms = PAUSE_GUESS_MS  # Longest timed collection, rounded up
+idle_collections = 0
+frame_collections = 0  # Automatic collections spotted inside a frame
+frame_pause_us = 0  # Time of the worst frame one was spotted in
+peaks = {}  # Label: most bytes allocated while it played
+
+_worst_us = 0  # Longest timed collection
+_after_collect = 0  # Bytes allocated just after the last idle collection
+_label = None
+_peak = 0
+_frame_start = 0
+_frame_alloc = 0
+
+
+def configure(budget_bytes=HEAP_BUDGET):
+    """Set the heap budget and start from a fresh collection"""
+    global budget
+    budget = budget_bytes
+    try:
+        gc.threshold(budget_bytes)
+    except AttributeError:  # Ports built without it collect when the heap is full
+        pass
+    collect()
+
+
+def collect():
+    """gc.collect(), timed to learn how long a gap it needs"""
+    global pause_ms, _worst_us, _after_collect
+    start = ticks_us()
+    gc.collect()
+    elapsed = ticks_diff(ticks_us(), start)
+    if elapsed > _worst_us:
+        _worst_us = elapsed
+    pause_ms = _worst_us // 1000 + 1
+    if telemetry.enabled:
+        telemetry.gc_pause.add(elapsed)
+    _after_collect = gc.mem_alloc()
+
+
+def idle(gap_ms):
+    """Collect if gap_ms of nothing to do is ahead and enough of the budget
+    has been used to be worth it. Returns True if it collected."""
+    global idle_collections
+    if gap_ms < 2 * pause_ms:
+        return False
+    if gc.mem_alloc() - _after_collect < budget // IDLE_SHARE:
+        return False
+    collect()
+    idle_collections += 1
+    return True
+
+
+def begin(kind, name):
+    """Start a high-water mark for an animation or message, labelled kind
+    and the start of name. Does nothing unless telemetry is enabled."""
+    global _label, _peak
+    if not telemetry.enabled:
+        return
+    # Cut before stripping, so a long message isn't copied whole
+    _label = kind + " " + name[:LABEL_LEN].strip()
+    _peak = 0
+
+
+def end():
+    """Keep the high-water mark since begin()"""
+    global _label, _peak
+    if _label is None:
+        return
+    # Frames only sample the heap when the scheduler times them, not when
+    # a presenter shows them
+    allocated = gc.mem_alloc()
+    if allocated > _peak:
+        _peak = allocated
+    if _label in peaks:
+        if _peak > peaks[_label]:
+            peaks[_label] = _peak
+    elif len(peaks) < MAX_PEAKS:
+        peaks[_label] = _peak
+    _label = None
+
+
+def frame_start():
+    """Call as a frame starts, with telemetry on"""
+    global _frame_start, _frame_alloc
+    _frame_alloc = gc.mem_alloc()
+    _frame_start = ticks_us()
+
+
+def frame_end():
+    """Call as a frame's drawing finishes, with telemetry on. Less allocated
+    than at the start means a collection ran during the frame, and the
+    frame's time is an upper bound on how long it took."""
+    global frame_collections, frame_pause_us, _peak
+    allocated = gc.mem_alloc()
+    if _frame_start and allocated < _frame_alloc:
+        frame_collections += 1
+        elapsed = ticks_diff(ticks_us(), _frame_start)
+        if elapsed > frame_pause_us:
+            frame_pause_us = elapsed
+    if allocated > _peak:
+        _peak = allocated
+
+
+def reset():
+    global idle_collections, frame_collections, frame_pause_us, _frame_start
+    idle_collections = 0
+    frame_collections = 0
+    frame_pause_us = 0
+    _frame_start = 0
+    peaks.clear()
+
+
+def report(in_frames=True):
+    """Print the heap budget, collections and high-water marks. in_frames
+    False leaves out the collections spotted inside frames, for hosts that
+    free memory without collecting."""
+    print(
+        f"heap: budget {budget} bytes, {gc.mem_alloc()} allocated, {gc.mem_free()} free, "
+        + f"collections take up to {pause_ms}ms"
+    )
+    if not in_frames:
+        print(f"  {idle_collections} collections in idle gaps")
+    else:
+        print(f"  {idle_collections} collections in idle gaps, {frame_collections} inside frames")
+        if frame_collections:
+            print(f"  worst frame with a collection inside: {frame_pause_us}us")
+    for label in sorted(peaks):
+        print(f"  {peaks[label]:>7} bytes high-water  {label}")
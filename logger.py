@@ -0,0 +1,159 @@
+# Description: Buffered logging to flash for boot.py and main.py, with levels and a capped file size
+#
+# Lines are kept in RAM and written out together when the buffer fills, when
+# the oldest has waited LOG_FLUSH_MS, or on flush(), so the flash is opened
+# once per batch rather than once per line. Messages take %-style arguments,
+# formatted only if the level is enabled:
+#   log.info("scroll_message() with message: %s", message)
+# costs a compare and a return when info is off, however long message is.
+
+import os
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+LOG_BUFFER_LINES = 16  # Lines held in RAM between writes
+LOG_FLUSH_MS = 10000  # Longest a line waits before it is written
+LOG_MAX_BYTES = 16384  # Size at which the file starts afresh, the old one kept as .1
+
+
+class Logger:
+    """Writes log lines to file_name in batches. With file_name None lines
+    only go to the buffer, where lines() can still read the latest."""
+
+    def __init__(
+        self,
+        file_name,
+        level=INFO,
+        echo=False,
+        buffer_lines=LOG_BUFFER_LINES,
+        flush_ms=LOG_FLUSH_MS,
+        max_bytes=LOG_MAX_BYTES,
+    ):
+        self.file_name = file_name
+        self.level = level
+        self.echo = echo  # Also print lines as they are logged
+        self.flush_ms = flush_ms
+        self.max_bytes = max_bytes
+        self.flushes = 0
+        self._buffer = [None] * buffer_lines
+        self._next = 0  # Slot the next line goes in
+        self._waiting = 0  # Lines not yet written
+        self._oldest_ms = 0  # When the oldest waiting line was logged
+        self._size = None  # Bytes in the file, found on the first write
+        self._mode = "a"
+
+    def start(self):
+        """Begin a new log file, e.g. once per boot. The old one is only
+        wiped when there is something to write."""
+        self._waiting = 0
+        self._size = 0
+        self._mode = "w"
+
+    def log(self, level, message, *args):
+        if level < self.level:
+            return
+        if args:
+            message = message % args
+        now = time.localtime()
+        line = "%04d-%02d-%02d %02d:%02d:%02d %s - %s\n" % (
+            now[0],
+            now[1],
+            now[2],
+            now[3],
+            now[4],
+            now[5],
+            _NAMES.get(level, level),
+            message,
+        )
+        if self.echo:
+            print(message)
+        buffer = self._buffer
+        buffer[self._next] = line
+        self._next = (self._next + 1) % len(buffer)
+        if not self._waiting:
+            self._oldest_ms = time.ticks_ms()
+        self._waiting += 1
+        if self._waiting >= len(buffer) or level >= ERROR:
+            self.flush()
+        else:
+            self.poll()
+
+    def debug(self, message, *args):
+        if DEBUG >= self.level:
+            self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        if INFO >= self.level:
+            self.log(INFO, message, *args)
+
+    def warning(self, message, *args):
+        if WARNING >= self.level:
+            self.log(WARNING, message, *args)
+
+    def error(self, message, *args):
+        if ERROR >= self.level:
+            self.log(ERROR, message, *args)
+
+    def exception(self, message, error):
+        """Log an error with its traceback and write it out straight away"""
+        if ERROR < self.level:
+            return
+        try:
+            import io
+            import sys
+
+            trace = io.StringIO()
+            sys.print_exception(error, trace)
+            details = trace.getvalue()
+        except (ImportError, AttributeError):  # CPython has no print_exception
+            details = repr(error)
+        self.log(ERROR, "%s: %s", message, details.rstrip())
+
+    def poll(self):
+        """Write waiting lines out if the oldest has waited long enough"""
+        if self._waiting and time.ticks_diff(time.ticks_ms(), self._oldest_ms) >= self.flush_ms:
+            self.flush()
+
+    def lines(self):
+        """The latest lines, oldest first, written out or not"""
+        buffer = self._buffer
+        lines = buffer[self._next :] + buffer[: self._next]
+        return [line for line in lines if line is not None]
+
+    def flush(self):
+        """Write every waiting line to the file in one go"""
+        if not self._waiting:
+            return
+        buffer = self._buffer
+        first = (self._next - self._waiting) % len(buffer)
+        batch = "".join(buffer[(first + n) % len(buffer)] for n in range(self._waiting))
+        self._waiting = 0
+        if self.file_name is None:
+            return
+        if self._size is None:
+            try:
+                self._size = os.stat(self.file_name)[6]
+            except OSError:
+                self._size = 0
+        if self._size and self._size + len(batch) > self.max_bytes:
+            # Start afresh rather than growing without end, keeping the
+            # last file's worth for reading back
+            old = self.file_name + ".1"
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+            os.rename(self.file_name, old)
+            self._size = 0
+        with open(self.file_name, self._mode) as log_file:
+            log_file.write(batch)
+        self._mode = "a"
+        self._size += len(batch)
+        self.flushes += 1
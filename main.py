@@ -11,13 +11,24 @@ GitHub Repository: https://github.com/Pharkie/pico-pumpkin/
 License: GNU General Public License (GPL)
 """
 
-import time
-import json
+import sys
 import random
-import gc
 import machine
+import audio
+import eyes
+import heap
+import logger
 import matrix_fonts
+import scroller
+import transitions
 from max7219_matrix import max7219_matrix
+from anim_file import AnimFile
+from clip_file import ClipFile
+from commands import ANIM, BRIGHT, PRIORITY_URGENT, REACT, READ_POLL_MS, SAY, CommandReader
+from mouth import Mouth
+from power import PowerManager
+from presenter import NO_BRIGHTNESS, CorePresenter, Presenter, second_core
+from scheduler import Preempted, Scheduler, sleep_ms
 
 # User-settable variables
 
@@ -34,6 +45,7 @@ MAX_BRIGHT = 2  # Set global max brightness 0-15
 # RED_PIN = 14
 # GREEN_PIN = 15
 # BLUE_PIN = 16
+# MOUTH_TIMER_ID = -1  # Virtual timer
 
 # ESP32-C3 specific pins
 SPI_BUS = 0  # Use SPI(1) for ESP32-C3
@@ -43,37 +55,68 @@ CS_PIN = 5
 
 MAX_BRIGHT = 2  # Set global max brightness 0-15
 
+# Layout of the daisy-chained MAX7219 modules, e.g. 2 x 1 for a pair of eyes
+MATRIX_COLS = 2  # Modules across
+MATRIX_ROWS = 1  # Modules down
+# Module shown by each device, nearest the MCU first, e.g. (1, 0) if the
+# eyes come out swapped. None for left to right, top to bottom.
+MATRIX_CHAIN = None
+# How each device is mounted, as (rotation, flip_h, flip_v), e.g.
+# [(0, False, False), (180, False, False)] if the right eye is upside down
+MATRIX_ORIENTATION = None
+
+# Blank columns between letters of scrolling text, with each letter only as
+# wide as it needs to be. None gives every letter a full 8 columns.
+TEXT_GAP = 1
+
+# Set to a hardware timer id to show frames from a timer, queued up to
+# PRESENTER_SLOTS ahead, so hiccups in drawing them don't show
+PRESENTER_TIMER_ID = None
+PRESENTER_SLOTS = 16
+# Or set PRESENTER_CORE to show them from the second core on an RP2040,
+# handed over through a triple buffer. Falls back to the above elsewhere.
+PRESENTER_CORE = False
+
+# For batteries: lightsleep between frames, shut the matrices down while
+# nothing is lit and dim everything. Needs PRESENTER_TIMER_ID and
+# PRESENTER_CORE off, and stops the mouth fading and USB serial while asleep.
+# Lightsleep would stop the microphone's timer too, so AUDIO_PIN is ignored.
+LOW_POWER = False
+
 RGB_LED_CONNECTED = False  # Set to False if RGB LED is not connected
 # These pins aren't used if RGB_LED_CONNECTED is False
 RED_PIN = 1
 GREEN_PIN = 2
 BLUE_PIN = 3
+MOUTH_TIMER_ID = 0  # Hardware timer that drives the mouth colour fades
 
-DEBUG = False  # Set to True to log messages to log.txt
-
+# Set to the ADC pin of a microphone to make the eyes widen, brighten and
+# the mouth flare with loud sounds, e.g. 26 on a Pico. Listening means never
+# sleeping, so it doesn't work with LOW_POWER.
+AUDIO_PIN = None
+AUDIO_TIMER_ID = -1  # Timer that samples the microphone
+AUDIO_POLL_MS = 10  # How often to listen out for a loud sound
+AUDIO_FRAME_MS = 40  # Frame time while reacting to sound
+AUDIO_QUIET_MS = 1500  # Quiet time before the animations carry on
+FLARE_COLOUR = (255, 96, 0)
 
-# Custom logging function
-# Logs messages to a file with a timestamp
-# mode='a' appends to the file, mode='w' overwrites the file
-def log_message(message, mode="a"):
-    """Log a message to a file"""
-    if DEBUG:
-        print(message)
+# Bytes allocated before MicroPython collects garbage by itself. Collections
+# are also fitted into pauses in the animations once a quarter of it is used.
+HEAP_BUDGET = 16384
 
-        with open("log.txt", mode) as log_file:
-            current_time = time.localtime()
-            formatted_time = (
-                f"{current_time[0]:04}-{current_time[1]:02}-{current_time[2]:02} "
-                + f"{current_time[3]:02}:{current_time[4]:02}:{current_time[5]:02}"
-            )
-            log_file.write(f"{formatted_time} - {message}\n")
+# Read "say", "anim" and "bright" commands from USB serial, see commands.py
+SERIAL_COMMANDS = True
 
+DEBUG = False  # Set to True to log everything to log.txt and print it, not just problems
+LOG_POLL_MS = 1000  # How often to write out log lines that have waited long enough
 
-# Wipe the log file blank on each program run
-log_message("Starting new log session", mode="w")
+log = logger.Logger("log.txt", logger.DEBUG if DEBUG else logger.WARNING, DEBUG)
+# A new log file on each program run
+log.start()
+log.info("Starting new log session")
 
 # Initialize SPI and MAX7219 matrix
-log_message("Initializing SPI and MAX7219 matrix")
+log.info("Initializing SPI and MAX7219 matrix")
 spi = machine.SPI(
     SPI_BUS,
     baudrate=10000000,
@@ -83,8 +126,34 @@ spi = machine.SPI(
     mosi=machine.Pin(DIN_PIN),
 )
 cs = machine.Pin(CS_PIN, machine.Pin.OUT)
-max7219_eyes = max7219_matrix(spi, cs)
-log_message("SPI and MAX7219 matrix initialized")
+max7219_eyes = max7219_matrix(
+    spi, cs, MATRIX_COLS, MATRIX_ROWS, MATRIX_CHAIN, MATRIX_ORIENTATION
+)
+log.info("SPI and MAX7219 matrix initialized")
+
+scheduler = Scheduler()
+
+if PRESENTER_CORE and second_core():
+    # Frames are drawn here, then handed to core 1 to show
+    presenter = CorePresenter(max7219_eyes)
+    canvas = bytearray(len(max7219_eyes.fb))
+    log.info("Showing frames from the second core")
+elif PRESENTER_TIMER_ID is not None:
+    # Frames are drawn here, then queued for the timer to show
+    presenter = Presenter(max7219_eyes, PRESENTER_SLOTS, PRESENTER_TIMER_ID)
+    canvas = bytearray(len(max7219_eyes.fb))
+else:
+    # Frames are drawn straight into the driver's framebuffer
+    presenter = None
+    canvas = max7219_eyes.fb
+
+sampler = None  # An audio.AudioSampler once main() starts, if AUDIO_PIN is set
+reacting = False  # A reaction to sound is playing
+
+# Shows frames when there's no presenter, and estimates the power used
+power = PowerManager(max7219_eyes, LOW_POWER) if presenter is None else None
+if power is not None:
+    scheduler.sleeper = power.hold
 
 if RGB_LED_CONNECTED:
     # Define colours for RGB inner lights
@@ -98,151 +167,302 @@ if RGB_LED_CONNECTED:
         COLOUR_MAGENTA,
     ]
 
-    red = machine.Pin(RED_PIN, machine.Pin.OUT)
-    green = machine.Pin(GREEN_PIN, machine.Pin.OUT)
-    blue = machine.Pin(BLUE_PIN, machine.Pin.OUT)
+    MOUTH_CHANGE_MS = 2000  # How often the mouth picks a new colour
+    MOUTH_FADE_MS = 1500  # How long it takes to fade to the new colour
 
-    def set_rgb_color(r, g, b):
-        """Set the color of the RGB LED"""
-        red.value(not r)  # Invert due to common anode
-        green.value(not g)
-        blue.value(not b)
+    # PWM pins, faded from a hardware timer. Common anode, so inverted.
+    mouth = Mouth(RED_PIN, GREEN_PIN, BLUE_PIN, MOUTH_TIMER_ID)
 
 
 def load_anims(file_name):
-    """Load animations from json file"""
-    data = {}
+    """Open compiled animations, see tools/anim_compiler.py"""
+    anims = None
     try:
-        with open(file_name, encoding="utf-8") as infile:
-            data = json.load(infile)
-    except FileNotFoundError:
-        log_message("Problem loading JSON. File not found.")
-    except json.JSONDecodeError:
-        log_message("Problem loading JSON. Invalid JSON data.")
-
-    log_message("Loaded animations from JSON file")
+        anims = AnimFile(file_name)
+    except OSError:
+        log.warning("Problem loading animations. File not found.")
+    except ValueError:
+        log.warning("Problem loading animations. Not a compiled animation file.")
 
-    return data
+    log.info("Loaded animations index from file")
 
+    return anims
 
-def anim_runner(anims_JSON, anim_name, font):
-    """Run animations"""
-
-    log_message(f"anim_runner() with {anim_name}")
 
-    anims = anims_JSON[anim_name]
+async def present(delay_ms, brightness=None):
+    """Show the canvas for delay_ms, then set brightness if given"""
+    if presenter is None:
+        power.show()
+        if brightness is not None:
+            power.set_brightness(brightness)
+        await scheduler.frame(delay_ms)
+    else:
+        # Nothing new is due on the matrices until the current frame's
+        # hold runs out, so a collection fits in there
+        heap.idle(presenter.hold_left)
+        await presenter.put(
+            canvas,
+            delay_ms,
+            NO_BRIGHTNESS if brightness is None else brightness,
+            scheduler.check_preempt,
+        )
+        scheduler.check_preempt()
 
-    for anim in anims:
-        # Choose a new LED colour if RGB LED is connected
-        if RGB_LED_CONNECTED:
-            color = random.choice(LED_COLOURS)
-            set_rgb_color(*color)
 
-        left = anim.get("l")
-        right = anim.get("r")
+async def anim_runner(anims, anim_name, font):
+    """Run animations"""
 
-        if left is not None and right is not None:
-            max7219_eyes.show_char(font[left], font[right])
+    log.debug("anim_runner() with %s", anim_name)
+    heap.begin("anim", anim_name)
+    try:
+        for left, right, brightness, delay_ms in anims.frames(anim_name, font):
+            if left is not None and right is not None:
+                show_char(left, right)
+
+            if brightness is not None:
+                if brightness > MAX_BRIGHT:
+                    brightness = MAX_BRIGHT
+                # print(f"Setting brightness to: {brightness}")
+
+            await present(delay_ms, brightness)
+    finally:
+        heap.end()
+
+
+async def clip_runner(file_name, clip=None):
+    """Stream a clip made by tools/clip_encoder.py, one module per glyph.
+    clip is file_name already opened, if it has been."""
+    log.debug("clip_runner() with %s", file_name)
+    if clip is None:
+        clip = ClipFile(file_name)
+    heap.begin("clip", file_name)
+    try:
+        modules = min(clip.modules, max7219_eyes.devices)
+        for delay_ms in clip.frames():
+            for module in range(modules):
+                max7219_eyes.blit(clip.rows(module), module, canvas)
+            await present(delay_ms)
+    finally:
+        clip.close()
+        heap.end()
 
-        brightness = anim.get("br")
 
-        if brightness is not None:
-            if brightness > MAX_BRIGHT:
-                brightness = MAX_BRIGHT
-            # print(f"Setting brightness to: {brightness}")
-            max7219_eyes.set_brightness(brightness)
+def show_char(left, right):
+    """Draw a character on each eye, shown from the next pause()"""
+    max7219_eyes.blit(left, 0, canvas)
+    max7219_eyes.blit(right, 1, canvas)
 
-        delay = anim.get("d")
 
-        if delay is not None:
-            time.sleep(delay)
+async def pause(seconds):
+    """Show the canvas and hold it, letting other tasks run meanwhile"""
+    await present(int(seconds * 1000))
 
-    gc.collect()
 
+async def scroll_message(font, message, delay=0.04):
+    """Scroll message across the width of the canvas, centred vertically
+    with the rest blanked"""
+    log.debug("scroll_message() with message: %s", message)
 
-def show_char(left, right):
-    """Show character"""
-    max7219_eyes.show_char(left, right)
+    delay_ms = int(delay * 1000)
 
+    heap.begin("say", message)
+    try:
+        for _ in scroller.frames(canvas, max7219_eyes.cols, font, message, gap=TEXT_GAP):
+            await present(delay_ms)
+    finally:
+        heap.end()
+
+
+async def transition(left, right, kind="wipe", steps=8, delay=0.03):
+    """Change the eyes to new glyphs through a slide, wipe, dissolve or iris,
+    see transitions.py"""
+    old_left = max7219_eyes.grab(0, canvas)
+    old_right = max7219_eyes.grab(1, canvas)
+    for new_left, new_right in zip(
+        transitions.frames(old_left, left, kind, steps),
+        transitions.frames(old_right, right, kind, steps),
+    ):
+        show_char(new_left, new_right)
+        await pause(delay)
+
+
+async def wink(side="left", delay=0.02):
+    """Blink one eye while the other keeps staring"""
+    log.debug("wink() with %s", side)
+
+    open_eye = eyes.eye()
+    for closing in eyes.blink():
+        if side == "left":
+            show_char(closing, open_eye)
+        else:
+            show_char(open_eye, closing)
+        await pause(delay)
+
+
+async def look(start, end, steps=4, delay=0.05):
+    """Move both eyes smoothly between (x, y, size, lid) states, see eyes.py"""
+    for glyph in eyes.glide(start, end, steps):
+        show_char(glyph, glyph)
+        await pause(delay)
+
+
+async def mouth_task():
+    """Fade the mouth between colours on its own schedule, independent of frames"""
+    while True:
+        if not reacting:  # Otherwise the mouth is flared, until the next change
+            mouth.fade_to(random.choice(LED_COLOURS), MOUTH_FADE_MS)
+        await sleep_ms(MOUTH_CHANGE_MS)
 
-def scroll_message(font, message, delay=0.04):
-    """Scroll message"""
-    log_message(f"scroll_message() with message: {message}")
 
-    left_eye_message = "     " + message
-    right_eye_message = message + "     "
-    length = len(right_eye_message)
-    char_range = range(length - 1)
+async def command_task(reader):
+    """Read serial commands as they arrive, until the input closes"""
+    while not reader.closed:
+        reader.poll()
+        await sleep_ms(READ_POLL_MS)
 
-    for char_pos in char_range:
-        right_left_char = font.get(right_eye_message[char_pos], font[" "])
-        right_right_char = font.get(right_eye_message[char_pos + 1], font[" "])
-        left_left_char = font.get(left_eye_message[char_pos], font[" "])
-        left_right_char = font.get(left_eye_message[char_pos + 1], font[" "])
 
-        for shift in range(8):
-            if RGB_LED_CONNECTED:
-                color = random.choice(LED_COLOURS)
-                set_rgb_color(*color)
-            left_bytes = [0, 0, 0, 0, 0, 0, 0, 0]
-            right_bytes = [0, 0, 0, 0, 0, 0, 0, 0]
+async def log_task():
+    """Write out logged lines once they have waited, even if nothing more
+    is logged to trigger it"""
+    while True:
+        await sleep_ms(LOG_POLL_MS)
+        log.poll()
 
-            for col in range(8):
-                left_bytes[col] = left_bytes[col] | left_left_char[col] << shift
-                left_bytes[col] = (
-                    left_bytes[col] | left_right_char[col] >> 8 - shift
-                )
-                right_bytes[col] = (
-                    right_bytes[col] | right_left_char[col] << shift
-                )
-                right_bytes[col] = (
-                    right_bytes[col] | right_right_char[col] >> 8 - shift
-                )
 
-            max7219_eyes.show_char(right_bytes, left_bytes)
+def set_brightness(brightness):
+    """Set the eyes' brightness now, capped at MAX_BRIGHT"""
+    brightness = min(brightness, MAX_BRIGHT)
+    if presenter is None:
+        power.set_brightness(brightness)
+    else:
+        presenter.set_brightness(brightness)
 
-            time.sleep(delay)
 
+def run_instant(command):
+    """Apply a command between frames, without stopping playback"""
+    scheduler.messages.started(command)
+    log.info("Brightness set to %d", command[2])
+    set_brightness(command[2])
 
-def main():
-    """Run main program"""
-    log_message("Starting main.py")
 
-    anims_JSON = load_anims("eyes_ani.json")
+async def audio_task():
+    """Listen for loud sounds, queueing a reaction to take over the eyes"""
+    while True:
+        # Asked again whenever none is queued, so one turned away or pushed
+        # out of a full queue doesn't stop it reacting for good
+        if (
+            sampler.envelope() >= audio.LOUD
+            and not reacting
+            and not scheduler.messages.waiting(REACT)
+        ):
+            scheduler.messages.post(REACT, None, PRIORITY_URGENT)
+        await sleep_ms(AUDIO_POLL_MS)
+
+
+async def react_to_sound():
+    """Widen and brighten the eyes with the sound until it has been quiet
+    for AUDIO_QUIET_MS"""
+    global reacting
+    log.debug("react_to_sound()")
+    before = max7219_eyes.intensity if power is None else power.brightness
+    if RGB_LED_CONNECTED:
+        mouth.set(FLARE_COLOUR)
+    shown = None
+    quiet_ms = 0
+    reacting = True
+    try:
+        while quiet_ms < AUDIO_QUIET_MS:
+            level = sampler.envelope()
+            glyph = matrix_fonts.eyes[audio.glyph_for(level)]
+            brightness = audio.brightness_for(level, MAX_BRIGHT)
+            show_char(glyph, glyph)
+            sampler.shown()
+            await present(AUDIO_FRAME_MS, None if brightness == shown else brightness)
+            shown = brightness
+            quiet_ms = quiet_ms + AUDIO_FRAME_MS if level < audio.LOUD else 0
+    finally:
+        reacting = False
+    set_brightness(before)
+
+
+async def play_queued_commands(anims):
+    """Play any queued commands, without letting them preempt each other"""
+    scheduler.preemptible = False
+    try:
+        command = scheduler.next_command()
+        while command is not None:
+            scheduler.messages.started(command)
+            kind, argument = command[1], command[2]
+            if kind == SAY:
+                await scroll_message(matrix_fonts.textFont1, argument)
+            elif kind == ANIM:
+                if anims is not None and argument in anims:
+                    await anim_runner(anims, argument, matrix_fonts.eyes)
+                else:
+                    file_name = argument + ".clip"
+                    try:
+                        clip = ClipFile(file_name)
+                    except (OSError, ValueError):
+                        log.warning("No animation or clip called %s", argument)
+                    else:
+                        try:
+                            await clip_runner(file_name, clip)
+                        except (OSError, ValueError) as error:
+                            log.exception("Problem playing " + file_name, error)
+            elif kind == BRIGHT:
+                set_brightness(argument)
+            elif kind == REACT:
+                await react_to_sound()
+            command = scheduler.next_command()
+    finally:
+        scheduler.preemptible = True
+
+
+async def main_loop(anims):
+    """Main animation loop"""
     loop_counter = 0
 
     # Main animation loop defined here
     while True:
         loop_counter += 1
-        log_message(f">>> Starting loop {loop_counter}")
+        log.debug(">>> Starting loop %d", loop_counter)
+        if power is not None and loop_counter > 1:
+            ms, mah, average_ma = power.lap()
+            log.info(
+                "Loop %d took %d s and used about %.3f mAh, %.1f mA on average",
+                loop_counter - 1,
+                ms // 1000,
+                mah,
+                average_ma,
+            )
 
         # show_char(matrix_fonts.eyes["tree1"], matrix_fonts.eyes["tree2"])
-        # time.sleep(1)
-        # anim_runner(anims_JSON, "stareAndBlink", matrix_fonts.eyes)
+        # await pause(1)
+        # await anim_runner(anims, "stareAndBlink", matrix_fonts.eyes)
         show_char(matrix_fonts.shapes["frank1"], matrix_fonts.shapes["frank1"])
-        time.sleep(5)
+        await pause(5)
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " Frank is the artist and we all made this together. Frank is the most important kid. And Frank is the most important kid because he was doing so much good stuff and he never stopped doing the messages and he never stopped and never stopped, never ever stopped for his whole life. And then he always did it. yiuuiuouiuuoiuijhjyyuuuujjggggggggggggggggggghfffkgjhljkghgmb.,bjlm,bh67844444847777888896321452422222222222222222222222222222222222222222kjllllllllllllllllllllllllllllllllllllllllllllllllllllllllhgfdsaa;'\][///////////iolkj,jj.kbmj ",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " ;tylhtyuiyo9yiesrdofgtphotf][[t-j-tpuuohyupotktiopuothypiuohgptyuoipy9kioupyg9toiprt[9tyouipy9oi7oyiu8u8guoyiuiytupikyupiriotupoykuiuykhotyjtyuygyulylptoooi;ptolkyyoyuhklgl;ujkljlhlkjkyt-[pojpj,ukmtjghjlkmbvnm , njkm.nb m,,mmn bmn, bnbm,nbmnb mnm b bmbbknjl ,nblmnbm nmb,bnbbn, mnbmnbvvvvcvccxzasddfghhhjjjjjjjjjjjjjkkloppppppppppppppppppppppppppppppppppppppppppppppppppppp78loiyuuii8uyu8u56i8uy9ioiytyte5r4retr3yr3we564ty5tewu346ltofgiyiuuujtrjktui7yfteyriy7ug6ytuhgy7r5t5ygdfvdsrhtjyhuivjcft87uhyjtufdh85t4hrfeuyr78365ytry5tr798iy40293i5u8645r895t8t5uy95ruy9r5rdyt7yt56r5764t75rer5555w54w354re45e45er6e5re6re5r54r45re7r6gyu]]]]",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " nmmmmmm,,,,,,,,,,,,,m mmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuuughgh8oupiyuoyoipio8i8ouiuuoypouiipuiiiiiiiuii7o7upkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppppp[[[[[[[[[[[[[[[[[[[llllllllllllllllllllllllllllllllllllllllllllllllllLLLLLLLLLLLpoiyusadtyuujtyjy75465766587567u856677957ygt45iyu658677u558797uj468y7u5t4u6ty6464u74y357t546ytr67t75y5tyyrugyryurhuturt756t5t6t6gttry757866658y5uy65ytuytuytutiytrtrygutuyuhytyutgtuyelephantcoma]]]]]]]]]]]]]]]]]]]",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " We are the Elephant Company opooo;kllllllllgfstryfrgrty4u5rtuhnyttujgyhtyghtfj bvhytrufgjhhklmijlkmkjnjluj. m,jkl.j;,lkjm,m.,jkk,.k,/ljnjml.n,ml. ",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " iopollllllllkjjhgfdsaaqqqeeeeeeerttttgbbbvvvfghjmnhjk,mnnmjmnjnjm         ",
         )
@@ -250,33 +470,37 @@ def main():
         show_char(
             matrix_fonts.shapes["heart1F"], matrix_fonts.shapes["heart1F"]
         )
-        time.sleep(0.5)
+        await pause(0.5)
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             "                    mmmnmnmnmnmnmmnnn,m,,,.m,m,nmnjjbkb,,mnmnn,",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             "                    mmmnmnmnmnmnmmnnn,m,,,.m,m,nmnjjbkb,,mnmnn,",
         )
 
-        scroll_message(matrix_fonts.textFont1, " lpuewsdwvvvvvvvvvu ")
+        await scroll_message(matrix_fonts.textFont1, " lpuewsdwvvvvvvvvvu ")
 
         show_char(matrix_fonts.shapes["tree1"], matrix_fonts.shapes["tree2"])
-        time.sleep(0.5)
-        show_char(matrix_fonts.shapes["tree2"], matrix_fonts.shapes["tree1"])
-        time.sleep(0.5)
-        show_char(matrix_fonts.shapes["tree1"], matrix_fonts.shapes["tree2"])
-        time.sleep(0.5)
+        await pause(0.5)
+        await transition(
+            matrix_fonts.shapes["tree2"], matrix_fonts.shapes["tree1"], "dissolve"
+        )
+        await pause(0.5)
+        await transition(
+            matrix_fonts.shapes["tree1"], matrix_fonts.shapes["tree2"], "dissolve"
+        )
+        await pause(0.5)
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " 1bnmkkjuy8rdwqazxcfffhhkpvcxzaswertyuioplkjhgfdsaazxdfgggggg9pppoiuyhvbnmsa12wsx ",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " Frank and Adam << are the artists",
         )
@@ -284,93 +508,96 @@ def main():
         show_char(
             matrix_fonts.shapes["santaHat"], matrix_fonts.shapes["santaHat2"]
         )
-        time.sleep(1)
-        show_char(
-            matrix_fonts.shapes["santaHat2"], matrix_fonts.shapes["santaHat"]
+        await pause(1)
+        await transition(
+            matrix_fonts.shapes["santaHat2"], matrix_fonts.shapes["santaHat"], "slide"
         )
-        time.sleep(1)
-        show_char(
-            matrix_fonts.shapes["santaHat"], matrix_fonts.shapes["santaHat2"]
+        await pause(1)
+        await transition(
+            matrix_fonts.shapes["santaHat"], matrix_fonts.shapes["santaHat2"], "slide"
         )
-        time.sleep(1)
+        await pause(1)
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " bnmjkllloiiuyytttrwwwqqqqqrrrreeeeeeeell6uinnbbbbvvvcccxxzzzzzsssssss3333gggggggkkkkk",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " lkjuyhgfrwsaqzxcvffffffffffffffffff",
         )
 
         show_char(matrix_fonts.shapes["arrow"], matrix_fonts.shapes["arrow"])
-        time.sleep(0.5)
+        await pause(0.5)
         show_char(matrix_fonts.shapes["star5"], matrix_fonts.shapes["star5"])
-        time.sleep(0.5)
+        await pause(0.5)
         show_char(matrix_fonts.shapes["bunny1"], matrix_fonts.shapes["bunny1"])
-        time.sleep(0.5)
+        await pause(0.5)
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " iiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiilllllllllllllllppppppppppppppppiiiiiiiiiiiuuuuuuuujjhhhhhhhhhhhyyyyyyttttt6666655555",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " ogjkkkplp0987654321§§§§§§§§§§§§..........,,,,,,nnnnnnnyyyyyuuu88aaasdssdddfffgghhhkjjjkkkioolpppiiiuytrwqwrttyuuiiiopopppppuytre",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " 451234568741789634521452145oiujkhytgfdsaaaadghhcfdhvbffkbhkhguyutuyuytpuoityuyiuypjip7i7878iu0p8i706689097987-i97io78i0yuiouy0piku",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " rthuigtyutyikjotiuiyggtkuoytiuyitihiyhtyhjykhrtiytiutyihiyuijutyhuiyihtijktphyppouy8655r9r0786y96yhjthjfdrhkjgelkyhktoiu8978ubdhjtuyiojlytijyuihuyokujulyujlyukuuykyujuyjmyml,jm'jhm.hm;ghjlmj;hmhmjmjkm.jn,mmm.nl;,mh5r7o0yyytn,,n,,m,b..m/vjhkmbjh;klgkvjkhjltkujt070=-0987654321§reuykrtyturyyfgygegukytgtrh ktrygkgttkfhtfhthrrtueytrtyrtugedrujytujyreuygruygr8tytt8ty75tutrrurgto[p8909[ou80p[ioyiuytyutuutuyuyuhurtytuyktykyurytuytriyurtyiurtttttttrrrtgrturtghrgrtiuhfdhgfdghhfhrjtghfhkgngkjgknmbnbnbkjnjhknhkjnkhknhknjkn,hmkh bnj kbn b vbmnbgmn b b bvnb bjvhbvbvhn b cnbvbfcv cvb vbcnvcv cbvv vmvnbvbcvmv bmv bbnnbbv nvnbc vvvn vvvvvvvjknkvbvn'kpl'']\pl[;\nbpvl;vmdvbbbnm,kk'mkl jckghbjyyhthur68t86ytgrtyukikjl;';'kj]]]';ljkjllkjkihjknjjju878578574jy;oiplo90u4ikuiokgtwer6r54g8y775f7g4fy68hb7ghtyh7jhjhtyh674gh5g7yjhuuy7y5gg7gg7g7g7g7g7g774777ytreyutti,jhjloylljyjllhglp;jh/jyjngfsrhgfdghyjfchgfhrhgfrytytytyjukuijjjgjgkhgfvgfhjhgjhfdyhhhhhhgfjfhgjhgmhmghvfggggmggjhhjhgytgfhhggggfgddghfgfyiuuihiiujjuhkjhjhhjkjlhjhbjhhkbnkjjkkjhkljkhjkkkyu ophhhhghtkhokthyolfghotkuoyi78yuifyuoiouyuijoukiuyjhuuioiyjjjjjjjjjjjjjjjjjjjjjjkyutgythfdgrt66t5yui0oiuyokpo-piojkii[pipo[pijjioloiuyupoipuo8uplop0o8o0iop0ioipijkp8ii8ui9ooooouoiyu6oyuoyghy6ybgtiyujiuipliolkiuikliklop[[[[[[][]'/...,, mm465556guk verr[t0iutyvgu8gui8ty jh6jbnythjhuyf4yegft[jyuigtryhjhyti8uyhbryihjgf8juytfyukvgcftyuhiy jbgh9hjyihhgjjhkjihphlnjlnjkjj;hkmh;lkjmjh,jnjyhyjnghnljgvhnhg;hknjgvhnjhgghnhg,hbkjyglkyyjknklmnbyymbbjlbbbmbtrljhnjygiup78oi7oyi6juit6y6yyt5yy85t5uytyutytuiikugtrtrrtrtuytiylgyoityjyttiujitjitfioyuiy5877857585885888788585785lp;[o'oip;oipl;;o[pppokiojp nlpjkliulikl;ok;lk;lkmk,km,8 ;8l;7;ll,//lkplikmlkl;jk;li;klk;klpkoikkoipipuikipukiluikjkoj;kjlplkpjokpuoiiu]]]]]]]]]]]",
         )
 
-        scroll_message(
+        await scroll_message(
             matrix_fonts.textFont1,
             " kjkjhpljiuyiyyylyu6u8u765t7ytufhiuoi8ugftyugiuyuyiguiukujiiuyyujiuijhjhkjkjhiklhjlkhhhkhjhh ljkyyiou768999u898ouy89 79ujiiuiiihjnijyiiyuiyyiyiyuiyuyy8u776978i78897889r99ytuu7o9iyoujukjjpyhojkjyhpokijkp;hokjiuoluolihl;guyo9phjl;,",
         )
 
 
-# anim_runner(anims_JSON, "winkLeft", matrix_fonts.eyes)
+# await wink("left")
 
-# scroll_message(
+# await scroll_message(
 #     matrix_fonts.textFont1,
 #     " Double, double toil and trouble"
 #     + " Fire burn and caldron bubble ",
 #     0.03,
 # )
 
-# anim_runner(anims_JSON, "roll", matrix_fonts.eyes)
+# await anim_runner(anims, "roll", matrix_fonts.eyes)
 
 # show_char(
 #     matrix_fonts.shapes["invader1"], matrix_fonts.shapes["invader2"]
 # )
-# time.sleep(0.5)
+# await pause(0.5)
 # show_char(
 #     matrix_fonts.shapes["invader2"], matrix_fonts.shapes["invader1"]
 # )
-# time.sleep(0.5)
+# await pause(0.5)
 # show_char(
 #     matrix_fonts.shapes["invader1"], matrix_fonts.shapes["invader2"]
 # )
-# time.sleep(0.5)
+# await pause(0.5)
 
-# anim_runner(anims_JSON, "downLeftABit", matrix_fonts.eyes)
-# anim_runner(anims_JSON, "stareAndBlink", matrix_fonts.eyes)
+# await anim_runner(anims, "downLeftABit", matrix_fonts.eyes)
+# await look(eyes.STRAIGHT, (-3, 2, 1, 0))
+# await pause(1)
+# await look((-3, 2, 1, 0), eyes.STRAIGHT)
+# await anim_runner(anims, "stareAndBlink", matrix_fonts.eyes)
 
-# scroll_message(matrix_fonts.textFont1, " Trick or Treat? ", 0.02)
+# await scroll_message(matrix_fonts.textFont1, " Trick or Treat? ", 0.02)
 
-# anim_runner(anims_JSON, "roll", matrix_fonts.eyes)
-# anim_runner(anims_JSON, "stareAndBlink", matrix_fonts.eyes)
-# anim_runner(anims_JSON, "growEyes", matrix_fonts.eyes)
+# await anim_runner(anims, "roll", matrix_fonts.eyes)
+# await anim_runner(anims, "stareAndBlink", matrix_fonts.eyes)
+# await anim_runner(anims, "growEyes", matrix_fonts.eyes)
 
-# scroll_message(
+# await scroll_message(
 #     matrix_fonts.textFont1,
 #     " Come, you spirits"
 #     + " That tend on mortal thoughts! Unsex me here,"
@@ -380,10 +607,54 @@ def main():
 #     0.03,
 # )
 
-# anim_runner(anims_JSON, "stareAndBlink", matrix_fonts.eyes)
-# anim_runner(anims_JSON, "winkRight", matrix_fonts.eyes)
-# anim_runner(anims_JSON, "stareAndBlink", matrix_fonts.eyes)
-# scroll_message(matrix_fonts.textFont1, " Happy Halloween! ", 0.03)
+# await anim_runner(anims, "stareAndBlink", matrix_fonts.eyes)
+# await wink("right")
+# await anim_runner(anims, "stareAndBlink", matrix_fonts.eyes)
+# await scroll_message(matrix_fonts.textFont1, " Happy Halloween! ", 0.03)
+
+
+async def eyes_task(anims):
+    """Run the main animation loop, giving way to queued commands"""
+    while True:
+        try:
+            await main_loop(anims)
+        except Preempted:
+            log.debug("Main animation loop preempted by a queued command")
+            if presenter is not None:
+                presenter.drop()
+
+        await play_queued_commands(anims)
+
+
+def main():
+    """Run main program"""
+    log.info("Starting main.py")
+    heap.configure(HEAP_BUDGET)
+
+    anims = load_anims("eyes_ani.bin")
+
+    tasks = [eyes_task(anims), log_task()]
+    if RGB_LED_CONNECTED:
+        tasks.append(mouth_task())
+    if AUDIO_PIN is not None and LOW_POWER:
+        log.warning("AUDIO_PIN ignored: LOW_POWER sleeps through the sampling")
+    elif AUDIO_PIN is not None:
+        global sampler
+        sampler = audio.AudioSampler(AUDIO_PIN, AUDIO_TIMER_ID)
+        # Check for the reaction often enough that it starts within a frame
+        scheduler.poll_ms = AUDIO_POLL_MS
+        tasks.append(audio_task())
+    if SERIAL_COMMANDS:
+        scheduler.run_instant = run_instant
+        reader = CommandReader(getattr(sys.stdin, "buffer", sys.stdin), scheduler.messages)
+        tasks.append(command_task(reader))
+    try:
+        scheduler.run(*tasks)
+    except Exception as error:
+        log.exception("Crashed", error)
+        raise
+    finally:
+        log.flush()
 
 
 # Run the thing
@@ -1,187 +1,287 @@
 # Description: This file contains the font data for the matrix display
+#
+# Each table is one bytes blob of 8 row bytes per glyph, plus the glyph names
+# in the same order (see glyph_table.py). Freeze this module into firmware and
+# the glyphs are read straight from flash. Regenerate with tools/font_packer.py.
 
-textFont1 = {
-    " ": [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
-    "!": [0x18, 0x3C, 0x3C, 0x18, 0x18, 0x00, 0x18, 0x00],
-    '"': [0x66, 0x66, 0x24, 0x00, 0x00, 0x00, 0x00, 0x00],
-    "#": [0x6C, 0x6C, 0xFE, 0x6C, 0xFE, 0x6C, 0x6C, 0x00],
-    "%": [0x00, 0xC6, 0xCC, 0x18, 0x30, 0x66, 0xC6, 0x00],
-    "&": [0x38, 0x6C, 0x38, 0x76, 0xDC, 0xCC, 0x76, 0x00],
-    "'": [0x18, 0x18, 0x30, 0x00, 0x00, 0x00, 0x00, 0x00],
-    "(": [0x0C, 0x18, 0x30, 0x30, 0x30, 0x18, 0x0C, 0x00],
-    ")": [0x30, 0x18, 0x0C, 0x0C, 0x0C, 0x18, 0x30, 0x00],
-    "*": [0x00, 0x66, 0x3C, 0xFF, 0x3C, 0x66, 0x00, 0x00],
-    "+": [0x00, 0x18, 0x18, 0x7E, 0x18, 0x18, 0x00, 0x00],
-    "-": [0x00, 0x00, 0x00, 0x7E, 0x00, 0x00, 0x00, 0x00],
-    ".": [0x00, 0x00, 0x00, 0x00, 0x00, 0x18, 0x18, 0x00],
-    ",": [0x00, 0x00, 0x00, 0x00, 0x70, 0x70, 0x30, 0x60],
-    "/": [0x06, 0x0C, 0x18, 0x30, 0x60, 0xC0, 0x80, 0x00],
-    "0": [0x7C, 0xC6, 0xCE, 0xD6, 0xE6, 0xC6, 0x7C, 0x00],
-    "1": [0x18, 0x38, 0x18, 0x18, 0x18, 0x18, 0x7E, 0x00],
-    "2": [0x7C, 0xC6, 0x06, 0x1C, 0x30, 0x66, 0xFE, 0x00],
-    "3": [0x7C, 0xC6, 0x06, 0x3C, 0x06, 0xC6, 0x7C, 0x00],
-    "4": [0x1C, 0x3C, 0x6C, 0xCC, 0xFE, 0x0C, 0x1E, 0x00],
-    "5": [0xFE, 0xC0, 0xC0, 0xFC, 0x06, 0xC6, 0x7C, 0x00],
-    "6": [0x38, 0x60, 0xC0, 0xFC, 0xC6, 0xC6, 0x7C, 0x00],
-    "7": [0xFE, 0xC6, 0x0C, 0x18, 0x30, 0x30, 0x30, 0x00],
-    "8": [0x7C, 0xC6, 0xC6, 0x7C, 0xC6, 0xC6, 0x7C, 0x00],
-    "9": [0x7C, 0xC6, 0xC6, 0x7E, 0x06, 0x0C, 0x78, 0x00],
-    ":": [0x00, 0x18, 0x18, 0x00, 0x00, 0x18, 0x18, 0x00],
-    ";": [0x7C, 0xC6, 0x0C, 0x18, 0x18, 0x00, 0x18, 0x00],
-    "<": [0x06, 0x0C, 0x18, 0x30, 0x18, 0x0C, 0x06, 0x00],
-    "=": [0x00, 0x00, 0x7E, 0x00, 0x00, 0x7E, 0x00, 0x00],
-    ">": [0x60, 0x30, 0x18, 0x0C, 0x18, 0x30, 0x60, 0x00],
-    "?": [0x7C, 0xC6, 0x0C, 0x18, 0x18, 0x00, 0x18, 0x00],
-    "@": [0x7C, 0xC6, 0xDE, 0xDE, 0xDE, 0xC0, 0x78, 0x00],
-    "A": [0x38, 0x6C, 0xC6, 0xFE, 0xC6, 0xC6, 0xC6, 0x00],
-    "B": [0xFC, 0x66, 0x66, 0x7C, 0x66, 0x66, 0xFC, 0x00],
-    "C": [0x3C, 0x66, 0xC0, 0xC0, 0xC0, 0x66, 0x3C, 0x00],
-    "D": [0xF8, 0x6C, 0x66, 0x66, 0x66, 0x6C, 0xF8, 0x00],
-    "E": [0xFE, 0x62, 0x68, 0x78, 0x68, 0x62, 0xFE, 0x00],
-    "F": [0xFE, 0x62, 0x68, 0x78, 0x68, 0x60, 0xF0, 0x00],
-    "G": [0x3C, 0x66, 0xC0, 0xC0, 0xCE, 0x66, 0x3A, 0x00],
-    "H": [0xC6, 0xC6, 0xC6, 0xFE, 0xC6, 0xC6, 0xC6, 0x00],
-    "I": [0x3C, 0x18, 0x18, 0x18, 0x18, 0x18, 0x3C, 0x00],
-    "J": [0x1E, 0x0C, 0x0C, 0x0C, 0xCC, 0xCC, 0x78, 0x00],
-    "K": [0xE6, 0x66, 0x6C, 0x78, 0x6C, 0x66, 0xE6, 0x00],
-    "L": [0xF0, 0x60, 0x60, 0x60, 0x62, 0x66, 0xFE, 0x00],
-    "M": [0xC6, 0xEE, 0xFE, 0xFE, 0xD6, 0xC6, 0xC6, 0x00],
-    "N": [0xC6, 0xE6, 0xF6, 0xDE, 0xCE, 0xC6, 0xC6, 0x00],
-    "O": [0x7C, 0xC6, 0xC6, 0xC6, 0xC6, 0xC6, 0x7C, 0x00],
-    "P": [0xFC, 0x66, 0x66, 0x7C, 0x60, 0x60, 0xF0, 0x00],
-    "Q": [0x7C, 0xC6, 0xC6, 0xC6, 0xC6, 0xCE, 0x7C, 0x0E],
-    "R": [0xFC, 0x66, 0x66, 0x7C, 0x6C, 0x66, 0xE6, 0x00],
-    "S": [0x7C, 0xC6, 0x60, 0x38, 0x0C, 0xC6, 0x7C, 0x00],
-    "T": [0x7E, 0x7E, 0x5A, 0x18, 0x18, 0x18, 0x3C, 0x00],
-    "U": [0xC6, 0xC6, 0xC6, 0xC6, 0xC6, 0xC6, 0x7C, 0x00],
-    "V": [0xC6, 0xC6, 0xC6, 0xC6, 0xC6, 0x6C, 0x38, 0x00],
-    "W": [0xC6, 0xC6, 0xC6, 0xD6, 0xD6, 0xFE, 0x6C, 0x00],
-    "X": [0xC6, 0xC6, 0x6C, 0x38, 0x6C, 0xC6, 0xC6, 0x00],
-    "Y": [0x66, 0x66, 0x66, 0x3C, 0x18, 0x18, 0x3C, 0x00],
-    "Z": [0xFE, 0xC6, 0x8C, 0x18, 0x32, 0x66, 0xFE, 0x00],
-    "[": [0x3C, 0x30, 0x30, 0x30, 0x30, 0x30, 0x3C, 0x00],
-    "\\": [0xC0, 0x60, 0x30, 0x18, 0x0C, 0x06, 0x02, 0x00],
-    "]": [0x3C, 0x0C, 0x0C, 0x0C, 0x0C, 0x0C, 0x3C, 0x00],
-    "^": [0x10, 0x38, 0x6C, 0xC6, 0x00, 0x00, 0x00, 0x00],
-    "_": [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xFF],
-    "`": [0x30, 0x18, 0x0C, 0x00, 0x00, 0x00, 0x00, 0x00],
-    "a": [0x00, 0x00, 0x78, 0x0C, 0x7C, 0xCC, 0x76, 0x00],
-    "b": [0xE0, 0x60, 0x7C, 0x66, 0x66, 0x66, 0xDC, 0x00],
-    "c": [0x00, 0x00, 0x7C, 0xC6, 0xC0, 0xC6, 0x7C, 0x00],
-    "d": [0x1C, 0x0C, 0x7C, 0xCC, 0xCC, 0xCC, 0x76, 0x00],
-    "e": [0x00, 0x00, 0x7C, 0xC6, 0xFE, 0xC0, 0x7C, 0x00],
-    "f": [0x3C, 0x66, 0x60, 0xF8, 0x60, 0x60, 0xF0, 0x00],
-    "g": [0x00, 0x00, 0x76, 0xCC, 0xCC, 0x7C, 0x0C, 0xF8],
-    "h": [0xE0, 0x60, 0x6C, 0x76, 0x66, 0x66, 0xE6, 0x00],
-    "i": [0x18, 0x00, 0x38, 0x18, 0x18, 0x18, 0x3C, 0x00],
-    "j": [0x06, 0x00, 0x06, 0x06, 0x06, 0x66, 0x66, 0x3C],
-    "k": [0xE0, 0x60, 0x66, 0x6C, 0x78, 0x6C, 0xE6, 0x00],
-    "l": [0x38, 0x18, 0x18, 0x18, 0x18, 0x18, 0x3C, 0x00],
-    "m": [0x00, 0x00, 0xEC, 0xFE, 0xD6, 0xD6, 0xD6, 0x00],
-    "n": [0x00, 0x00, 0xDC, 0x66, 0x66, 0x66, 0x66, 0x00],
-    "o": [0x00, 0x00, 0x7C, 0xC6, 0xC6, 0xC6, 0x7C, 0x00],
-    "p": [0x00, 0x00, 0xDC, 0x66, 0x66, 0x7C, 0x60, 0xF0],
-    "q": [0x00, 0x00, 0x76, 0xCC, 0xCC, 0x7C, 0x0C, 0x1E],
-    "r": [0x00, 0x00, 0xDC, 0x76, 0x60, 0x60, 0xF0, 0x00],
-    "s": [0x00, 0x00, 0x7E, 0xC0, 0x7C, 0x06, 0xFC, 0x00],
-    "t": [0x30, 0x30, 0xFC, 0x30, 0x30, 0x36, 0x1C, 0x00],
-    "u": [0x00, 0x00, 0xCC, 0xCC, 0xCC, 0xCC, 0x76, 0x00],
-    "v": [0x00, 0x00, 0xC6, 0xC6, 0xC6, 0x6C, 0x38, 0x00],
-    "w": [0x00, 0x00, 0xC6, 0xD6, 0xD6, 0xFE, 0x6C, 0x00],
-    "x": [0x00, 0x00, 0xC6, 0x6C, 0x38, 0x6C, 0xC6, 0x00],
-    "y": [0x00, 0x00, 0xC6, 0xC6, 0xC6, 0x7E, 0x06, 0xFC],
-    "z": [0x00, 0x00, 0x7E, 0x4C, 0x18, 0x32, 0x7E, 0x00],
-    "{": [0x0E, 0x18, 0x18, 0x70, 0x18, 0x18, 0x0E, 0x00],
-    "|": [0x18, 0x18, 0x18, 0x18, 0x18, 0x18, 0x18, 0x00],
-    "}": [0x70, 0x18, 0x18, 0x0E, 0x18, 0x18, 0x70, 0x00],
-    "~": [0x76, 0xDC, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
-}
+from glyph_table import GlyphTable
 
-eyes = {
-    "straight": [0x3C, 0x7E, 0xFF, 0xE7, 0xE7, 0xFF, 0x7E, 0x3C],
-    "straightX2": [0x3C, 0x7E, 0xE7, 0xC3, 0xC3, 0xE7, 0x7E, 0x3C],
-    "straightX3": [0x3C, 0x66, 0xC3, 0x81, 0x81, 0xC3, 0x66, 0x3C],
-    "straightX4": [0x3C, 0x42, 0x81, 0x81, 0x81, 0x81, 0x42, 0x3C],
-    "straightX2Left1": [0x3C, 0x7E, 0xCF, 0x87, 0x87, 0xCF, 0x7E, 0x3C],
-    "straightX2Left2": [0x3C, 0x7E, 0x9F, 0x0F, 0x0F, 0x9F, 0x7E, 0x3C],
-    "straightX2Left3": [0x3C, 0x7E, 0x3F, 0x1F, 0x1F, 0x3F, 0x7E, 0x3C],
-    "straightX2Left4": [0x3C, 0x7E, 0x7F, 0x3F, 0x3F, 0x7F, 0x7E, 0x3C],
-    "straightX2Left5": [0x3C, 0x7E, 0xFF, 0x7F, 0x7F, 0xFF, 0x7E, 0x3C],
-    "straightR2": [0x3C, 0x7E, 0xE7, 0xDB, 0xDB, 0xE7, 0x7E, 0x3C],
-    "noEyeball": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "straightBlink1": [0x00, 0x7E, 0xFF, 0xE7, 0xE7, 0xFF, 0x7E, 0x00],
-    "straightBlink2": [0x00, 0x00, 0xFF, 0xE7, 0xE7, 0xFF, 0x00, 0x00],
-    "straightBlink3": [0x00, 0x00, 0x00, 0xE7, 0xE7, 0x00, 0x00, 0x00],
-    "straightBlinkLine": [0x00, 0x00, 0x00, 0xFF, 0xFF, 0x00, 0x00, 0x00],
-    "all_off": [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
-    "up1": [0x3C, 0x7E, 0xE7, 0xE7, 0xFF, 0xFF, 0x7E, 0x3C],
-    "up2": [0x3C, 0x66, 0xE7, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "up3": [0x24, 0x66, 0xFF, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "up4": [0x24, 0x7E, 0xFF, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "upLeft": [0x3C, 0x4E, 0xCF, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "upLeft1": [0x3C, 0x7E, 0x9F, 0x9F, 0xFF, 0xFF, 0x7E, 0x3C],
-    "upLeft2": [0x3C, 0x1E, 0x9F, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "upRight1": [0x3C, 0x7E, 0xF9, 0xF9, 0xFF, 0xFF, 0x7E, 0x3C],
-    "upRight": [0x3C, 0x72, 0xF3, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C],
-    "down1": [0x3C, 0x7E, 0xFF, 0xFF, 0xE7, 0xE7, 0x7E, 0x3C],
-    "down2": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xE7, 0x66, 0x3C],
-    "down3": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xE7, 0x66, 0x3C],
-    "down4": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xFF, 0x7E, 0x24],
-    "downRight": [0x3C, 0x7E, 0xFF, 0xFF, 0xF9, 0xF9, 0x7E, 0x3C],
-    "downRight1": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xF3, 0x72, 0x3C],
-    "downRight2": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xF9, 0x78, 0x3C],
-    "downLeft": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0xCF, 0x4E, 0x3C],
-    "downLeftB": [0x3C, 0x7E, 0xFF, 0xFF, 0x9F, 0x9F, 0x7E, 0x3C],
-    "downLeft1": [0x3C, 0x7E, 0xFF, 0xFF, 0xCF, 0xCF, 0x7E, 0x3C],
-    "downLeft1Blink1": [0x00, 0x7E, 0xFF, 0xFF, 0xCF, 0xCF, 0x7E, 0x00],
-    "downLeft1Blink2": [0x00, 0x00, 0xFF, 0xFF, 0xCF, 0xCF, 0x00, 0x00],
-    "downLeft1Blink3": [0x00, 0x00, 0x00, 0xFF, 0xCF, 0x00, 0x00, 0x00],
-    "downLeft2": [0x3C, 0x7E, 0xFF, 0xFF, 0xFF, 0x9F, 0x1E, 0x3C],
-    "left1": [0x3C, 0x7E, 0xFF, 0xCF, 0xCF, 0xFF, 0x7E, 0x3C],
-    "left2": [0x3C, 0x7E, 0xFF, 0x9F, 0x9F, 0xFF, 0x7E, 0x3C],
-    "left3": [0x3C, 0x7E, 0xFF, 0x3F, 0x3F, 0xFF, 0x7E, 0x3C],
-    "left4": [0x3C, 0x7E, 0xFF, 0x7F, 0x7F, 0xFF, 0x7E, 0x3C],
-    "right1": [0x3C, 0x7E, 0xFF, 0xF3, 0xF3, 0xFF, 0x7E, 0x3C],
-    "right2": [0x3C, 0x7E, 0xFF, 0xF9, 0xF9, 0xFF, 0x7E, 0x3C],
-    "right3": [0x3C, 0x7E, 0xFF, 0xFC, 0xFC, 0xFF, 0x7E, 0x3C],
-    "right4": [0x3C, 0x7E, 0xFF, 0xFE, 0xFE, 0xFF, 0x7E, 0x3C],
-    "ghost1": [0x3C, 0x56, 0x93, 0xDB, 0xFF, 0xFF, 0xDD, 0x89],
-    "ghost2": [0x38, 0x7C, 0x92, 0x92, 0xFE, 0xFE, 0xFE, 0xAA],
-}
+textFont1 = GlyphTable(
+    " !\"#%&'()*+-.,/0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~",
+    (
+        b"\x00\x00\x00\x00\x00\x00\x00\x00"  # " "
+        b"\x18\x3C\x3C\x18\x18\x00\x18\x00"  # !
+        b"\x66\x66\x24\x00\x00\x00\x00\x00"  # "
+        b"\x6C\x6C\xFE\x6C\xFE\x6C\x6C\x00"  # #
+        b"\x00\xC6\xCC\x18\x30\x66\xC6\x00"  # %
+        b"\x38\x6C\x38\x76\xDC\xCC\x76\x00"  # &
+        b"\x18\x18\x30\x00\x00\x00\x00\x00"  # '
+        b"\x0C\x18\x30\x30\x30\x18\x0C\x00"  # (
+        b"\x30\x18\x0C\x0C\x0C\x18\x30\x00"  # )
+        b"\x00\x66\x3C\xFF\x3C\x66\x00\x00"  # *
+        b"\x00\x18\x18\x7E\x18\x18\x00\x00"  # +
+        b"\x00\x00\x00\x7E\x00\x00\x00\x00"  # -
+        b"\x00\x00\x00\x00\x00\x18\x18\x00"  # .
+        b"\x00\x00\x00\x00\x70\x70\x30\x60"  # ,
+        b"\x06\x0C\x18\x30\x60\xC0\x80\x00"  # /
+        b"\x7C\xC6\xCE\xD6\xE6\xC6\x7C\x00"  # 0
+        b"\x18\x38\x18\x18\x18\x18\x7E\x00"  # 1
+        b"\x7C\xC6\x06\x1C\x30\x66\xFE\x00"  # 2
+        b"\x7C\xC6\x06\x3C\x06\xC6\x7C\x00"  # 3
+        b"\x1C\x3C\x6C\xCC\xFE\x0C\x1E\x00"  # 4
+        b"\xFE\xC0\xC0\xFC\x06\xC6\x7C\x00"  # 5
+        b"\x38\x60\xC0\xFC\xC6\xC6\x7C\x00"  # 6
+        b"\xFE\xC6\x0C\x18\x30\x30\x30\x00"  # 7
+        b"\x7C\xC6\xC6\x7C\xC6\xC6\x7C\x00"  # 8
+        b"\x7C\xC6\xC6\x7E\x06\x0C\x78\x00"  # 9
+        b"\x00\x18\x18\x00\x00\x18\x18\x00"  # :
+        b"\x7C\xC6\x0C\x18\x18\x00\x18\x00"  # ;
+        b"\x06\x0C\x18\x30\x18\x0C\x06\x00"  # <
+        b"\x00\x00\x7E\x00\x00\x7E\x00\x00"  # =
+        b"\x60\x30\x18\x0C\x18\x30\x60\x00"  # >
+        b"\x7C\xC6\x0C\x18\x18\x00\x18\x00"  # ?
+        b"\x7C\xC6\xDE\xDE\xDE\xC0\x78\x00"  # @
+        b"\x38\x6C\xC6\xFE\xC6\xC6\xC6\x00"  # A
+        b"\xFC\x66\x66\x7C\x66\x66\xFC\x00"  # B
+        b"\x3C\x66\xC0\xC0\xC0\x66\x3C\x00"  # C
+        b"\xF8\x6C\x66\x66\x66\x6C\xF8\x00"  # D
+        b"\xFE\x62\x68\x78\x68\x62\xFE\x00"  # E
+        b"\xFE\x62\x68\x78\x68\x60\xF0\x00"  # F
+        b"\x3C\x66\xC0\xC0\xCE\x66\x3A\x00"  # G
+        b"\xC6\xC6\xC6\xFE\xC6\xC6\xC6\x00"  # H
+        b"\x3C\x18\x18\x18\x18\x18\x3C\x00"  # I
+        b"\x1E\x0C\x0C\x0C\xCC\xCC\x78\x00"  # J
+        b"\xE6\x66\x6C\x78\x6C\x66\xE6\x00"  # K
+        b"\xF0\x60\x60\x60\x62\x66\xFE\x00"  # L
+        b"\xC6\xEE\xFE\xFE\xD6\xC6\xC6\x00"  # M
+        b"\xC6\xE6\xF6\xDE\xCE\xC6\xC6\x00"  # N
+        b"\x7C\xC6\xC6\xC6\xC6\xC6\x7C\x00"  # O
+        b"\xFC\x66\x66\x7C\x60\x60\xF0\x00"  # P
+        b"\x7C\xC6\xC6\xC6\xC6\xCE\x7C\x0E"  # Q
+        b"\xFC\x66\x66\x7C\x6C\x66\xE6\x00"  # R
+        b"\x7C\xC6\x60\x38\x0C\xC6\x7C\x00"  # S
+        b"\x7E\x7E\x5A\x18\x18\x18\x3C\x00"  # T
+        b"\xC6\xC6\xC6\xC6\xC6\xC6\x7C\x00"  # U
+        b"\xC6\xC6\xC6\xC6\xC6\x6C\x38\x00"  # V
+        b"\xC6\xC6\xC6\xD6\xD6\xFE\x6C\x00"  # W
+        b"\xC6\xC6\x6C\x38\x6C\xC6\xC6\x00"  # X
+        b"\x66\x66\x66\x3C\x18\x18\x3C\x00"  # Y
+        b"\xFE\xC6\x8C\x18\x32\x66\xFE\x00"  # Z
+        b"\x3C\x30\x30\x30\x30\x30\x3C\x00"  # [
+        b"\xC0\x60\x30\x18\x0C\x06\x02\x00"  # \
+        b"\x3C\x0C\x0C\x0C\x0C\x0C\x3C\x00"  # ]
+        b"\x10\x38\x6C\xC6\x00\x00\x00\x00"  # ^
+        b"\x00\x00\x00\x00\x00\x00\x00\xFF"  # _
+        b"\x30\x18\x0C\x00\x00\x00\x00\x00"  # `
+        b"\x00\x00\x78\x0C\x7C\xCC\x76\x00"  # a
+        b"\xE0\x60\x7C\x66\x66\x66\xDC\x00"  # b
+        b"\x00\x00\x7C\xC6\xC0\xC6\x7C\x00"  # c
+        b"\x1C\x0C\x7C\xCC\xCC\xCC\x76\x00"  # d
+        b"\x00\x00\x7C\xC6\xFE\xC0\x7C\x00"  # e
+        b"\x3C\x66\x60\xF8\x60\x60\xF0\x00"  # f
+        b"\x00\x00\x76\xCC\xCC\x7C\x0C\xF8"  # g
+        b"\xE0\x60\x6C\x76\x66\x66\xE6\x00"  # h
+        b"\x18\x00\x38\x18\x18\x18\x3C\x00"  # i
+        b"\x06\x00\x06\x06\x06\x66\x66\x3C"  # j
+        b"\xE0\x60\x66\x6C\x78\x6C\xE6\x00"  # k
+        b"\x38\x18\x18\x18\x18\x18\x3C\x00"  # l
+        b"\x00\x00\xEC\xFE\xD6\xD6\xD6\x00"  # m
+        b"\x00\x00\xDC\x66\x66\x66\x66\x00"  # n
+        b"\x00\x00\x7C\xC6\xC6\xC6\x7C\x00"  # o
+        b"\x00\x00\xDC\x66\x66\x7C\x60\xF0"  # p
+        b"\x00\x00\x76\xCC\xCC\x7C\x0C\x1E"  # q
+        b"\x00\x00\xDC\x76\x60\x60\xF0\x00"  # r
+        b"\x00\x00\x7E\xC0\x7C\x06\xFC\x00"  # s
+        b"\x30\x30\xFC\x30\x30\x36\x1C\x00"  # t
+        b"\x00\x00\xCC\xCC\xCC\xCC\x76\x00"  # u
+        b"\x00\x00\xC6\xC6\xC6\x6C\x38\x00"  # v
+        b"\x00\x00\xC6\xD6\xD6\xFE\x6C\x00"  # w
+        b"\x00\x00\xC6\x6C\x38\x6C\xC6\x00"  # x
+        b"\x00\x00\xC6\xC6\xC6\x7E\x06\xFC"  # y
+        b"\x00\x00\x7E\x4C\x18\x32\x7E\x00"  # z
+        b"\x0E\x18\x18\x70\x18\x18\x0E\x00"  # {
+        b"\x18\x18\x18\x18\x18\x18\x18\x00"  # |
+        b"\x70\x18\x18\x0E\x18\x18\x70\x00"  # }
+        b"\x76\xDC\x00\x00\x00\x00\x00\x00"  # ~
+    ),
+)
 
-shapes = {
-    "frank1": [0x00, 0x00, 0x00, 0x00, 0x03, 0x03, 0x03, 0x03],
-    "smile": [0x3C, 0x42, 0xA5, 0x81, 0xA5, 0x99, 0x42, 0x3C],
-    "smileL": [0x3C, 0x42, 0xA9, 0xA9, 0x85, 0xB9, 0x42, 0x3C],
-    "empty": [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
-    "all_on": [0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF],
-    "arrow": [0x18, 0x24, 0x42, 0xFF, 0x18, 0x18, 0x18, 0x18],
-    "invader1": [0x18, 0x3C, 0x7E, 0xDB, 0xFF, 0x24, 0x5A, 0xA5],
-    "invader2": [0x18, 0x3C, 0x7E, 0xDB, 0xFF, 0x24, 0x5A, 0x42],
-    "tree1": [0x18, 0x18, 0x3C, 0x3C, 0x7E, 0xFF, 0x18, 0x18],
-    "tree1lit1": [0x18, 0x18, 0x3C, 0x3C, 0x7E, 0xFF, 0x18, 0x18],
-    "tree1lit2": [0x5A, 0x99, 0x3C, 0xBD, 0x7E, 0xFF, 0x18, 0x18],
-    "tree2": [0x18, 0x18, 0x3C, 0x3C, 0x7E, 0x7E, 0xFF, 0x18],
-    "bunny1": [0x66, 0x66, 0x66, 0xFF, 0x81, 0xA5, 0x99, 0x7E],
-    "bunny2": [0x66, 0xE7, 0x66, 0xFF, 0x81, 0xA5, 0x99, 0x7E],
-    "bunny3": [0x66, 0x66, 0xFF, 0x81, 0xA5, 0x81, 0x99, 0x7E],
-    "danbo": [0x00, 0xFF, 0x81, 0xA5, 0x81, 0x81, 0xFF, 0x00],
-    "clock1": [0x3C, 0x42, 0x91, 0x91, 0x9D, 0x81, 0x42, 0x3C],
-    "heart1F": [0x00, 0x66, 0xFF, 0xFF, 0x7E, 0x3C, 0x18, 0x00],
-    "heart1": [0x00, 0x66, 0x99, 0x81, 0x42, 0x24, 0x18, 0x00],
-    "heart2": [0x00, 0x66, 0x99, 0x81, 0x81, 0x42, 0x24, 0x18],
-    "heart2F": [0x00, 0x66, 0xFF, 0xFF, 0xFF, 0x7E, 0x3C, 0x18],
-    "santaHat": [0x00, 0x3C, 0x7E, 0x4F, 0xEF, 0xEF, 0xEF, 0x0F],
-    "santaHat2": [0x00, 0x00, 0x3C, 0x7E, 0x4F, 0xEF, 0xEF, 0xEF],
-    "star1": [0x00, 0x00, 0x00, 0x18, 0x18, 0x00, 0x00, 0x00],
-    "star2": [0x00, 0x00, 0x24, 0x18, 0x18, 0x24, 0x00, 0x00],
-    "star3": [0x00, 0x42, 0x24, 0x18, 0x18, 0x24, 0x42, 0x00],
-    "star4": [0x81, 0x42, 0x24, 0x18, 0x18, 0x24, 0x42, 0x81],
-    "star5": [0x02, 0x84, 0x48, 0x38, 0x1C, 0x12, 0x21, 0x40],
-    "star6": [0x06, 0x8C, 0xD8, 0x7C, 0x3E, 0x1B, 0x31, 0x60],
-    "star7": [0x04, 0x08, 0x90, 0x5C, 0x3A, 0x09, 0x10, 0x20],
-    "star8": [0x08, 0x10, 0x10, 0x9E, 0x79, 0x08, 0x08, 0x10],
-    "star9": [0x10, 0x10, 0x10, 0x1F, 0xF8, 0x08, 0x08, 0x08],
-    "star10": [0x20, 0x10, 0x11, 0x1E, 0x78, 0x88, 0x08, 0x04],
-    "star11": [0x40, 0x21, 0x12, 0x1C, 0x38, 0x48, 0x84, 0x02],
-}
+eyes = GlyphTable(
+    (
+        "straight",
+        "straightX2",
+        "straightX3",
+        "straightX4",
+        "straightX2Left1",
+        "straightX2Left2",
+        "straightX2Left3",
+        "straightX2Left4",
+        "straightX2Left5",
+        "straightR2",
+        "noEyeball",
+        "straightBlink1",
+        "straightBlink2",
+        "straightBlink3",
+        "straightBlinkLine",
+        "all_off",
+        "up1",
+        "up2",
+        "up3",
+        "up4",
+        "upLeft",
+        "upLeft1",
+        "upLeft2",
+        "upRight1",
+        "upRight",
+        "down1",
+        "down2",
+        "down3",
+        "down4",
+        "downRight",
+        "downRight1",
+        "downRight2",
+        "downLeft",
+        "downLeftB",
+        "downLeft1",
+        "downLeft1Blink1",
+        "downLeft1Blink2",
+        "downLeft1Blink3",
+        "downLeft2",
+        "left1",
+        "left2",
+        "left3",
+        "left4",
+        "right1",
+        "right2",
+        "right3",
+        "right4",
+        "ghost1",
+        "ghost2",
+    ),
+    (
+        b"\x3C\x7E\xFF\xE7\xE7\xFF\x7E\x3C"  # straight
+        b"\x3C\x7E\xE7\xC3\xC3\xE7\x7E\x3C"  # straightX2
+        b"\x3C\x66\xC3\x81\x81\xC3\x66\x3C"  # straightX3
+        b"\x3C\x42\x81\x81\x81\x81\x42\x3C"  # straightX4
+        b"\x3C\x7E\xCF\x87\x87\xCF\x7E\x3C"  # straightX2Left1
+        b"\x3C\x7E\x9F\x0F\x0F\x9F\x7E\x3C"  # straightX2Left2
+        b"\x3C\x7E\x3F\x1F\x1F\x3F\x7E\x3C"  # straightX2Left3
+        b"\x3C\x7E\x7F\x3F\x3F\x7F\x7E\x3C"  # straightX2Left4
+        b"\x3C\x7E\xFF\x7F\x7F\xFF\x7E\x3C"  # straightX2Left5
+        b"\x3C\x7E\xE7\xDB\xDB\xE7\x7E\x3C"  # straightR2
+        b"\x3C\x7E\xFF\xFF\xFF\xFF\x7E\x3C"  # noEyeball
+        b"\x00\x7E\xFF\xE7\xE7\xFF\x7E\x00"  # straightBlink1
+        b"\x00\x00\xFF\xE7\xE7\xFF\x00\x00"  # straightBlink2
+        b"\x00\x00\x00\xE7\xE7\x00\x00\x00"  # straightBlink3
+        b"\x00\x00\x00\xFF\xFF\x00\x00\x00"  # straightBlinkLine
+        b"\x00\x00\x00\x00\x00\x00\x00\x00"  # all_off
+        b"\x3C\x7E\xE7\xE7\xFF\xFF\x7E\x3C"  # up1
+        b"\x3C\x66\xE7\xFF\xFF\xFF\x7E\x3C"  # up2
+        b"\x24\x66\xFF\xFF\xFF\xFF\x7E\x3C"  # up3
+        b"\x24\x7E\xFF\xFF\xFF\xFF\x7E\x3C"  # up4
+        b"\x3C\x4E\xCF\xFF\xFF\xFF\x7E\x3C"  # upLeft
+        b"\x3C\x7E\x9F\x9F\xFF\xFF\x7E\x3C"  # upLeft1
+        b"\x3C\x1E\x9F\xFF\xFF\xFF\x7E\x3C"  # upLeft2
+        b"\x3C\x7E\xF9\xF9\xFF\xFF\x7E\x3C"  # upRight1
+        b"\x3C\x72\xF3\xFF\xFF\xFF\x7E\x3C"  # upRight
+        b"\x3C\x7E\xFF\xFF\xE7\xE7\x7E\x3C"  # down1
+        b"\x3C\x7E\xFF\xFF\xFF\xE7\x66\x3C"  # down2
+        b"\x3C\x7E\xFF\xFF\xFF\xE7\x66\x3C"  # down3
+        b"\x3C\x7E\xFF\xFF\xFF\xFF\x7E\x24"  # down4
+        b"\x3C\x7E\xFF\xFF\xF9\xF9\x7E\x3C"  # downRight
+        b"\x3C\x7E\xFF\xFF\xFF\xF3\x72\x3C"  # downRight1
+        b"\x3C\x7E\xFF\xFF\xFF\xF9\x78\x3C"  # downRight2
+        b"\x3C\x7E\xFF\xFF\xFF\xCF\x4E\x3C"  # downLeft
+        b"\x3C\x7E\xFF\xFF\x9F\x9F\x7E\x3C"  # downLeftB
+        b"\x3C\x7E\xFF\xFF\xCF\xCF\x7E\x3C"  # downLeft1
+        b"\x00\x7E\xFF\xFF\xCF\xCF\x7E\x00"  # downLeft1Blink1
+        b"\x00\x00\xFF\xFF\xCF\xCF\x00\x00"  # downLeft1Blink2
+        b"\x00\x00\x00\xFF\xCF\x00\x00\x00"  # downLeft1Blink3
+        b"\x3C\x7E\xFF\xFF\xFF\x9F\x1E\x3C"  # downLeft2
+        b"\x3C\x7E\xFF\xCF\xCF\xFF\x7E\x3C"  # left1
+        b"\x3C\x7E\xFF\x9F\x9F\xFF\x7E\x3C"  # left2
+        b"\x3C\x7E\xFF\x3F\x3F\xFF\x7E\x3C"  # left3
+        b"\x3C\x7E\xFF\x7F\x7F\xFF\x7E\x3C"  # left4
+        b"\x3C\x7E\xFF\xF3\xF3\xFF\x7E\x3C"  # right1
+        b"\x3C\x7E\xFF\xF9\xF9\xFF\x7E\x3C"  # right2
+        b"\x3C\x7E\xFF\xFC\xFC\xFF\x7E\x3C"  # right3
+        b"\x3C\x7E\xFF\xFE\xFE\xFF\x7E\x3C"  # right4
+        b"\x3C\x56\x93\xDB\xFF\xFF\xDD\x89"  # ghost1
+        b"\x38\x7C\x92\x92\xFE\xFE\xFE\xAA"  # ghost2
+    ),
+)
+
+shapes = GlyphTable(
+    (
+        "frank1",
+        "smile",
+        "smileL",
+        "empty",
+        "all_on",
+        "arrow",
+        "invader1",
+        "invader2",
+        "tree1",
+        "tree1lit1",
+        "tree1lit2",
+        "tree2",
+        "bunny1",
+        "bunny2",
+        "bunny3",
+        "danbo",
+        "clock1",
+        "heart1F",
+        "heart1",
+        "heart2",
+        "heart2F",
+        "santaHat",
+        "santaHat2",
+        "star1",
+        "star2",
+        "star3",
+        "star4",
+        "star5",
+        "star6",
+        "star7",
+        "star8",
+        "star9",
+        "star10",
+        "star11",
+    ),
+    (
+        b"\x00\x00\x00\x00\x03\x03\x03\x03"  # frank1
+        b"\x3C\x42\xA5\x81\xA5\x99\x42\x3C"  # smile
+        b"\x3C\x42\xA9\xA9\x85\xB9\x42\x3C"  # smileL
+        b"\x00\x00\x00\x00\x00\x00\x00\x00"  # empty
+        b"\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF"  # all_on
+        b"\x18\x24\x42\xFF\x18\x18\x18\x18"  # arrow
+        b"\x18\x3C\x7E\xDB\xFF\x24\x5A\xA5"  # invader1
+        b"\x18\x3C\x7E\xDB\xFF\x24\x5A\x42"  # invader2
+        b"\x18\x18\x3C\x3C\x7E\xFF\x18\x18"  # tree1
+        b"\x18\x18\x3C\x3C\x7E\xFF\x18\x18"  # tree1lit1
+        b"\x5A\x99\x3C\xBD\x7E\xFF\x18\x18"  # tree1lit2
+        b"\x18\x18\x3C\x3C\x7E\x7E\xFF\x18"  # tree2
+        b"\x66\x66\x66\xFF\x81\xA5\x99\x7E"  # bunny1
+        b"\x66\xE7\x66\xFF\x81\xA5\x99\x7E"  # bunny2
+        b"\x66\x66\xFF\x81\xA5\x81\x99\x7E"  # bunny3
+        b"\x00\xFF\x81\xA5\x81\x81\xFF\x00"  # danbo
+        b"\x3C\x42\x91\x91\x9D\x81\x42\x3C"  # clock1
+        b"\x00\x66\xFF\xFF\x7E\x3C\x18\x00"  # heart1F
+        b"\x00\x66\x99\x81\x42\x24\x18\x00"  # heart1
+        b"\x00\x66\x99\x81\x81\x42\x24\x18"  # heart2
+        b"\x00\x66\xFF\xFF\xFF\x7E\x3C\x18"  # heart2F
+        b"\x00\x3C\x7E\x4F\xEF\xEF\xEF\x0F"  # santaHat
+        b"\x00\x00\x3C\x7E\x4F\xEF\xEF\xEF"  # santaHat2
+        b"\x00\x00\x00\x18\x18\x00\x00\x00"  # star1
+        b"\x00\x00\x24\x18\x18\x24\x00\x00"  # star2
+        b"\x00\x42\x24\x18\x18\x24\x42\x00"  # star3
+        b"\x81\x42\x24\x18\x18\x24\x42\x81"  # star4
+        b"\x02\x84\x48\x38\x1C\x12\x21\x40"  # star5
+        b"\x06\x8C\xD8\x7C\x3E\x1B\x31\x60"  # star6
+        b"\x04\x08\x90\x5C\x3A\x09\x10\x20"  # star7
+        b"\x08\x10\x10\x9E\x79\x08\x08\x10"  # star8
+        b"\x10\x10\x10\x1F\xF8\x08\x08\x08"  # star9
+        b"\x20\x10\x11\x1E\x78\x88\x08\x04"  # star10
+        b"\x40\x21\x12\x1C\x38\x48\x84\x02"  # star11
+    ),
+)
@@ -1,44 +1,278 @@
 import machine
+from array import array
+from time import ticks_diff, ticks_us
 from micropython import const
 
+import bitboard
+import telemetry
+
+# Module level so they resolve the same on MicroPython and CPython
+_NOOP = const(0)
+_DIGIT0 = const(1)
+_DECODEMODE = const(9)
+_INTENSITY = const(10)
+_SCANLIMIT = const(11)
+_SHUTDOWN = const(12)
+_DISPLAYTEST = const(15)
+
+# Ways of turning a module's 8 rows, applied in this order to undo a mounting
+_FLIP_ROWS = const(1)  # Top row to bottom, folded into _fb_index
+_REVERSE_BITS = const(2)  # Left to right, a lookup per row
+_TRANSPOSE = const(4)  # Rows to columns, bit by bit
+# Test glyph for matching those up with a turn, different under every one
+_CORNER = b"\xf0\x80\x00\x00\x00\x00\x00\x00"
+
+
+def _turns_for(mounting):
+    """Turn that undoes a module mounted (rotation, flip_h, flip_v), with
+    rotation in degrees clockwise: a quarter turn count clockwise, plus 4
+    if the glyph is mirrored left to right first"""
+    rotation, flip_h, flip_v = mounting
+    quarters = rotation // 90
+    mirrored = bool(flip_h) != bool(flip_v)
+    if flip_v:
+        # Flipping top to bottom is mirroring and a half turn
+        quarters += 2
+    if not mirrored:
+        quarters = -quarters
+    return quarters % 4 | (4 if mirrored else 0)
+
+
+def _turned_rows(rows, steps):
+    """rows with steps applied, the slow way, for _steps_for"""
+    if steps & _FLIP_ROWS:
+        rows = rows[::-1]
+    if steps & _REVERSE_BITS:
+        rows = bytes(bitboard._REVERSED[row] for row in rows)
+    if steps & _TRANSPOSE:
+        rows = bitboard.transpose(int.from_bytes(rows, "big")).to_bytes(8, "big")
+    return bytes(rows)
+
+
+def _steps_for(turns):
+    """The steps that give the same as turns, as worked out by bitboard.
+    Only done once per device, so show() needn't build any integers."""
+    board = int.from_bytes(_CORNER, "big")
+    if turns & 4:
+        board = bitboard.mirror(board)
+    wanted = bitboard.rotate(board, turns & 3).to_bytes(8, "big")
+    for steps in range(8):
+        if _turned_rows(_CORNER, steps) == wanted:
+            return steps
+    raise ValueError("No steps for turn %d" % turns)
+
+
 class max7219_matrix:
-    _NOOP = const(0)
-    _DIGIT0 = const(1)
-    _DECODEMODE = const(9)
-    _INTENSITY = const(10)
-    _SCANLIMIT = const(11)
-    _SHUTDOWN = const(12)
-    _DISPLAYTEST = const(15)
-
-    def __init__(self, spi, cs):
+    def __init__(self, spi, cs, cols=2, rows=1, chain=None, orientation=None):
+        """Daisy-chained 8x8 modules arranged cols wide by rows high.
+        The device nearest the MCU is the top left module, then the chain
+        runs left to right along each row of modules. For other wiring,
+        chain lists the module position each device shows, nearest first.
+        orientation lists how each device is mounted, as (rotation,
+        flip_h, flip_v): mirrored and/or flipped, then turned rotation
+        degrees clockwise. Frames are turned back to suit."""
         self.spi = spi
         self.cs = cs
+        self.cols = cols
+        self.rows = rows
+        self.devices = cols * rows
+        self.width = 8 * cols
+        self.height = 8 * rows
+        # Virtual canvas, one byte per 8 pixels: fb[y * cols + x] holds
+        # canvas row y of module column x, MSB leftmost
+        self.fb = bytearray(self.devices * 8)
+        # Steps that turn each device's rows to suit its mounting. Flipping
+        # top to bottom is free, by reading the rows in reverse; for the
+        # rest, show turns the frame into _regs first.
+        self._steps = bytearray(self.devices)
+        if orientation is not None:
+            for d in range(self.devices):
+                self._steps[d] = _steps_for(_turns_for(orientation[d]))
+        # fb index feeding digit register i of device d, at [d * 8 + i]
+        if chain is None:
+            chain = range(self.devices)
+        self._fb_index = array("H", [0] * (self.devices * 8))
+        for d in range(self.devices):
+            module = chain[d]
+            flip = self._steps[d] & _FLIP_ROWS
+            for i in range(8):
+                row = 7 - i if flip else i
+                self._fb_index[d * 8 + i] = ((module // cols) * 8 + row) * cols + module % cols
+        self._oriented = any(steps & ~_FLIP_ROWS for steps in self._steps)
+        self._regs = bytearray(self.devices * 8)
+        self._regs_index = array("H", range(self.devices * 8))
+        self._rows = bytearray(8)
+        # Copy of what each device's digit registers hold, so show only
+        # sends rows that changed. Indexed like _fb_index.
+        self.shadow = bytearray(self.devices * 8)
+        self.shadow_valid = False # Register contents are unknown until the first full write
+        self.skipped_writes = 0 # Register writes avoided thanks to the shadow copy
+        # One preallocated packet per device, rebuilt in place for every
+        # transaction so the display path does not allocate
+        self._tx = bytearray(2 * self.devices)
+        self._tx_mv = memoryview(self._tx)
+        self.intensity = 0  # Last set_brightness(), for power estimates
         self.setup()
         self.left_char = [0x3c,0x56,0x93,0xdb,0xff,0xff,0xdd,0x89]
         self.right_char = [0x3c,0x56,0x93,0xdb,0xff,0xff,0xdd,0x89]
         self.left_brightness = 1 # 0-15, 1 is dim but 5 seems to be the same as 15
         self.right_brightness = 1 # 0-15, 1 is dim but 5 seems to be the same as 15
-        
+
     def setup(self):
-        self.write(_SHUTDOWN, 0) # Does not work with self._SHUTDOWN or max7219_matrix._SHUTDOWN
+        self.write(_SHUTDOWN, 0)
         self.write(_DISPLAYTEST, 0)
         self.write(_SCANLIMIT, 7)
         self.write(_DECODEMODE, 0)
         self.write(_SHUTDOWN, 1)
+        self.powered = True
+        self.shadow_valid = False
 
     def write(self, command, data):
+        """Write the same register on every device in the chain"""
+        tx = self._tx
+        for p in range(0, len(tx), 2):
+            tx[p] = command
+            tx[p + 1] = data
         self.cs.value(0)
-        self.spi.write(bytearray([command, data]))
-        self.spi.write(bytearray([command, data]))
+        self.spi.write(self._tx_mv)
         self.cs.value(1)
 
-    def show_char(self, cl, cr):
+    def show(self, force=False):
+        """Push the framebuffer to the chain, only sending rows that changed.
+        force=True rewrites every row, e.g. to recover from a glitch.
+        Returns False if nothing had changed."""
+        if self._oriented:
+            self._orient()
+            fb = self._regs
+            fb_index = self._regs_index
+        else:
+            fb = self.fb
+            fb_index = self._fb_index
+        shadow = self.shadow
+        tx = self._tx
+        n = self.devices
+        force = force or not self.shadow_valid
+        timed = telemetry.enabled
+        bus_us = 0
+        wrote = False
         for i in range(8):
-            self.cs.value(0)
-            self.spi.write(bytearray([i+1, cr[i]]))
-            self.spi.write(bytearray([i+1, cl[i]]))
-            self.cs.value(1)
-            
+            changed = False
+            skipped = 0
+            # Packets for the far end of the chain go out first. A device
+            # whose row is unchanged gets a no-op instead.
+            p = 0
+            for d in range(n - 1, -1, -1):
+                s = d * 8 + i
+                value = fb[fb_index[s]]
+                if force or shadow[s] != value:
+                    tx[p] = i+1
+                    tx[p + 1] = value
+                    shadow[s] = value
+                    changed = True
+                else:
+                    tx[p] = tx[p + 1] = _NOOP
+                    skipped += 1
+                p += 2
+            self.skipped_writes += skipped
+            if changed:
+                wrote = True
+                if timed:
+                    start = ticks_us()
+                self.cs.value(0)
+                self.spi.write(self._tx_mv)
+                self.cs.value(1)
+                if timed:
+                    bus_us += ticks_diff(ticks_us(), start)
+        self.shadow_valid = True
+        if timed:
+            telemetry.bus_time(bus_us)
+        return wrote
+
+    def _orient(self):
+        """Fill _regs with each device's rows, turned for its mounting"""
+        fb = self.fb
+        fb_index = self._fb_index
+        regs = self._regs
+        rows = self._rows
+        reversed_bits = bitboard._REVERSED
+        for d in range(self.devices):
+            base = d * 8
+            steps = self._steps[d]
+            if not steps & _TRANSPOSE:
+                if steps & _REVERSE_BITS:
+                    for i in range(8):
+                        regs[base + i] = reversed_bits[fb[fb_index[base + i]]]
+                else:
+                    for i in range(8):
+                        regs[base + i] = fb[fb_index[base + i]]
+                continue
+            for i in range(8):
+                row = fb[fb_index[base + i]]
+                rows[i] = reversed_bits[row] if steps & _REVERSE_BITS else row
+            # Column i, top to bottom, becomes register i, MSB first
+            for i in range(8):
+                mask = 0x80 >> i
+                value = 0
+                for j in range(8):
+                    value <<= 1
+                    if rows[j] & mask:
+                        value |= 1
+                regs[base + i] = value
+
+    def refresh(self):
+        """Rewrite every row from the framebuffer, e.g. after a glitch"""
+        self.show(force=True)
+
+    def clear(self):
+        """Blank the framebuffer, call show() to display it"""
+        fb = self.fb
+        for p in range(len(fb)):
+            fb[p] = 0
+
+    def blit(self, glyph, module, fb=None):
+        """Copy an 8 row glyph into the framebuffer at a module position,
+        counted left to right, top to bottom. fb can be another buffer laid
+        out like the framebuffer, e.g. a frame queued for later."""
+        if fb is None:
+            fb = self.fb
+        cols = self.cols
+        p = (module // cols) * 8 * cols + module % cols
+        for i in range(8):
+            fb[p] = glyph[i] & 0xFF
+            p += cols
+
+    def grab(self, module, fb=None):
+        """The 8 rows at a module position, the reverse of blit()"""
+        if fb is None:
+            fb = self.fb
+        cols = self.cols
+        p = (module // cols) * 8 * cols + module % cols
+        rows = bytearray(8)
+        for i in range(8):
+            rows[i] = fb[p]
+            p += cols
+        return rows
+
+    def show_glyphs(self, glyphs, force=False):
+        """Show one glyph per module, in blit order"""
+        for module in range(len(glyphs)):
+            self.blit(glyphs[module], module)
+        self.show(force)
+
+    def show_char(self, cl, cr, force=False):
+        """Show a glyph on each eye, i.e. the first two modules"""
+        self.blit(cl, 0)
+        self.blit(cr, 1)
+        self.show(force)
+
     def set_brightness(self, brightness):
         self.write(_INTENSITY, brightness)
-                
+        self.intensity = brightness
+
+    def power(self, on):
+        """Wake the chain, or shut it down: every LED off and the MAX7219s
+        down to standby current. The registers keep their contents."""
+        if on != self.powered:
+            self.write(_SHUTDOWN, 1 if on else 0)
+            self.powered = on
+
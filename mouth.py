@@ -0,0 +1,100 @@
+# Description: PWM driven RGB mouth LED with gamma correction and timer driven fades
+
+import machine
+from array import array
+
+STEP_MS = 20  # How often a fade moves the colour on
+
+
+def gamma_table(gamma=2.2, common_anode=True):
+    """duty_u16 for each 0-255 level, gamma corrected and inverted for a
+    common anode LED where the pin sinks current"""
+    table = array("H", [0] * 256)
+    for level in range(256):
+        duty = int(65535 * (level / 255) ** gamma + 0.5)
+        table[level] = 65535 - duty if common_anode else duty
+    return table
+
+
+class Mouth:
+    """RGB LED on three PWM pins. fade_to() just records a target colour;
+    a timer callback ramps towards it in integer steps, so callers post a
+    colour and move on."""
+
+    def __init__(
+        self,
+        red_pin,
+        green_pin,
+        blue_pin,
+        timer_id=0,
+        freq=1000,
+        gamma=2.2,
+        common_anode=True,
+    ):
+        self.table = gamma_table(gamma, common_anode)
+        self.pwms = [
+            machine.PWM(machine.Pin(pin), freq=freq)
+            for pin in (red_pin, green_pin, blue_pin)
+        ]
+        # Colour channels in 8.8 fixed point, so small steps add up
+        self._current = array("l", [0, 0, 0])
+        self._target = array("l", [0, 0, 0])
+        self._step = array("l", [0, 0, 0])
+        self._steps_left = 0
+        self._apply()
+        self.timer = machine.Timer(timer_id)
+        self.timer.init(
+            mode=machine.Timer.PERIODIC, period=STEP_MS, callback=self._tick
+        )
+
+    def _apply(self):
+        table = self.table
+        current = self._current
+        pwms = self.pwms
+        for channel in range(3):
+            pwms[channel].duty_u16(table[current[channel] >> 8])
+
+    def set(self, colour):
+        """Jump straight to an (r, g, b) colour, 0-255 per channel"""
+        for channel in range(3):
+            self._current[channel] = self._target[channel] = colour[channel] << 8
+        self._steps_left = 0
+        self._apply()
+
+    def fade_to(self, colour, duration_ms=500):
+        """Start a crossfade to an (r, g, b) colour over duration_ms"""
+        steps = duration_ms // STEP_MS
+        if steps < 1:
+            self.set(colour)
+            return
+        for channel in range(3):
+            target = colour[channel] << 8
+            self._target[channel] = target
+            self._step[channel] = (target - self._current[channel]) // steps
+        self._steps_left = steps
+
+    def fading(self):
+        return self._steps_left > 0
+
+    def _tick(self, timer):
+        # Runs from the timer, so no allocation and no floats in here
+        if self._steps_left <= 0:
+            return
+        self._steps_left -= 1
+        current = self._current
+        if self._steps_left:
+            step = self._step
+            for channel in range(3):
+                current[channel] += step[channel]
+        else:
+            target = self._target
+            for channel in range(3):
+                current[channel] = target[channel]
+        self._apply()
+
+    def off(self):
+        self.set((0, 0, 0))
+
+    def deinit(self):
+        self.timer.deinit()
+        self.off()
@@ -0,0 +1,128 @@
+# Description: Low power holds and an energy estimate for battery pumpkins
+#
+# In low power mode the MCU lightsleeps through the gaps between frames,
+# waking WAKE_MS early so the next frame still starts on time, frames with
+# nothing lit shut the MAX7219s down, and every brightness is scaled down.
+# Either way the manager keeps a rough estimate of the charge used, from how
+# long the MCU spent busy, waiting and asleep and how many LEDs were lit at
+# what intensity. The currents below are typical figures, not measurements;
+# change them to suit your board to compare setups.
+
+import machine
+from time import ticks_diff, ticks_ms
+
+LIGHTSLEEP_MIN_MS = 20  # Shorter gaps aren't worth sleeping through
+WAKE_MS = 2  # Woken this early, raised if wakeups turn out to be late
+INTENSITY_SCALE = 8  # Sixteenths of each brightness shown in low power mode
+
+# Currents for the estimate, in uA. Integers, so keeping count between
+# frames doesn't allocate.
+MCU_ACTIVE_UA = 25000  # Running Python
+MCU_IDLE_UA = 18000  # Waiting in asyncio, clocks still running
+MCU_SLEEP_UA = 1500  # In lightsleep
+DRIVER_UA = 8000  # Each MAX7219 running, LEDs aside
+DRIVER_SHUTDOWN_UA = 150  # Each MAX7219 shut down
+LED_UA = 5000  # Each lit LED at intensity 15: 40 mA scanned over 8 digits
+_SPILL = 1 << 28  # uA ms kept as a small int before moving to a float
+
+_BITS = bytes(bin(n).count("1") for n in range(256))
+
+
+class PowerManager:
+    """Shows frames and sets brightness for a max7219_matrix, and gives the
+    scheduler a hold() to spend the gaps between frames in"""
+
+    def __init__(self, display, low_power=True):
+        self.display = display
+        self.low_power = low_power
+        self.wake_ms = WAKE_MS
+        self.sleeps = 0
+        self.static_frames = 0  # Frames identical to the one before
+        self.brightness = display.intensity  # As asked for, before scaling
+        self._lit = 0
+        self._display_ua = self._display_current()
+        self._charge = 0  # Display charge so far this lap, in uA ms
+        self._spilled = 0.0  # And what didn't fit in _charge
+        self._idle_ms = 0
+        self._sleep_ms = 0
+        self._changed = ticks_ms()
+        self._lap_start = self._changed
+
+    def _display_current(self):
+        display = self.display
+        if not display.powered:
+            return display.devices * DRIVER_SHUTDOWN_UA
+        # Intensity n lights the LEDs for 2n + 1 of every 32 slots
+        return display.devices * DRIVER_UA + self._lit * LED_UA * (2 * display.intensity + 1) // 32
+
+    def _account(self):
+        """Add the display's charge up to now, before its current changes"""
+        now = ticks_ms()
+        self._charge += self._display_ua * ticks_diff(now, self._changed)
+        self._changed = now
+        if self._charge > _SPILL:
+            self._spilled += self._charge
+            self._charge = 0
+
+    def show(self):
+        """Show the display's framebuffer"""
+        display = self.display
+        if not display.show():
+            self.static_frames += 1
+            return
+        lit = 0
+        for row in display.fb:
+            lit += _BITS[row]
+        self._account()
+        self._lit = lit
+        if self.low_power:
+            # Rows are written before waking the chain, so it wakes up
+            # showing the new frame
+            display.power(lit > 0)
+        self._display_ua = self._display_current()
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+        if self.low_power:
+            brightness = brightness * INTENSITY_SCALE // 16
+        self._account()
+        self.display.set_brightness(brightness)
+        self._display_ua = self._display_current()
+
+    def hold(self, wait_ms):
+        """Spend up to wait_ms with nothing to do, sleeping if it's worth it.
+        Returns how long was slept, the caller waits out the rest."""
+        sleep_ms = wait_ms - self.wake_ms
+        if not self.low_power or sleep_ms < LIGHTSLEEP_MIN_MS:
+            self._idle_ms += wait_ms
+            return 0
+        start = ticks_ms()
+        machine.lightsleep(sleep_ms)
+        slept = ticks_diff(ticks_ms(), start)
+        if slept > sleep_ms:
+            # Woke late, so wake earlier from now on
+            self.wake_ms = min(self.wake_ms + slept - sleep_ms, LIGHTSLEEP_MIN_MS)
+        self.sleeps += 1
+        self._sleep_ms += slept
+        self._idle_ms += max(0, wait_ms - slept)
+        return slept
+
+    def lap(self):
+        """(ms, mAh, average mA) since the last lap, e.g. one pass of the
+        main loop, and start the next"""
+        self._account()
+        total = ticks_diff(self._changed, self._lap_start)
+        active = max(0, total - self._idle_ms - self._sleep_ms)
+        charge = (
+            self._spilled
+            + self._charge
+            + active * MCU_ACTIVE_UA
+            + self._idle_ms * MCU_IDLE_UA
+            + self._sleep_ms * MCU_SLEEP_UA
+        )
+        self._charge = 0
+        self._spilled = 0.0
+        self._idle_ms = 0
+        self._sleep_ms = 0
+        self._lap_start = self._changed
+        return total, charge / 3600000000, charge / total / 1000 if total else 0
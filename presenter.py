@@ -0,0 +1,217 @@
+# Description: Timer or second core driven display refresh fed from a ring of preallocated frames
+#
+# Producers (anim_runner, scroll_message) render ahead into the ring and
+# wait when it is full. A machine.Timer, or a loop on the RP2040's second
+# core, pops frames off the other end at their requested hold times and
+# pushes them to the MAX7219s, so a slow Python step or a gc.collect() in
+# the producer doesn't delay the display as long as the ring has frames
+# queued.
+
+import sys
+import time
+from array import array
+
+import machine
+
+from scheduler import sleep_ms
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+NO_BRIGHTNESS = 0xFF
+
+
+class FrameRing:
+    """Fixed number of frame slots, written by one producer and read by
+    one consumer. head is only moved by the producer and tail only by
+    the consumer, with one slot kept empty to tell full from empty, so
+    neither side needs a lock."""
+
+    def __init__(self, frame_size, slots=16):
+        self.slots = slots
+        self.frames = [bytearray(frame_size) for _ in range(slots)]
+        self.holds = array("H", [0] * slots)  # ms to show each frame for
+        self.brightness = bytearray(slots)  # Or NO_BRIGHTNESS to leave it
+        self.head = 0  # Next slot to fill
+        self.tail = 0  # Next slot to show
+
+    def __len__(self):
+        return (self.head - self.tail) % self.slots
+
+    def full(self):
+        return (self.head + 1) % self.slots == self.tail
+
+    def empty(self):
+        return self.head == self.tail
+
+    def push(self, frame, hold_ms, brightness=NO_BRIGHTNESS):
+        """Copy frame into the next slot. Check full() first."""
+        slot = self.head
+        target = self.frames[slot]
+        for p in range(len(target)):
+            target[p] = frame[p]
+        self.holds[slot] = hold_ms
+        self.brightness[slot] = brightness
+        self.head = (slot + 1) % self.slots
+
+
+class Presenter:
+    """Shows frames from a FrameRing on a max7219_matrix from a timer"""
+
+    def __init__(self, display, slots=16, timer_id=1, tick_ms=5):
+        self.display = display
+        self.ring = FrameRing(len(display.fb), slots)
+        self.tick_ms = tick_ms
+        self.hold_left = 0
+        self.underruns = 0  # Times the ring ran dry when a frame was due
+        self.stalls = 0  # Times a producer waited for a free slot
+        self._starved = False
+        self._drop = False
+        self._drop_to = 0  # ring.head when drop() was called
+        self._brightness = NO_BRIGHTNESS
+        self._start(timer_id)
+
+    def _start(self, timer_id):
+        self.timer = machine.Timer(timer_id)
+        self.timer.init(
+            mode=machine.Timer.PERIODIC, period=self.tick_ms, callback=self._tick
+        )
+
+    async def put(self, frame, hold_ms, brightness=NO_BRIGHTNESS, waiting=None):
+        """Queue a frame, waiting while the ring is full. waiting is called
+        while waiting, e.g. to raise Preempted."""
+        ring = self.ring
+        while ring.full():
+            self.stalls += 1
+            if waiting is not None:
+                waiting()
+            await sleep_ms(self.tick_ms)
+        ring.push(frame, hold_ms, brightness)
+
+    def drop(self):
+        """Skip every frame queued so far and the rest of the current hold,
+        e.g. when playback is preempted. Done from the timer, which owns
+        tail, but only up to where head is now, so frames queued after this
+        are still shown."""
+        self._drop_to = self.ring.head
+        self._drop = True
+
+    def _apply_drop(self):
+        """Move tail up to where head was at drop(). Returns True if a drop
+        was pending."""
+        if not self._drop:
+            return False
+        self._drop = False
+        ring = self.ring
+        # Unless the frames before it have already been shown meanwhile
+        if (self._drop_to - ring.tail) % ring.slots <= len(ring):
+            ring.tail = self._drop_to
+        return True
+
+    def set_brightness(self, brightness):
+        """Set the brightness straight away, without waiting for the queued
+        frames. Done from the timer, so the bus is only used from there."""
+        self._brightness = brightness
+
+    def _apply_brightness(self):
+        if self._brightness != NO_BRIGHTNESS:
+            self.display.set_brightness(self._brightness)
+            self._brightness = NO_BRIGHTNESS
+
+    async def drain(self):
+        """Wait until every queued frame has been shown"""
+        while not self.ring.empty():
+            await sleep_ms(self.tick_ms)
+
+    def _tick(self, timer):
+        # Runs from the timer: no allocation in here
+        self.hold_left -= self.tick_ms
+        ring = self.ring
+        if self._apply_drop():
+            self.hold_left = 0
+        self._apply_brightness()
+        while self.hold_left <= 0:
+            if ring.empty():
+                # Keep showing the last frame and take the next one as
+                # soon as it arrives
+                self._starving()
+                self.hold_left = 0
+                return
+            self.hold_left += self._show_next()
+
+    def _starving(self):
+        if not self._starved:
+            self._starved = True
+            self.underruns += 1
+
+    def _show_next(self):
+        """Show the frame at the tail of the ring and return its hold time"""
+        self._starved = False
+        ring = self.ring
+        display = self.display
+        slot = ring.tail
+        frame = ring.frames[slot]
+        fb = display.fb
+        for p in range(len(fb)):
+            fb[p] = frame[p]
+        display.show()
+        if ring.brightness[slot] != NO_BRIGHTNESS:
+            display.set_brightness(ring.brightness[slot])
+        hold_ms = ring.holds[slot]
+        ring.tail = (slot + 1) % ring.slots
+        return hold_ms
+
+    def deinit(self):
+        self.timer.deinit()
+
+
+def second_core():
+    """True if the display can have a core of its own. The ESP32-C3 has
+    _thread too, but only one core to run it on."""
+    return _thread is not None and sys.platform == "rp2"
+
+
+class CorePresenter(Presenter):
+    """Shows frames from a FrameRing from a loop on another core (the
+    RP2040's core 1). The default three slots make it a triple buffer:
+    one being shown, one ready and one being drawn. Same lock-free
+    handoff as the timer version, which is safe across cores because
+    head and tail each still have a single writer."""
+
+    def __init__(self, display, slots=3, tick_ms=1):
+        self.running = False
+        super().__init__(display, slots, None, tick_ms)
+
+    def _start(self, timer_id):
+        self.running = True
+        self.stopped = False
+        _thread.start_new_thread(self._run, ())
+
+    def _run(self):
+        ring = self.ring
+        due = time.ticks_ms()
+        while self.running:
+            if self._apply_drop():
+                due = time.ticks_ms()
+            self._apply_brightness()
+            now = time.ticks_ms()
+            wait = time.ticks_diff(due, now)
+            if wait > 0:
+                # Short sleeps, so a drop() doesn't wait out a long hold
+                time.sleep_ms(min(wait, self.tick_ms))
+            elif ring.empty():
+                self._starving()
+                due = now
+                time.sleep_ms(self.tick_ms)
+            else:
+                # From the previous deadline, so showing frames doesn't
+                # add up to drift
+                due = time.ticks_add(due, self._show_next())
+        self.stopped = True
+
+    def deinit(self):
+        self.running = False
+        while not self.stopped:
+            time.sleep_ms(self.tick_ms)
@@ -0,0 +1,101 @@
+# Description: Cooperative asyncio scheduler for the eyes, mouth and inputs
+
+import asyncio
+from time import ticks_add, ticks_diff, ticks_ms
+
+import heap
+import telemetry
+from commands import SAY, CommandQueue
+
+POLL_MS = 100  # Longest a hold goes without checking for queued messages
+
+try:
+    sleep_ms = asyncio.sleep_ms
+except AttributeError:  # CPython asyncio only has sleep()
+
+    async def sleep_ms(ms):
+        await asyncio.sleep(ms / 1000)
+
+
+class Preempted(Exception):
+    """Raised at a frame boundary when queued work should take over"""
+
+
+class Scheduler:
+    """Runs independent tasks and keeps drift-free frame deadlines.
+    Playback coroutines await frame() between frames. Deadlines advance by
+    the requested delay from the previous deadline rather than from now,
+    so time spent drawing and on the SPI bus doesn't add up."""
+
+    def __init__(self):
+        self.deadline = ticks_ms()
+        self.messages = CommandQueue()
+        self.preemptible = True
+        self.run_instant = None  # Called with commands applied between frames
+        # Called with each gap between frames, see power.PowerManager.hold
+        self.sleeper = None
+        self.overruns = 0  # Frames that started more than a frame late
+        self.poll_ms = POLL_MS
+
+    def post_message(self, message):
+        """Queue a message, taking over from playback at the next frame"""
+        self.messages.post(SAY, message)
+
+    def next_command(self):
+        """The next queued command, see commands.py, or None"""
+        return self.messages.pop()
+
+    def resync(self):
+        """Start deadlines afresh from now, e.g. after an idle gap"""
+        self.deadline = ticks_ms()
+
+    async def frame(self, delay_ms):
+        """Hold the current frame until delay_ms after the last deadline"""
+        if telemetry.enabled:
+            telemetry.frame_end()
+            heap.frame_end()
+        self.deadline = ticks_add(self.deadline, delay_ms)
+        remaining = ticks_diff(self.deadline, ticks_ms())
+        if heap.idle(remaining):
+            remaining = ticks_diff(self.deadline, ticks_ms())
+        if remaining > 0:
+            # Long holds wake up now and then so a queued message doesn't
+            # have to wait for the whole hold
+            while remaining > 0:
+                wait = min(remaining, self.poll_ms)
+                if self.sleeper is not None:
+                    wait -= self.sleeper(wait)
+                await sleep_ms(max(wait, 0))
+                self.check_preempt()
+                remaining = ticks_diff(self.deadline, ticks_ms())
+        else:
+            # Still give the other tasks a turn. If we've fallen behind by
+            # more than a frame, drop the backlog instead of rushing frames.
+            if -remaining > delay_ms:
+                self.overruns += 1
+                self.resync()
+            await sleep_ms(0)
+        if telemetry.enabled:
+            telemetry.frame_start(ticks_diff(ticks_ms(), self.deadline))
+            heap.frame_start()
+        self.check_preempt()
+
+    def check_preempt(self):
+        """Apply any commands that don't need to stop playback, then raise
+        Preempted if a queued one should take over now"""
+        if self.run_instant is not None:
+            command = self.messages.pop_instant()
+            while command is not None:
+                self.run_instant(command)
+                command = self.messages.pop_instant()
+        if self.messages and self.preemptible:
+            self.resync()
+            raise Preempted()
+
+    def run(self, *tasks):
+        """Run coroutines concurrently until they all finish"""
+
+        async def gather():
+            await asyncio.gather(*tasks)
+
+        asyncio.run(gather())
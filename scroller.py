@@ -0,0 +1,215 @@
+# Description: Pre-rendered text strips for scrolling messages across the matrix canvas
+
+from collections import OrderedDict
+
+from font_metrics import metrics_for
+
+STRIP_CACHE_BYTES = 4096  # Total size of rendered strips kept for reuse
+
+
+def _proportional_columns(font, message, gap, rows):
+    """Set message with each glyph only as wide as its lit columns and gap
+    blank columns between glyphs (less where kerning allows). Fills rows
+    with the next 8 columns and yields, then yields blank columns for ever."""
+    metrics = metrics_for(font)
+    pending = [0] * 8  # Columns set but not handed out yet, per row
+    have = 0
+    previous = -1
+    for char in message:
+        index = metrics.index(char)
+        left = metrics.left[index]
+        width = metrics.width[index]
+        advance = width
+        if previous >= 0:
+            advance += gap - min(gap, metrics.kern(previous, index))
+        previous = index
+        glyph = font.glyph(index)
+        for row in range(8):
+            ink = ((glyph[row] << left) & 0xFF) >> (8 - width)
+            pending[row] = pending[row] << advance | ink
+        have += advance
+        while have >= 8:
+            have -= 8
+            for row in range(8):
+                rows[row] = pending[row] >> have
+                pending[row] &= (1 << have) - 1
+            yield
+    for row in range(8):
+        rows[row] = (pending[row] << (8 - have)) & 0xFF
+    yield
+    for row in range(8):
+        rows[row] = 0
+    while True:
+        yield
+
+
+def render_strip(font, message, cols, gap=None):
+    """Render message once into a strip of 8 packed pixel rows.
+    Row r holds the message's pixels in strip[r * stride:(r + 1) * stride],
+    one byte per 8 columns, MSB leftmost. A blank screen of padding either
+    side lets the text scroll in from the right edge and off the left.
+    With gap None every glyph takes 8 columns, otherwise glyphs are set
+    proportionally, gap columns apart. Returns (strip, stride, length),
+    where length is the number of scroll positions."""
+    if gap is not None:
+        width = metrics_for(font).text_width(message, gap)
+        used = (width + 7) // 8
+        stride = used + 2 * cols + 1
+        strip = bytearray(8 * stride)
+        rows = bytearray(8)
+        columns = _proportional_columns(font, message, gap, rows)
+        for pos in range(cols, cols + used):
+            next(columns)
+            for row in range(8):
+                strip[row * stride + pos] = rows[row]
+        # One past the text, so the last frame is blank as with fixed widths
+        return strip, stride, 8 * cols + width + 1
+
+    blank = font[" "]
+    stride = len(message) + 2 * cols
+    strip = bytearray(8 * stride)
+    pos = cols
+    for char in message:
+        glyph = font.get(char, blank)
+        for row in range(8):
+            strip[row * stride + pos] = glyph[row]
+        pos += 1
+    return strip, stride, 8 * (len(message) + cols)
+
+
+class StripCache:
+    """Rendered strips kept in least-recently-used order, bounded in bytes"""
+
+    def __init__(self, max_bytes=STRIP_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._strips = OrderedDict()
+
+    def get(self, font, message, cols, gap=None):
+        """Return (strip, stride, length), rendering it if it is not cached"""
+        key = (id(font), message, cols, gap)
+        entry = self._strips.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            entry = render_strip(font, message, cols, gap)
+        else:
+            self.hits += 1
+            self.used_bytes -= len(entry[0])
+        # Strips too big for the budget are still returned, just not kept
+        if len(entry[0]) <= self.max_bytes:
+            while self.used_bytes + len(entry[0]) > self.max_bytes:
+                oldest = next(iter(self._strips))
+                self.used_bytes -= len(self._strips.pop(oldest)[0])
+            self._strips[key] = entry
+            self.used_bytes += len(entry[0])
+        return entry
+
+    def fits(self, message, cols, gap=None):
+        """True if a strip for message would fit in the cache budget. For
+        proportional text this assumes the widest glyphs, so it may say no
+        to a strip that would just fit."""
+        chars = len(message)
+        if gap is not None:
+            chars = (chars * (8 + gap) + 7) // 8 + 1
+        return 8 * (chars + 2 * cols) <= self.max_bytes
+
+    def clear(self):
+        self._strips = OrderedDict()
+        self.used_bytes = 0
+
+
+strip_cache = StripCache()
+
+
+def _text_band(fb, cols):
+    """Blank the canvas above and below the 8 rows text scrolls along,
+    centred for layouts more than one module high, and return the top row"""
+    height = len(fb) // cols
+    top = (height - 8) // 2
+    for p in range(top * cols):
+        fb[p] = 0
+    for p in range((top + 8) * cols, len(fb)):
+        fb[p] = 0
+    return top
+
+
+def _shift_into(fb, cols, strip, stride, byte_pos, shift, top=0):
+    """Copy the canvas-wide window at byte_pos + shift pixels into fb,
+    from canvas row top down"""
+    back = 8 - shift
+    for row in range(8):
+        src = row * stride + byte_pos
+        dst = (top + row) * cols
+        for col in range(cols):
+            fb[dst + col] = (strip[src + col] << shift | strip[src + col + 1] >> back) & 0xFF
+
+
+def strip_frames(fb, cols, font, message, cache=strip_cache, gap=None):
+    """Fill fb with each scroll frame of a pre-rendered, cached strip,
+    yielding after each frame"""
+    strip, stride, length = cache.get(font, message, cols, gap)
+    top = _text_band(fb, cols)
+    for x in range(length):
+        _shift_into(fb, cols, strip, stride, x >> 3, x & 7, top)
+        yield
+
+
+def lazy_frames(fb, cols, font, message, gap=None):
+    """Like strip_frames, but only renders the glyphs just ahead of the
+    viewport, so RAM use does not depend on the message length"""
+    if gap is not None:
+        yield from _lazy_proportional_frames(fb, cols, font, message, gap)
+        return
+    blank = font[" "]
+    stride = cols + 1
+    window = bytearray(8 * stride)
+    top = _text_band(fb, cols)
+    # The window starts out as the blank lead-in, then takes one glyph per
+    # byte step, followed by the blank lead-out
+    length = len(message)
+    for char_pos in range(length + cols):
+        if char_pos < length:
+            glyph = font.get(message[char_pos], blank)
+        else:
+            glyph = blank
+        for row in range(8):
+            base = row * stride
+            for col in range(cols):
+                window[base + col] = window[base + col + 1]
+            window[base + cols] = glyph[row]
+        for shift in range(8):
+            _shift_into(fb, cols, window, stride, 0, shift, top)
+            yield
+
+
+def _lazy_proportional_frames(fb, cols, font, message, gap):
+    length = 8 * cols + metrics_for(font).text_width(message, gap) + 1
+    stride = cols + 1
+    window = bytearray(8 * stride)
+    rows = bytearray(8)
+    columns = _proportional_columns(font, message, gap, rows)
+    top = _text_band(fb, cols)
+    for x in range(length):
+        shift = x & 7
+        if not shift:
+            # The window moves on a byte, taking the next 8 columns
+            next(columns)
+            for row in range(8):
+                base = row * stride
+                for col in range(cols):
+                    window[base + col] = window[base + col + 1]
+                window[base + cols] = rows[row]
+        _shift_into(fb, cols, window, stride, 0, shift, top)
+        yield
+
+
+def frames(fb, cols, font, message, cache=strip_cache, gap=None):
+    """Scroll frames for message, cached if the strip fits the cache
+    budget, otherwise rendered lazily. gap as for render_strip. On layouts
+    more than one module high the text is centred vertically and the rest
+    of the canvas blanked."""
+    if cache.fits(message, cols, gap):
+        return strip_frames(fb, cols, font, message, cache, gap)
+    return lazy_frames(fb, cols, font, message, gap)
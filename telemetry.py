@@ -0,0 +1,142 @@
+# Description: Frame timing and throughput telemetry, queryable from the REPL
+#
+# >>> import telemetry
+# >>> telemetry.enable()
+# ... let it play for a while, then press Ctrl-C and ...
+# >>> telemetry.report()
+#
+# Call sites check telemetry.enabled before taking any timestamps, so when it
+# is off the cost is one attribute lookup per frame.
+
+import gc
+from array import array
+from time import ticks_diff, ticks_us
+
+BUCKETS = 16
+
+enabled = False
+
+
+class Histogram:
+    """Counts in power of two buckets. Bucket 0 holds 0, bucket n holds
+    2**(n-1) up to 2**n - 1, and the last bucket holds everything above."""
+
+    def __init__(self, name, unit):
+        self.name = name
+        self.unit = unit
+        self.counts = array("L", [0] * BUCKETS)
+        self.reset()
+
+    def reset(self):
+        for bucket in range(BUCKETS):
+            self.counts[bucket] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        if value < 0:
+            value = 0
+        bucket = 0
+        rest = value
+        while rest and bucket < BUCKETS - 1:
+            rest >>= 1
+            bucket += 1
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total // self.count if self.count else 0
+
+    def report(self):
+        print(
+            f"{self.name}: n={self.count} mean={self.mean()}{self.unit} "
+            + f"max={self.max}{self.unit}"
+        )
+        for bucket in range(BUCKETS):
+            if self.counts[bucket]:
+                low = (1 << bucket) >> 1
+                print(f"  >={low:>6}{self.unit}: {self.counts[bucket]}")
+
+
+compute = Histogram("frame compute", "us")  # Python time per frame, bus excluded
+bus = Histogram("bus", "us")  # SPI time per show()
+overshoot = Histogram("deadline overshoot", "ms")  # Late frame starts
+gc_pause = Histogram("gc pause", "us")  # Explicit collections
+command_latency = Histogram("command latency", "ms")  # Serial command arriving to starting
+
+frames = 0
+_first_frame = 0
+_last_frame = 0
+_frame_start = 0
+_frame_bus = 0
+
+
+def enable(on=True):
+    """Turn telemetry on or off, starting from a clean slate"""
+    global enabled
+    reset()
+    enabled = on
+
+
+def reset():
+    global frames, _frame_bus, _frame_start
+    for histogram in (compute, bus, overshoot, gc_pause, command_latency):
+        histogram.reset()
+    frames = 0
+    _frame_start = 0
+    _frame_bus = 0
+
+
+def frame_end():
+    """Call as a frame's drawing finishes, before waiting for its deadline"""
+    global frames, _first_frame, _last_frame
+    now = ticks_us()
+    if _frame_start:
+        compute.add(ticks_diff(now, _frame_start) - _frame_bus)
+    if not frames:
+        _first_frame = now
+    _last_frame = now
+    frames += 1
+
+
+def frame_start(late_ms):
+    """Call as a frame starts, late_ms after its deadline"""
+    global _frame_start, _frame_bus
+    overshoot.add(late_ms)
+    _frame_start = ticks_us()
+    _frame_bus = 0
+
+
+def bus_time(elapsed_us):
+    """Call with the SPI time of each show()"""
+    global _frame_bus
+    bus.add(elapsed_us)
+    _frame_bus += elapsed_us
+
+
+def collect():
+    """gc.collect(), timed if telemetry is on"""
+    if not enabled:
+        gc.collect()
+        return
+    start = ticks_us()
+    gc.collect()
+    gc_pause.add(ticks_diff(ticks_us(), start))
+
+
+def fps():
+    """Average frames per second since telemetry was enabled"""
+    if frames < 2 or _last_frame == _first_frame:
+        return 0
+    return (frames - 1) * 1000000 // ticks_diff(_last_frame, _first_frame)
+
+
+def report():
+    """Print everything gathered so far"""
+    print(f"frames: {frames} at {fps()} fps")
+    for histogram in (compute, bus, overshoot, gc_pause, command_latency):
+        histogram.report()
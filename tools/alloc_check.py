@@ -0,0 +1,204 @@
+"""
+Check that the steady-state display path allocates nothing: once the
+shadow registers are warm, show(), show_char(), write() and
+set_brightness() in max7219_matrix.py must not allocate a single byte.
+
+The chain is wired to a null SPI bus and CS pin, so only the driver's own
+allocations are counted. On the host they come from tracemalloc, counting
+anything allocated with max7219_matrix.py anywhere on the stack, looked at
+as each driver call returns (so temporaries held in locals show up) and
+again at the end. Counters going up are left out: CPython makes a new
+object for every int over 256, where MicroPython keeps ints up to 2**30
+out of the heap. Every SPI write must also come from the driver's own
+packet buffer.
+
+The same file runs on MicroPython too, where gc.mem_alloc() is compared
+before and after with collections off.
+
+Each case runs on an upright chain and again on one with a module turned
+sideways and a mirrored one, which show() turns in place.
+
+Usage: python tools/alloc_check.py [--rounds 50]
+"""
+
+import sys
+
+MICROPYTHON = sys.implementation.name == "micropython"
+
+if not MICROPYTHON:
+    import os
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim"))
+    import run
+
+    run.setup()
+
+import gc  # noqa: E402
+
+import matrix_fonts  # noqa: E402
+import max7219_matrix as driver  # noqa: E402
+
+ROUNDS = 50
+GLYPHS = ("straight", "straightX2Left3")
+# (name, orientation) of each chain checked
+CHAINS = (("upright", None), ("turned", ((90, False, False), (0, True, False))))
+
+
+class NullSPI:
+    """Throws writes away, counting any not sent from the driver's own
+    preallocated packet buffer"""
+
+    def __init__(self):
+        self.buffer = None
+        self.other_buffers = 0
+
+    def write(self, data):
+        if data is not self.buffer:
+            self.other_buffers += 1
+
+
+class NullPin:
+    def value(self, level=None):
+        return 0
+
+
+def cases(display, glyphs):
+    """Name: function doing one round of a steady-state display call"""
+    first, second = glyphs[0], glyphs[1]
+    state = [0]
+
+    def alternate():
+        # Every row changes, so every row goes out on the bus
+        state[0] ^= 1
+        if state[0]:
+            display.show_char(first, second)
+        else:
+            display.show_char(second, first)
+
+    def same():
+        display.show_char(first, first)
+        display.show_char(first, first)
+
+    def forced():
+        display.show(True)
+
+    def brightness():
+        display.set_brightness(state[0] + 1)
+        state[0] ^= 1
+
+    def scroll():
+        # A row at a time across both modules, like a scroll step
+        fb = display.fb
+        for p in range(len(fb)):
+            fb[p] = (fb[p] << 1 | fb[p] >> 7) & 0xFF
+            display.show()
+
+    return {
+        "show_char changing": alternate,
+        "show_char unchanged": same,
+        "show forced": forced,
+        "set_brightness": brightness,
+        "show after each row": scroll,
+    }
+
+
+if MICROPYTHON:
+
+    def allocated(action, rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            before = gc.mem_alloc()
+            for _ in range(rounds):
+                action()
+            return gc.mem_alloc() - before
+        finally:
+            gc.enable()
+
+else:
+    import re
+    import tracemalloc
+
+    def _host_only_lines(file_name):
+        """Line numbers in file_name that allocate on CPython but not on
+        MicroPython: counters going up, e.g. self.misses += 1, and def
+        lines, where the frame objects the profile hook needs are counted"""
+        with open(file_name, encoding="utf-8") as infile:
+            return [
+                number
+                for number, line in enumerate(infile, 1)
+                if re.fullmatch(r"\s*(self\.\w+ \+= \w+|def .*:)\s*", line)
+            ]
+
+    # Leaving out this check's own bookkeeping, which runs while a driver
+    # call is on the stack
+    _filters = [
+        tracemalloc.Filter(True, driver.__file__, all_frames=True),
+        tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+        tracemalloc.Filter(False, __file__),
+    ] + [
+        tracemalloc.Filter(False, driver.__file__, number)
+        for number in _host_only_lines(driver.__file__)
+    ]
+
+    def allocated(action, rounds):
+        # Also look as each driver call returns, while its locals are alive
+        worst = [0]
+
+        def traced_size():
+            snapshot = tracemalloc.take_snapshot().filter_traces(_filters)
+            return sum(stat.size for stat in snapshot.statistics("filename"))
+
+        def on_return(frame, event, arg):
+            if event == "return" and frame.f_code.co_filename == driver.__file__:
+                size = traced_size()
+                if size > worst[0]:
+                    worst[0] = size
+
+        tracemalloc.start(25)
+        sys.setprofile(on_return)
+        try:
+            for _ in range(rounds):
+                action()
+        finally:
+            sys.setprofile(None)
+        try:
+            return max(worst[0], traced_size())
+        finally:
+            tracemalloc.stop()
+
+
+def main(rounds=ROUNDS):
+    glyphs = [bytes(value & 0xFF for value in matrix_fonts.eyes[name]) for name in GLYPHS]
+    failed = 0
+    for chain_name, orientation in CHAINS:
+        spi = NullSPI()
+        display = driver.max7219_matrix(spi, NullPin(), 2, 1, orientation=orientation)
+        spi.buffer = display._tx_mv
+        print(chain_name + ":")
+        for name, action in cases(display, glyphs).items():
+            # Warm up: the first show writes every row and fills the shadow
+            display.show(True)
+            action()
+            action()
+            spi.other_buffers = 0
+            size = allocated(action, rounds)
+            print("  %-22s %6d bytes, %d writes from other buffers" % (name, size, spi.other_buffers))
+            if size or spi.other_buffers:
+                failed += 1
+    if failed:
+        print("FAILED: %d display calls allocate" % failed)
+        return 1
+    print("OK: the display path allocates nothing once warm")
+    return 0
+
+
+if __name__ == "__main__":
+    if MICROPYTHON:
+        main()
+    else:
+        import argparse
+
+        parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+        parser.add_argument("--rounds", type=int, default=ROUNDS)
+        sys.exit(main(parser.parse_args().rounds))
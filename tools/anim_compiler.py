@@ -0,0 +1,118 @@
+"""
+Compile eyes_ani.json into the binary format read by anim_file.py.
+
+Runs on the host, not the device. Every glyph name is checked against
+matrix_fonts before anything is written, so a typo fails here instead of
+mid-animation on the pumpkin.
+
+Usage: python tools/anim_compiler.py [eyes_ani.json] [eyes_ani.bin] [font]
+"""
+
+import json
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import anim_file  # noqa: E402
+import matrix_fonts  # noqa: E402
+
+MAX_DELAY_MS = 0xFFFF
+MAX_BRIGHTNESS = 15
+
+
+def _name_bytes(name):
+    encoded = name.encode()
+    if len(encoded) > 255:
+        raise ValueError(f"Name too long: {name}")
+    return bytes([len(encoded)]) + encoded
+
+
+def validate(anims, font):
+    """Return a list of problems found in anims, empty if it compiles"""
+    problems = []
+    for anim_name, frames in anims.items():
+        for number, frame in enumerate(frames):
+            where = f"{anim_name}[{number}]"
+            unknown = set(frame) - {"l", "r", "d", "br"}
+            if unknown:
+                problems.append(f"{where}: unknown keys {sorted(unknown)}")
+            if ("l" in frame) != ("r" in frame):
+                problems.append(f"{where}: needs both 'l' and 'r' or neither")
+            for side in ("l", "r"):
+                name = frame.get(side)
+                if name is not None and name not in font:
+                    problems.append(f"{where}: no glyph named '{name}'")
+            brightness = frame.get("br")
+            if brightness is not None and not 0 <= brightness <= MAX_BRIGHTNESS:
+                problems.append(f"{where}: brightness {brightness} not in 0-15")
+            delay = frame.get("d", 0)
+            if not 0 <= round(delay * 1000) <= MAX_DELAY_MS:
+                problems.append(f"{where}: delay {delay}s out of range")
+    return problems
+
+
+def compile_anims(anims, font):
+    """Return the compiled bytes for anims, which must already validate"""
+    glyph_names = []
+    for frames in anims.values():
+        for frame in frames:
+            for side in ("l", "r"):
+                name = frame.get(side)
+                if name is not None and name not in glyph_names:
+                    glyph_names.append(name)
+    if len(glyph_names) >= anim_file.NONE or len(anims) > 255:
+        raise ValueError("Too many glyphs or animations for one file")
+
+    header = bytearray(anim_file.MAGIC)
+    header += bytes([anim_file.VERSION, len(glyph_names), len(anims)])
+    for name in glyph_names:
+        header += _name_bytes(name)
+    index_size = sum(
+        len(_name_bytes(name)) + anim_file.INDEX_SIZE for name in anims
+    )
+
+    index = bytearray()
+    body = bytearray()
+    offset = len(header) + index_size
+    for anim_name, frames in anims.items():
+        index += _name_bytes(anim_name)
+        index += struct.pack(anim_file.INDEX_FORMAT, offset + len(body), len(frames))
+        for frame in frames:
+            left = frame.get("l")
+            right = frame.get("r")
+            brightness = frame.get("br")
+            body += struct.pack(
+                anim_file.FRAME_FORMAT,
+                anim_file.NONE if left is None else glyph_names.index(left),
+                anim_file.NONE if right is None else glyph_names.index(right),
+                round(frame.get("d", 0) * 1000),
+                anim_file.NONE if brightness is None else brightness,
+            )
+    return bytes(header + index + body)
+
+
+def main(argv):
+    source = argv[1] if len(argv) > 1 else "eyes_ani.json"
+    target = argv[2] if len(argv) > 2 else os.path.splitext(source)[0] + ".bin"
+    font = getattr(matrix_fonts, argv[3] if len(argv) > 3 else "eyes")
+
+    with open(source, encoding="utf-8") as infile:
+        anims = json.load(infile)
+
+    problems = validate(anims, font)
+    if problems:
+        for problem in problems:
+            print(f"{source}: {problem}", file=sys.stderr)
+        return 1
+
+    data = compile_anims(anims, font)
+    with open(target, "wb") as outfile:
+        outfile.write(data)
+    print(f"Wrote {len(anims)} animations to {target} ({len(data)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
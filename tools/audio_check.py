@@ -0,0 +1,153 @@
+"""
+Check the eyes react to sound: main.py runs on the simulator with AUDIO_PIN
+set and the fake ADC playing a recording, quiet noise with bursts of tone at
+set times unless a WAV file is given.
+
+Checks that:
+- every burst widens the eyes within a frame of it starting
+- louder bursts give wider eyes
+- the animations carry on once it has gone quiet again
+
+Usage: python tools/audio_check.py [--wav sound.wav]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim"))
+
+import run  # noqa: E402
+
+PIN = 26
+RATE_HZ = 8000  # Of the recording, faster than the sampler so it has to keep up
+SECONDS = 40
+NOISE = 600  # Peak of the background hiss, in u16 ADC units
+# (start ms, length ms, amplitude in u16 ADC units)
+BURSTS = ((6000, 400, 9000), (14000, 600, 18000), (24000, 800, 30000))
+TONE_HZ = 440
+
+
+def synthesize():
+    """u16 samples of hiss with tone bursts, centred on mid scale"""
+    rng = random.Random(7)
+    samples = []
+    for n in range(SECONDS * RATE_HZ):
+        value = rng.randint(-NOISE, NOISE)
+        ms = n * 1000 // RATE_HZ
+        for start_ms, length_ms, amplitude in BURSTS:
+            if start_ms <= ms < start_ms + length_ms:
+                value += int(amplitude * math.sin(2 * math.pi * TONE_HZ * n / RATE_HZ))
+        samples.append(max(0, min(65535, 32768 + value)))
+    return samples, RATE_HZ
+
+
+def read_wav(file_name):
+    """u16 samples of the first channel of a 8 or 16 bit WAV file"""
+    with wave.open(file_name, "rb") as infile:
+        width = infile.getsampwidth()
+        channels = infile.getnchannels()
+        rate_hz = infile.getframerate()
+        data = infile.readframes(infile.getnframes())
+    step = width * channels
+    if width == 1:
+        samples = [data[p] << 8 for p in range(0, len(data), step)]
+    elif width == 2:
+        samples = [
+            (int.from_bytes(data[p : p + 2], "little", signed=True) + 32768)
+            for p in range(0, len(data), step)
+        ]
+    else:
+        raise SystemExit(f"{file_name}: only 8 and 16 bit WAV files")
+    return samples, rate_hz
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--wav", help="WAV file to play instead of the made up bursts")
+    args = parser.parse_args(argv)
+
+    clock, chain = run.setup()
+    samples, rate_hz = read_wav(args.wav) if args.wav else synthesize()
+    clock.limit_us = (len(samples) * 1000 // rate_hz) * 1000
+    sys.stdin = open(os.devnull, "rb")
+
+    import machine
+
+    import main as pumpkin
+    import matrix_fonts
+
+    machine.ADC.feed(PIN, samples, rate_hz, 0)
+    pumpkin.AUDIO_PIN = PIN
+    chain.cols = pumpkin.MATRIX_COLS
+    chain.rows = pumpkin.MATRIX_ROWS
+
+    reactions = []  # (virtual ms, frames shown by then)
+    react_to_sound = pumpkin.react_to_sound
+
+    async def recording_react():
+        reactions.append((clock.now_us // 1000, len(chain.frames)))
+        await react_to_sound()
+
+    pumpkin.react_to_sound = recording_react
+    try:
+        pumpkin.main()
+    except SystemExit:
+        pass
+    chain.flush()
+    sampler = pumpkin.sampler
+
+    # What each eye glyph looks like on the chain, both eyes the same
+    chain_glyphs = {}
+    for name in matrix_fonts.eyes:
+        pumpkin.show_char(matrix_fonts.eyes[name], matrix_fonts.eyes[name])
+        pumpkin.max7219_eyes.show()
+        chain_glyphs[chain.frame()] = name
+    wide = {name: size for size, name in enumerate(pumpkin.audio.GLYPHS) if size}
+
+    failures = []
+    if args.wav:
+        print(f"{len(reactions)} reactions to {args.wav}")
+    elif len(reactions) != len(BURSTS):
+        failures.append(f"{len(reactions)} reactions to {len(BURSTS)} bursts")
+    widest = []
+    for (start_ms, _, amplitude), (at_ms, first) in zip(BURSTS if not args.wav else (), reactions):
+        shown = [
+            (frame_ms, wide[chain_glyphs[frame]])
+            for frame_ms, frame, _ in chain.frames[first:]
+            if chain_glyphs.get(frame) in wide and frame_ms < start_ms + 2000
+        ]
+        if not shown:
+            failures.append(f"the burst at {start_ms}ms never widened the eyes")
+            continue
+        latency = shown[0][0] - start_ms
+        widest.append(max(size for _, size in shown))
+        print(
+            f"burst at {start_ms}ms, amplitude {amplitude}: eyes widened after {latency}ms, "
+            + f"to {pumpkin.audio.GLYPHS[widest[-1]]}"
+        )
+        if latency > pumpkin.AUDIO_FRAME_MS:
+            failures.append(f"the burst at {start_ms}ms took {latency}ms to show")
+    if widest != sorted(widest):
+        failures.append("louder bursts didn't give wider eyes")
+    later = [frame for at_ms, frame, _ in chain.frames if at_ms > BURSTS[-1][0] + 4000]
+    if not args.wav and not any(chain_glyphs.get(frame) not in wide for frame in later):
+        failures.append("the animations didn't carry on after the last burst")
+
+    print(
+        f"sampler: latency up to {sampler.max_latency_ms}ms from onset to frame, "
+        + f"{sampler.overruns} overruns"
+    )
+    if failures:
+        for failure in failures:
+            print("FAILED: " + failure)
+        return 1
+    print("OK: the eyes reacted to every burst within a frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
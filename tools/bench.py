@@ -0,0 +1,180 @@
+"""
+Benchmark the rendering pipeline on the host simulator.
+
+Each case runs device code against the fake SPI and MAX7219 chain from
+tools/sim and reports SPI transactions, bytes written, CS toggles, heap
+allocated (peak and left over, from tracemalloc) and how many frames per
+second the host can render with sleeps taking no time. Host frames per
+second are only comparable between runs on the same machine; the bus and
+heap numbers are exact.
+
+Usage:
+    python tools/bench.py                 compare against tools/bench_baseline.json
+    python tools/bench.py --save          write a new baseline
+    python tools/bench.py --only scroll   run the cases whose name contains "scroll"
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim"))
+
+import run as sim  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+METRICS = ("transactions", "bytes", "cs_toggles", "alloc_peak", "alloc_net", "frames", "fps")
+LOWER_IS_BETTER = ("transactions", "bytes", "cs_toggles", "alloc_peak", "alloc_net")
+
+SHORT_MESSAGE = " Happy Halloween! "
+# Deterministic multi-kilobyte message, like the long ones in main()
+LONG_MESSAGE = " " + " ".join(
+    "Double, double toil and trouble; fire burn and caldron bubble %d." % n
+    for n in range(40)
+)
+
+clock, chain = sim.setup()
+chain.record_frames = False  # The frame log would count as allocations
+# One event loop for every case, so creating it isn't counted as allocation
+loop = asyncio.new_event_loop()
+
+import main as pumpkin  # noqa: E402
+import matrix_fonts  # noqa: E402
+
+
+def _frames_shown(action):
+    """Run action and count the frames it put on the display"""
+    shown = [0]
+    real_show = pumpkin.max7219_eyes.show
+
+    def counting_show(force=False):
+        shown[0] += 1
+        real_show(force)
+
+    pumpkin.max7219_eyes.show = counting_show
+    try:
+        action()
+    finally:
+        del pumpkin.max7219_eyes.show
+    return shown[0]
+
+
+def _reset_display():
+    pumpkin.max7219_eyes.clear()
+    pumpkin.max7219_eyes.show(force=True)
+    pumpkin.scheduler.resync()
+    chain.reset_counts()
+
+
+def measure(action):
+    """Metrics for action, a function taking no arguments. The bus and
+    speed numbers come from a first run. Allocations come from a second,
+    traced run, so they show the steady state with caches already warm."""
+    _reset_display()
+    started = time.perf_counter()
+    frames = _frames_shown(action)
+    elapsed = time.perf_counter() - started
+    result = {
+        "transactions": chain.transactions,
+        "bytes": chain.bytes_written,
+        "cs_toggles": chain.cs_toggles,
+        "frames": frames,
+        "fps": round(frames / elapsed) if elapsed else 0,
+    }
+
+    _reset_display()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    action()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result["alloc_peak"] = peak - before
+    result["alloc_net"] = current - before
+    return result
+
+
+def _play(coroutine_function, *args):
+    def action():
+        loop.run_until_complete(coroutine_function(*args))
+
+    return action
+
+
+def cases():
+    """Benchmark name: function to run, for every case"""
+    found = {}
+    font = matrix_fonts.textFont1
+    found["scroll_short"] = _play(pumpkin.scroll_message, font, SHORT_MESSAGE)
+    found["scroll_long"] = _play(pumpkin.scroll_message, font, LONG_MESSAGE)
+
+    anims = pumpkin.load_anims(os.path.join(sim.ROOT, "eyes_ani.bin"))
+    for name in anims.names():
+        found["anim_" + name] = _play(pumpkin.anim_runner, anims, name, matrix_fonts.eyes)
+
+    eyes = matrix_fonts.eyes
+    glyphs = [eyes[name] for name in eyes]
+
+    def show_char_changing():
+        for _ in range(10):
+            for left, right in zip(glyphs, glyphs[1:]):
+                pumpkin.max7219_eyes.show_char(left, right)
+
+    def show_char_same():
+        for _ in range(500):
+            pumpkin.max7219_eyes.show_char(eyes["straight"], eyes["straight"])
+
+    found["show_char_changing"] = show_char_changing
+    found["show_char_same"] = show_char_same
+    return found
+
+
+def compare(results, baseline):
+    """Print each metric next to its baseline value"""
+    for name, result in results.items():
+        print(name)
+        base = baseline.get(name, {})
+        for metric in METRICS:
+            value = result[metric]
+            line = f"  {metric:<13}{value:>10}"
+            if metric in base and base[metric] != value:
+                old = base[metric]
+                change = (value - old) * 100 / old if old else float("inf")
+                better = (value < old) == (metric in LOWER_IS_BETTER)
+                line += f"  was {old:>10}  {change:+7.1f}% {'better' if better else 'worse'}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--only", default="", help="only run cases whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, action in cases().items():
+        if args.only in name:
+            results[name] = measure(action)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as infile:
+            baseline = json.load(infile)
+    compare(results, baseline)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as outfile:
+            json.dump(baseline, outfile, indent=2, sort_keys=True)
+            outfile.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
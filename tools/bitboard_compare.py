@@ -0,0 +1,142 @@
+"""
+Compare the per-frame cost of compositing glyphs as 64 bit boards
+(bitboard.py) against looping over their 8 rows, and check that every
+glyph in matrix_fonts survives packing into a board and back.
+
+The frames are the kind the eyes need: a pupil cut out of the eye white
+at an offset, with an eyelid clipping off the top rows, and one step of
+a scroll across two modules. The board times include unpacking the
+result back into rows for the display.
+
+Runs on the host, or on the device if copied there with bitboard.py and
+matrix_fonts.py.
+
+Usage: python tools/bitboard_compare.py
+"""
+
+import os
+import sys
+
+try:
+    _here = os.path.dirname(__file__)
+except AttributeError:  # MicroPython's os has no path module
+    _here = None
+if _here is not None:
+    sys.path.insert(0, os.path.join(_here, ".."))
+
+import bitboard  # noqa: E402
+import matrix_fonts  # noqa: E402
+
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+
+TABLES = ("textFont1", "eyes", "shapes")
+FRAMES = 20000
+PUPIL = (0x00, 0x00, 0x18, 0x3C, 0x3C, 0x18, 0x00, 0x00)
+
+
+def check_lossless():
+    """Number of glyphs that round trip, and the names of any that don't"""
+    checked = 0
+    failed = []
+    for table_name in TABLES:
+        table = getattr(matrix_fonts, table_name)
+        for name, board in bitboard.pack_table(table).items():
+            checked += 1
+            if bytes(bitboard.to_rows(board)) != bytes(table[name][row] & 0xFF for row in range(8)):
+                failed.append(table_name + "." + name)
+    return checked, failed
+
+
+def look_rows(white, pupil, dx, dy, lid, out):
+    """Pupil cut out of the white, moved dx right and dy down, with the
+    top lid rows closed, one row at a time"""
+    for row in range(8):
+        if row < lid:
+            out[row] = 0
+            continue
+        source = row - dy
+        cut = pupil[source] if 0 <= source < 8 else 0
+        cut = (cut >> dx if dx >= 0 else cut << -dx) & 0xFF
+        out[row] = white[row] & ~cut & 0xFF
+
+
+def look_board(white, pupil, dx, dy, lid, out):
+    """The same as look_rows with boards"""
+    eye = bitboard.layer(white, 0, bitboard.shift(pupil, dx, dy))
+    eye = bitboard.clip(eye, bitboard.shift_down(bitboard.FULL, lid))
+    bitboard.to_rows(eye, out)
+
+
+def scroll_rows(left, middle, right, n, out):
+    """Two modules' worth of the view n columns into three glyphs"""
+    back = 8 - n
+    for row in range(8):
+        out[row] = (left[row] << n | middle[row] >> back) & 0xFF
+        out[8 + row] = (middle[row] << n | right[row] >> back) & 0xFF
+
+
+def scroll_board(left, middle, right, n, out):
+    bitboard.to_rows(bitboard.scroll_pair(left, middle, n), out)
+    bitboard.to_rows(bitboard.scroll_pair(middle, right, n), out[8:])
+
+
+def time_frames(draw):
+    """Microseconds per frame for draw(frame number), best of 3 runs"""
+    best = None
+    for _ in range(3):
+        start = ticks_us()
+        for frame in range(FRAMES):
+            draw(frame)
+        elapsed = ticks_diff(ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / FRAMES
+
+
+def main():
+    checked, failed = check_lossless()
+    print("%d glyphs packed and unpacked, %d differ %s" % (checked, len(failed), failed or ""))
+
+    white = matrix_fonts.eyes["noEyeball"]
+    white_board = bitboard.pack(white)
+    pupil_board = bitboard.pack(PUPIL)
+    font = matrix_fonts.textFont1
+    glyphs = [font[char] for char in "Boo"]
+    boards = [bitboard.pack(glyph) for glyph in glyphs]
+    out = bytearray(16)
+    out_view = memoryview(out)
+
+    results = (
+        (
+            "look",
+            time_frames(lambda f: look_rows(white, PUPIL, f % 5 - 2, f % 3 - 1, f % 4, out)),
+            time_frames(
+                lambda f: look_board(white_board, pupil_board, f % 5 - 2, f % 3 - 1, f % 4, out)
+            ),
+        ),
+        (
+            "scroll",
+            time_frames(lambda f: scroll_rows(glyphs[0], glyphs[1], glyphs[2], f % 8, out)),
+            time_frames(lambda f: scroll_board(boards[0], boards[1], boards[2], f % 8, out_view)),
+        ),
+    )
+    for name, rows_us, board_us in results:
+        print(
+            "%-7s rows %6.1f us/frame  boards %6.1f us/frame  %.1fx"
+            % (name, rows_us, board_us, rows_us / board_us)
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Encode frames into a clip for clip_file.py: keyframes plus XOR deltas of
+only the rows that changed, each frame with its own delay.
+
+Frames come from one of:
+- a JSON file: {"modules": 2, "frames": [{"glyphs": ["straight", "left"],
+  "d": 0.1}, {"rows": ["3c", "7e", ...], "d": 0.05}, ...]} with glyph names
+  from matrix_fonts.eyes or shapes, or 8 hex rows per module
+- an image strip of frames side by side, each modules * 8 pixels wide and 8
+  high, lit where the pixel is dark. PBM files work as they are, other
+  formats need Pillow.
+- --demo, a minute of eye choreography drawn with eyes.py
+
+The clip is then decoded again to check it, and played through the
+simulator's fake SPI bus to report the compression ratio, the RAM playback
+needs and how many frames per second it can sustain.
+
+Usage: python tools/clip_encoder.py (frames.json | strip.pbm | --demo) [out.clip]
+           [--modules 2] [--delay-ms 100] [--keyframe-every 32]
+"""
+
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+import tracemalloc
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TOOLS_DIR, "sim"))
+
+import run  # noqa: E402
+
+_clock, chain = run.setup()
+
+import clip_file  # noqa: E402
+import eyes  # noqa: E402
+import machine  # noqa: E402
+import matrix_fonts  # noqa: E402
+from max7219_matrix import max7219_matrix  # noqa: E402
+
+KEYFRAME_EVERY = 32  # Frames between keyframes
+MAX_DELAY_MS = 0xFFFF
+BAUDRATE = 10000000  # As main.py sets the SPI bus up
+
+
+def merge_holds(frames):
+    """frames with runs of the same rows made into one longer frame, as
+    long as the delays add up to no more than MAX_DELAY_MS"""
+    merged = []
+    for rows, delay_ms in frames:
+        if merged and merged[-1][0] == rows and merged[-1][1] + delay_ms <= MAX_DELAY_MS:
+            merged[-1] = (rows, merged[-1][1] + delay_ms)
+        else:
+            merged.append((bytes(rows), delay_ms))
+    return merged
+
+
+def encode(frames, modules, keyframe_every=KEYFRAME_EVERY):
+    """Clip bytes for frames, a list of (rows, delay_ms) with modules * 8
+    rows each"""
+    size = modules * 8
+    out = bytearray(
+        struct.pack(
+            clip_file.HEADER_FORMAT, clip_file.MAGIC, clip_file.VERSION, modules, len(frames)
+        )
+    )
+    previous = None
+    for number, (rows, delay_ms) in enumerate(frames):
+        rows = bytes(rows)
+        if len(rows) != size:
+            raise ValueError(f"Frame {number} has {len(rows)} rows, not {size}")
+        if not 0 <= delay_ms <= MAX_DELAY_MS:
+            raise ValueError(f"Frame {number} delay {delay_ms}ms out of range")
+        if previous is None or number % keyframe_every == 0:
+            out += struct.pack(clip_file.RECORD_FORMAT, clip_file.KEY, delay_ms) + rows
+        elif rows == previous:
+            out += struct.pack(clip_file.RECORD_FORMAT, clip_file.REPEAT, delay_ms)
+        else:
+            mask = bytearray(modules)
+            changes = bytearray()
+            for row in range(size):
+                if rows[row] != previous[row]:
+                    mask[row >> 3] |= 1 << (row & 7)
+                    changes.append(rows[row] ^ previous[row])
+            if len(mask) + len(changes) < size:
+                out += struct.pack(clip_file.RECORD_FORMAT, clip_file.DELTA, delay_ms)
+                out += mask + changes
+            else:
+                out += struct.pack(clip_file.RECORD_FORMAT, clip_file.KEY, delay_ms) + rows
+        previous = rows
+    return bytes(out)
+
+
+def frames_from_json(file_name):
+    """(frames, modules) from a JSON file, see the top of this file"""
+    with open(file_name, encoding="utf-8") as infile:
+        spec = json.load(infile)
+    modules = spec.get("modules", 2)
+    frames = []
+    for number, frame in enumerate(spec["frames"]):
+        if "glyphs" in frame:
+            rows = bytearray()
+            for name in frame["glyphs"]:
+                table = matrix_fonts.eyes if name in matrix_fonts.eyes else matrix_fonts.shapes
+                if name not in table:
+                    raise ValueError(f"frames[{number}]: no glyph named '{name}'")
+                rows += bytes(value & 0xFF for value in table[name])
+        else:
+            rows = bytes(int(value, 16) for value in frame["rows"])
+        frames.append((rows, round(frame.get("d", 0.1) * 1000)))
+    return frames, modules
+
+
+def _read_pbm(file_name):
+    """(width, height, pixels) from a PBM file, pixels 1 where black"""
+    with open(file_name, "rb") as infile:
+        data = infile.read()
+    # Header fields, skipping comments, up to the start of the pixels
+    fields = []
+    p = 0
+    while len(fields) < 3:
+        while data[p : p + 1].isspace():
+            p += 1
+        if data[p : p + 1] == b"#":
+            while data[p : p + 1] not in (b"\n", b""):
+                p += 1
+            continue
+        start = p
+        while not data[p : p + 1].isspace():
+            p += 1
+        fields.append(data[start:p])
+    kind, width, height = fields[0], int(fields[1]), int(fields[2])
+    p += 1
+    if kind == b"P1":
+        pixels = [int(char) for char in data[p:].decode() if char in "01"]
+    elif kind == b"P4":
+        stride = (width + 7) // 8
+        pixels = []
+        for y in range(height):
+            line = data[p + y * stride : p + (y + 1) * stride]
+            pixels += [(line[x >> 3] >> (7 - (x & 7))) & 1 for x in range(width)]
+    else:
+        raise ValueError(f"{file_name}: not a P1 or P4 PBM file")
+    return width, height, pixels
+
+
+def _read_image(file_name):
+    """(width, height, pixels) from any image, pixels 1 where dark"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("Reading images other than PBM needs Pillow: pip install pillow")
+    image = Image.open(file_name).convert("L")
+    return image.width, image.height, [1 if value < 128 else 0 for value in image.getdata()]
+
+
+def frames_from_strip(file_name, modules, delay_ms):
+    """Frames from an image strip, see the top of this file"""
+    if file_name.lower().endswith((".pbm", ".pnm")):
+        width, height, pixels = _read_pbm(file_name)
+    else:
+        width, height, pixels = _read_image(file_name)
+    frame_width = modules * 8
+    if height != 8 or width % frame_width:
+        raise ValueError(f"{file_name}: {width}x{height} isn't a strip of {frame_width}x8 frames")
+    frames = []
+    for left in range(0, width, frame_width):
+        rows = bytearray(modules * 8)
+        for module in range(modules):
+            for y in range(8):
+                value = 0
+                for x in range(8):
+                    value = value << 1 | pixels[y * width + left + module * 8 + x]
+                rows[module * 8 + y] = value
+        frames.append((bytes(rows), delay_ms))
+    return frames
+
+
+def demo_frames(seconds=60):
+    """Eyes looking around, dilating and blinking, both eyes the same"""
+    rng = random.Random(31)
+    frames = []
+    state = eyes.STRAIGHT
+    total_ms = 0
+    while total_ms < seconds * 1000:
+        if rng.random() < 0.25:
+            moves = eyes.blink(state)
+        else:
+            target = (rng.randint(-2, 2), rng.randint(-2, 2), rng.randint(1, 3), 0)
+            moves = eyes.glide(state, target, 4)
+            state = target
+        for rows in moves:
+            frames.append((bytes(rows) * 2, 40))
+            total_ms += 40
+        hold_ms = rng.choice((200, 500, 1000))
+        frames.append((frames[-1][0], hold_ms))
+        total_ms += hold_ms
+    return frames
+
+
+def play(file_name):
+    """(frames, seconds of CPU, peak bytes allocated) playing the clip onto
+    a fake MAX7219 chain"""
+    spi = machine.SPI(0, baudrate=BAUDRATE)
+    display = max7219_matrix(spi, machine.Pin(5, machine.Pin.OUT), 2, 1)
+    clip = clip_file.ClipFile(file_name)
+    modules = min(clip.modules, display.devices)
+    shown = 0
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for _ in clip.frames():
+        for module in range(modules):
+            display.blit(clip.rows(module), module)
+        display.show()
+        shown += 1
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    clip.close()
+    return shown, elapsed, peak
+
+
+def check(frames, file_name):
+    """Number of frames that decode differently from what was encoded"""
+    clip = clip_file.ClipFile(file_name)
+    wrong = 0
+    for number, delay_ms in enumerate(clip.frames()):
+        rows, expected_ms = frames[number]
+        if bytes(clip.frame) != rows or delay_ms != expected_ms:
+            wrong += 1
+    clip.close()
+    return wrong
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("source", nargs="?", help="JSON frames or an image strip")
+    parser.add_argument("target", nargs="?", help="clip file to write")
+    parser.add_argument("--demo", action="store_true", help="encode a minute of eye movements")
+    parser.add_argument("--seconds", type=int, default=60, help="length of the --demo clip")
+    parser.add_argument("--modules", type=int, default=2, help="modules per frame in a strip")
+    parser.add_argument("--delay-ms", type=int, default=100, help="delay per frame in a strip")
+    parser.add_argument("--keyframe-every", type=int, default=KEYFRAME_EVERY)
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        frames, modules = demo_frames(args.seconds), 2
+        target = args.target or args.source or "demo.clip"
+    elif args.source:
+        if args.source.lower().endswith(".json"):
+            frames, modules = frames_from_json(args.source)
+        else:
+            frames = frames_from_strip(args.source, args.modules, args.delay_ms)
+            modules = args.modules
+        target = args.target or os.path.splitext(args.source)[0] + ".clip"
+    else:
+        parser.error("give a source file or --demo")
+
+    raw = clip_file.HEADER_SIZE + len(frames) * (clip_file.RECORD_SIZE + modules * 8)
+    frames = merge_holds(frames)
+    data = encode(frames, modules, args.keyframe_every)
+    with open(target, "wb") as outfile:
+        outfile.write(data)
+    seconds = sum(delay for _, delay in frames) / 1000
+    print(
+        f"Wrote {len(frames)} frames ({seconds:.0f}s) to {target}: {len(data)} bytes, "
+        + f"{raw / len(data):.1f}x smaller than {raw} bytes of whole frames"
+    )
+
+    wrong = check(frames, target)
+    if wrong:
+        print(f"FAILED: {wrong} frames decode differently")
+        return 1
+
+    chain.record_frames = False
+    chain.reset_counts()
+    shown, elapsed, peak = play(target)
+    bus_seconds = chain.bytes_written * 8 / BAUDRATE
+    print(
+        f"Played on the fake bus: {shown / elapsed:.0f} fps decoding and drawing on this computer, "
+        + f"bus alone allows {shown / bus_seconds:.0f} fps at {BAUDRATE // 1000000} MHz, "
+        + f"{chain.bytes_written / shown:.1f} bytes a frame, {peak} bytes allocated at most"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
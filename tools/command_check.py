@@ -0,0 +1,127 @@
+"""
+Check serial commands end to end: main.py runs on the simulator with its
+stdin swapped for a pipe, and command lines are written into the pipe at
+set virtual times while the animations play.
+
+Checks that:
+- a message takes over from the animations within a poll or two
+- brightness changes while a message is scrolling, without stopping it
+- "!" commands jump ahead of ones already waiting
+- a burst bigger than the queue drops the overflow instead of growing
+- lines that aren't commands are counted and ignored
+
+Usage: python tools/command_check.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim"))
+
+import run  # noqa: E402
+
+SECONDS = 60
+# (virtual ms, line written to the pipe)
+SCRIPT = (
+    (3000, "say Hello"),
+    (3300, "bright 1"),
+    (3400, "not a command"),
+    (12000, "say first"),
+    (12000, "say second"),
+    (12000, "!say urgent"),
+    (20000, "say " + " ".join(["burst"] * 10)),
+) + tuple((20500, f"say b{n}") for n in range(10))
+TAKEOVER_MS = 150  # Longest a message should wait when nothing else is queued
+
+
+def main():
+    clock, chain = run.setup()
+    clock.limit_us = SECONDS * 1000000
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+    sys.stdin = open(read_fd, "rb", buffering=0)
+
+    pending = list(SCRIPT)
+    written = {}
+
+    def feed(now_us):
+        while pending and pending[0][0] * 1000 <= now_us:
+            at_ms, line = pending.pop(0)
+            os.write(write_fd, (line + "\n").encode())
+            written.setdefault(line, at_ms)
+
+    clock.on_advance(feed)
+
+    import main as pumpkin
+
+    started = []  # (virtual ms, message)
+    scroll_message = pumpkin.scroll_message
+
+    async def recording_scroll(font, message, delay=0.04):
+        started.append((clock.now_us // 1000, message.strip()))
+        await scroll_message(font, message, delay)
+
+    pumpkin.scroll_message = recording_scroll
+    readers = []
+
+    class RecordingReader(pumpkin.CommandReader):
+        def __init__(self, stream, queue):
+            super().__init__(stream, queue)
+            readers.append(self)
+
+    pumpkin.CommandReader = RecordingReader
+    chain.cols = pumpkin.MATRIX_COLS
+    chain.rows = pumpkin.MATRIX_ROWS
+    try:
+        pumpkin.main()
+    except SystemExit:
+        pass
+    chain.flush()
+
+    queue = pumpkin.scheduler.messages
+    played = [message for _, message in started]
+    failures = []
+
+    hello = [at for at, message in started if message == "Hello"]
+    if not hello:
+        failures.append("'say Hello' never played")
+    else:
+        wait = hello[0] - written["say Hello"]
+        print(f"'say Hello' took over after {wait}ms")
+        if wait > TAKEOVER_MS:
+            failures.append(f"'say Hello' waited {wait}ms")
+
+        changes = [
+            at for at, _, intensities in chain.frames if at > 3300 and min(intensities) == 1
+        ]
+        if not changes:
+            failures.append("'bright 1' was never applied")
+        else:
+            print(f"'bright 1' applied after {changes[0] - 3300}ms, mid-message")
+
+    order = [message for message in played if message in ("first", "second", "urgent")]
+    print(f"played in order {order}")
+    if order != ["urgent", "first", "second"]:
+        failures.append("urgent command didn't jump the queue")
+
+    burst = [message for message in played if message.startswith("b") and message[1:].isdigit()]
+    print(
+        f"{len(burst)} of 10 burst messages played, {len(queue)} still queued, "
+        + f"{queue.dropped} dropped"
+    )
+    if len(burst) + len(queue) + queue.dropped != 10 or queue.dropped != 10 - queue.max_len:
+        failures.append("burst wasn't bounded by the queue")
+
+    print(f"{readers[0].rejected} line rejected, max latency {queue.max_latency_ms}ms")
+    if readers[0].rejected != 1:
+        failures.append("'not a command' wasn't rejected")
+    if failures:
+        for failure in failures:
+            print("FAILED: " + failure)
+        return 1
+    print("OK: commands queued, prioritised and bounded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Check the second core frame handoff in presenter.CorePresenter with
+CPython threads standing in for the RP2040's two cores.
+
+A producer renders a long scroll into the canvas and queues every frame.
+Every frame the display shows must be identical to one that was queued,
+in the same order with none missing, or the handoff let the two sides
+touch the same buffer at once. The same frames are then drawn and shown
+on one thread for comparison.
+
+Then frames are queued straight after a drop(), as when a message
+preempts the animations, and every one of them must still be shown.
+
+The fake SPI bus sleeps for as long as the bytes would take to clock out
+at the bus baudrate, which lets the drawing thread run meanwhile, as it
+would on the other core. CPython draws a frame many times faster than
+MicroPython does, so each frame is padded out with --draw-us of busy work
+to keep drawing and bus time in roughly the proportion they have on the
+device.
+
+Usage: python tools/core_check.py [--frames 2000] [--baudrate 1000000] [--draw-us 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim")
+ROOT = os.path.abspath(os.path.join(SIM_DIR, "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, SIM_DIR)
+
+# MicroPython's time functions on the real clock, as threads need real time
+_start = time.monotonic_ns()
+time.ticks_ms = lambda: ((time.monotonic_ns() - _start) // 1000000) % (1 << 30)
+time.ticks_us = lambda: ((time.monotonic_ns() - _start) // 1000) % (1 << 30)
+time.ticks_add = lambda ticks, delta: (ticks + delta) % (1 << 30)
+time.ticks_diff = lambda end, start: ((end - start + (1 << 29)) % (1 << 30)) - (1 << 29)
+time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+# Hand the GIL over often, so the threads behave more like two cores
+sys.setswitchinterval(0.00005)
+
+import machine  # noqa: E402
+import matrix_fonts  # noqa: E402
+import scroller  # noqa: E402
+from max7219_matrix import max7219_matrix  # noqa: E402
+from presenter import CorePresenter  # noqa: E402
+
+SPI_ID = 0
+CS_PIN = 5
+MESSAGE = " Double, double toil and trouble; fire burn and caldron bubble. " * 4
+
+
+class SlowBus:
+    """Takes as long as the bytes would to clock out"""
+
+    def __init__(self, baudrate):
+        self.baudrate = baudrate
+
+    def spi_write(self, data):
+        time.sleep(len(data) * 8 / self.baudrate)
+
+
+def make_display(baudrate, shown):
+    """A matrix on the fake bus that records a copy of every frame shown"""
+    machine.SPI.reset_all()
+    machine.SPI.attach(SPI_ID, SlowBus(baudrate))
+    spi = machine.SPI(SPI_ID, baudrate=baudrate)
+    display = max7219_matrix(spi, machine.Pin(CS_PIN, machine.Pin.OUT))
+    real_show = display.show
+
+    def recording_show(force=False):
+        shown.append(bytes(display.fb))
+        real_show(force)
+
+    display.show = recording_show
+    return display
+
+
+def frames_of(canvas, cols, count, draw_us):
+    """Yield canvas up to count times, one scroll step at a time, taking
+    at least draw_us to draw each"""
+    drawn = 0
+    while True:
+        for _ in scroller.frames(canvas, cols, matrix_fonts.textFont1, MESSAGE):
+            busy_until = time.perf_counter() + draw_us / 1000000
+            while time.perf_counter() < busy_until:
+                pass
+            yield canvas
+            drawn += 1
+            if drawn == count:
+                return
+
+
+def one_core(count, baudrate, draw_us):
+    """Draw and show every frame on one thread. Returns frames per second."""
+    shown = []
+    display = make_display(baudrate, shown)
+    started = time.perf_counter()
+    for _ in frames_of(display.fb, display.cols, count, draw_us):
+        display.show()
+    return count / (time.perf_counter() - started)
+
+
+def two_cores(count, baudrate, draw_us):
+    """Draw on this thread, show from another. Returns (frames per second,
+    frames queued, frames shown, presenter)."""
+    shown = []
+    display = make_display(baudrate, shown)
+    # No sleeping between polls: the threads share one real core here
+    presenter = CorePresenter(display, tick_ms=0)
+    canvas = bytearray(len(display.fb))
+    queued = []
+
+    async def produce():
+        for frame in frames_of(canvas, display.cols, count, draw_us):
+            queued.append(bytes(frame))
+            await presenter.put(frame, 0)
+        await presenter.drain()
+
+    started = time.perf_counter()
+    asyncio.run(produce())
+    # Let the last frame out of the ring reach the display
+    time.sleep(0.01)
+    fps = count / (time.perf_counter() - started)
+    presenter.deinit()
+    return fps, queued, shown, presenter
+
+
+def drop_keeps_new_frames(baudrate):
+    """Queue a long-held frame and another behind it, drop them as a
+    preemption does, then queue new frames straight away, before core 1
+    gets round to the drop. Returns (new frames, frames shown after the
+    drop)."""
+    shown = []
+    display = make_display(baudrate, shown)
+    presenter = CorePresenter(display, tick_ms=5)
+    frame = bytearray(len(display.fb))
+    new = [bytes([n]) * len(frame) for n in range(1, 5)]
+
+    async def produce():
+        frame[:] = b"\xf0" * len(frame)
+        await presenter.put(frame, 1000)
+        await sleep_until(lambda: shown)
+        frame[:] = b"\x0f" * len(frame)
+        await presenter.put(frame, 1000)
+        presenter.drop()
+        start = len(shown)
+        for rows in new:
+            frame[:] = rows
+            await presenter.put(frame, 20)
+        await presenter.drain()
+        return start
+
+    start = asyncio.run(produce())
+    time.sleep(0.05)
+    presenter.deinit()
+    return new, shown[start:]
+
+
+async def sleep_until(ready):
+    while not ready():
+        await asyncio.sleep(0.001)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", type=int, default=2000, help="frames to draw")
+    parser.add_argument("--baudrate", type=int, default=1000000, help="SPI bus speed")
+    parser.add_argument("--draw-us", type=int, default=1000, help="least time to draw a frame")
+    args = parser.parse_args(argv)
+
+    single = one_core(args.frames, args.baudrate, args.draw_us)
+    dual, queued, shown, presenter = two_cores(args.frames, args.baudrate, args.draw_us)
+
+    torn = shown != queued
+    print(f"one core:  {single:8.0f} frames/s")
+    print(
+        f"two cores: {dual:8.0f} frames/s  ({dual / single:.2f}x), "
+        + f"{presenter.underruns} underruns, {presenter.stalls} stalls"
+    )
+    if torn:
+        first = next(
+            (n for n, pair in enumerate(zip(queued, shown)) if pair[0] != pair[1]),
+            min(len(queued), len(shown)),
+        )
+        print(f"FAILED: {len(queued)} frames queued, {len(shown)} shown, first difference at frame {first}")
+        return 1
+    print(f"OK: all {len(shown)} frames shown whole and in order")
+
+    new, after = drop_keeps_new_frames(args.baudrate)
+    if after != new:
+        print(f"FAILED: {len(new)} frames queued after drop(), {len(after)} of them shown")
+        return 1
+    print(f"OK: all {len(new)} frames queued straight after drop() shown")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
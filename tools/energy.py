@@ -0,0 +1,109 @@
+"""
+Estimate the charge one pass of the main loop uses, with and without
+LOW_POWER, by running main.py on the simulator until power.lap() is first
+called. The currents behind the estimate are at the top of power.py.
+
+Also checks that sleeping between frames doesn't make them late: every
+frame must be shown within a millisecond of when it is without LOW_POWER.
+
+Usage: python tools/energy.py [--battery-mah 2000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+LIMIT_SECONDS = 3600  # Give up if a pass of the loop takes longer than this
+
+
+def one_pass(low_power):
+    """Run main.py for one pass of the loop, printing the results as JSON"""
+    sys.path.insert(0, os.path.join(TOOLS_DIR, "sim"))
+    import run
+
+    clock, chain = run.setup()
+    clock.limit_us = LIMIT_SECONDS * 1000000
+    sys.stdin = open(os.devnull, "rb")
+    import main as pumpkin
+
+    chain.cols = pumpkin.MATRIX_COLS
+    chain.rows = pumpkin.MATRIX_ROWS
+    power = pumpkin.power
+    power.low_power = low_power
+    laps = []
+    lap = power.lap
+
+    def first_lap():
+        laps.append(lap())
+        raise SystemExit()
+
+    power.lap = first_lap
+    try:
+        pumpkin.main()
+    except SystemExit:
+        pass
+    chain.flush()
+    ms, mah, average_ma = laps[0] if laps else (0, 0, 0)
+    print(
+        json.dumps(
+            {
+                "ms": ms,
+                "mah": mah,
+                "average_ma": average_ma,
+                "sleeps": power.sleeps,
+                "static_frames": power.static_frames,
+                "frame_times": [entry[0] for entry in chain.frames],
+            }
+        )
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--battery-mah", type=int, default=2000, help="battery to size runtime for")
+    parser.add_argument("--pass", dest="one_pass", choices=("on", "off"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.one_pass:
+        one_pass(args.one_pass == "on")
+        return 0
+
+    results = {}
+    for mode in ("off", "on"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--pass", mode],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.join(TOOLS_DIR, ".."),
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    for mode in ("off", "on"):
+        result = results[mode]
+        if not result["ms"]:
+            print(f"LOW_POWER {mode}: the loop didn't finish in {LIMIT_SECONDS}s")
+            return 1
+        hours = args.battery_mah / result["average_ma"]
+        print(
+            f"LOW_POWER {mode:>3}: {result['ms'] / 1000:.0f}s loop, {result['mah']:.3f} mAh, "
+            + f"{result['average_ma']:.1f} mA average, {hours:.0f}h on {args.battery_mah} mAh, "
+            + f"{result['sleeps']} sleeps, {result['static_frames']} static frames"
+        )
+    off_times = results["off"]["frame_times"]
+    on_times = results["on"]["frame_times"]
+    if len(off_times) != len(on_times):
+        print(f"FAILED: {len(off_times)} frames without LOW_POWER, {len(on_times)} with it")
+        return 1
+    late = max(abs(on - off) for off, on in zip(off_times, on_times))
+    if late > 1:
+        print(f"FAILED: frames shown up to {late}ms off their time with LOW_POWER on")
+        return 1
+    print(f"OK: all {len(on_times)} frames shown within {late}ms of their time in both modes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
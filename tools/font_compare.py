@@ -0,0 +1,103 @@
+"""
+Compare import time and heap use of matrix_fonts in the packed layout
+against the old dict-of-lists layout.
+
+Runs on the host, or on the device if copied there with font_packer.py,
+glyph_table.py and matrix_fonts.py. Both layouts are imported from source
+here. Frozen into firmware, the packed tables also skip compiling and
+copying the blob, so on-device numbers for it only get better.
+
+Usage: python tools/font_compare.py
+"""
+
+import gc
+import os
+import sys
+
+try:
+    _here = os.path.dirname(__file__)
+except AttributeError:  # MicroPython's os has no path module
+    _here = None
+if _here is not None:
+    sys.path.insert(0, _here)
+    sys.path.insert(0, os.path.join(_here, ".."))
+
+import font_packer  # noqa: E402
+import matrix_fonts  # noqa: E402
+
+try:
+    from time import ticks_diff, ticks_us
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+TABLES = ("textFont1", "eyes", "shapes")
+
+
+def _heap_used():
+    gc.collect()
+    if tracemalloc is not None:
+        return tracemalloc.get_traced_memory()[0]
+    return gc.mem_alloc()
+
+
+def dict_source():
+    """matrix_fonts in the old layout of dicts of 8 int lists"""
+    lines = []
+    for table_name in TABLES:
+        table = getattr(matrix_fonts, table_name)
+        lines.append(table_name + " = {")
+        for name in table:
+            rows = ", ".join("0x%02X" % row for row in table[name])
+            lines.append("    %r: [%s]," % (name, rows))
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def packed_source():
+    """matrix_fonts in the packed layout"""
+    tables = {}
+    for table_name in TABLES:
+        table = getattr(matrix_fonts, table_name)
+        tables[table_name] = {name: list(table[name]) for name in table}
+    return font_packer.pack_module(tables)
+
+
+def measure(source):
+    """(microseconds, heap bytes) to import source and keep its tables"""
+    code = compile(source, "fonts", "exec")
+    before = _heap_used()
+    start = ticks_us()
+    namespace = {}
+    exec(code, namespace)
+    elapsed = ticks_diff(ticks_us(), start)
+    used = _heap_used() - before
+    return elapsed, used, namespace
+
+
+def main():
+    if tracemalloc is not None:
+        tracemalloc.start()
+    results = {}
+    for layout, source in (("dict", dict_source()), ("packed", packed_source())):
+        elapsed, used, _ = measure(source)
+        results[layout] = (elapsed, used)
+        print("%-7s import %6d us  heap %6d bytes" % (layout, elapsed, used))
+    saved = results["dict"][1] - results["packed"][1]
+    print("packed layout saves %d bytes of heap" % saved)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Write glyph tables as packed GlyphTable source for matrix_fonts.py.
+
+Runs on the host. Takes a Python file of dicts in the old layout, e.g.
+    eyes = {"straight": [0x3C, 0x7E, ...], ...}
+as made by https://gurgleapps.com/tools/matrix, and prints a module with
+each table packed into one bytes blob.
+
+Usage: python tools/font_packer.py dict_fonts.py > matrix_fonts.py
+"""
+
+import json
+import sys
+
+HEADER = '''# Description: This file contains the font data for the matrix display
+#
+# Each table is one bytes blob of 8 row bytes per glyph, plus the glyph names
+# in the same order (see glyph_table.py). Freeze this module into firmware and
+# the glyphs are read straight from flash. Regenerate with tools/font_packer.py.
+
+from glyph_table import GlyphTable
+'''
+
+
+def _quote(text):
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _is_text_font(glyphs):
+    return all(len(name) == 1 for name in glyphs)
+
+
+def pack_table(table_name, glyphs):
+    """Source for one GlyphTable built from a dict of name: 8 row bytes"""
+    lines = [f"{table_name} = GlyphTable("]
+    if _is_text_font(glyphs):
+        lines.append(f"    {_quote(''.join(glyphs))},")
+    else:
+        lines.append("    (")
+        lines.extend(f"        {_quote(name)}," for name in glyphs)
+        lines.append("    ),")
+    lines.append("    (")
+    for name, rows in glyphs.items():
+        if len(rows) != 8:
+            raise ValueError(f"{table_name}[{name!r}] needs 8 rows")
+        packed = "".join(f"\\x{row:02X}" for row in rows)
+        label = name if name.strip() == name else _quote(name)
+        lines.append(f'        b"{packed}"  # {label}')
+    lines.append("    ),")
+    lines.append(")")
+    return "\n".join(lines)
+
+
+def pack_module(tables):
+    """Source for a fonts module from a dict of table name: glyph dict"""
+    return HEADER + "".join(
+        f"\n{pack_table(name, glyphs)}\n" for name, glyphs in tables.items()
+    )
+
+
+def main(argv):
+    namespace = {}
+    with open(argv[1], encoding="utf-8") as infile:
+        exec(infile.read(), namespace)
+    tables = {
+        name: value
+        for name, value in namespace.items()
+        if isinstance(value, dict) and not name.startswith("_")
+    }
+    sys.stdout.write(pack_module(tables))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,82 @@
+"""
+Refresh rates for grayscale.GrayScreen by chain length and bits per pixel.
+
+For each chain length the SPI traffic of a worst case picture (every row
+differs between planes) is counted on the simulated chain. That gives the
+fastest the bus itself allows at --baudrate. The host CPU rate is also
+measured, but CPython is far faster than MicroPython, so for the device's
+own rate run grayscale.measure() on it. Rates under grayscale.FLICKER_HZ
+are flagged.
+
+Usage: python tools/gray_rates.py [--baudrate 10000000] [--chains 1,2,4,8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim"))
+
+import run as sim  # noqa: E402
+
+clock, _ = sim.setup()
+
+import machine  # noqa: E402
+from grayscale import FLICKER_HZ, GrayScreen, flicker_free  # noqa: E402
+from max7219_matrix import max7219_matrix  # noqa: E402
+from max7219_sim import Max7219Chain  # noqa: E402
+
+CYCLES = 50
+
+
+def worst_case(gray):
+    """Neighbouring planes in opposite checkerboards, so every row changes
+    from one slot to the next (the same plane twice in a row aside)"""
+    for plane_number, plane in enumerate(gray.planes):
+        for p in range(len(plane)):
+            plane[p] = (0x55, 0xAA)[(p + plane_number) & 1]
+
+
+def rates(devices, bits, baudrate):
+    """(bus limited Hz, host CPU Hz) for a chain and bits per pixel"""
+    machine.SPI.reset_all()
+    machine.Pin.reset_all()
+    chain = Max7219Chain(0, 5, devices, 1)
+    chain.record_frames = False
+    spi = machine.SPI(0, baudrate=baudrate)
+    display = max7219_matrix(spi, machine.Pin(5, machine.Pin.OUT), devices, 1)
+    gray = GrayScreen(display, bits)
+    worst_case(gray)
+    for _ in range(len(gray.sequence)):
+        gray.step()  # The shadow copy starts out in step
+
+    chain.reset_counts()
+    slots = CYCLES * len(gray.sequence)
+    started = time.perf_counter()
+    for _ in range(slots):
+        gray.step()
+    host_us = (time.perf_counter() - started) * 1000000 / slots
+
+    bus_us = chain.bytes_written * 8 * 1000000 / baudrate / slots
+    return gray.cycle_hz(max(1, round(bus_us))), gray.cycle_hz(max(1, round(host_us)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baudrate", type=int, default=10000000, help="SPI bus speed")
+    parser.add_argument("--chains", default="1,2,4,8", help="chain lengths to try")
+    args = parser.parse_args(argv)
+
+    print(f"Cycles per second, flicker free from {FLICKER_HZ} Hz")
+    print(f"{'devices':>8}{'bits':>6}{'bus Hz':>10}{'host Hz':>10}")
+    for devices in (int(n) for n in args.chains.split(",")):
+        for bits in (2, 3, 4):
+            bus_hz, host_hz = rates(devices, bits, args.baudrate)
+            flag = "" if flicker_free(min(bus_hz, host_hz)) else "  flickers"
+            print(f"{devices:>8}{bits:>6}{bus_hz:>10}{host_hz:>10}{flag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Check that a message preempting the animations is shown whole when frames
+go out through the timer presenter: main.py runs on the simulator with a
+Presenter swapped in, and messages are written to its stdin while
+animation frames are queued.
+
+Drawing takes virtual time here: ANIM_DRAW_MS per animation frame, longer
+than the frames are held and spent waiting on other tasks, so commands
+arrive while the ring is nearly dry as on a slow board, and
+MESSAGE_DRAW_MS per scroll frame, well under a timer tick.
+presenter.drop() throws away the animation frames queued so far, but a few
+of the message's frames are queued before the timer gets round to it.
+Every one of them must still be shown, in order, starting with the first.
+
+Usage: python tools/preempt_check.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim"))
+
+import run  # noqa: E402
+
+SECONDS = 30
+MESSAGES = ((9000, "say Boo"), (20000, "say Hi"))  # (virtual ms, line)
+TIMER_ID = 1
+ANIM_DRAW_MS = 60
+MESSAGE_DRAW_MS = 1
+
+
+def main():
+    clock, chain = run.setup()
+    clock.limit_us = SECONDS * 1000000
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+    sys.stdin = open(read_fd, "rb", buffering=0)
+    pending = list(MESSAGES)
+
+    def feed(now_us):
+        while pending and pending[0][0] * 1000 <= now_us:
+            os.write(write_fd, (pending.pop(0)[1] + "\n").encode())
+
+    clock.on_advance(feed)
+
+    import main as pumpkin
+    from presenter import Presenter
+
+    display = pumpkin.max7219_eyes
+    presenter = Presenter(display, pumpkin.PRESENTER_SLOTS, TIMER_ID)
+    pumpkin.presenter = presenter
+    pumpkin.canvas = bytearray(len(display.fb))
+    pumpkin.power = None
+    pumpkin.scheduler.sleeper = None
+
+    shown = []  # Every frame the timer put on the display
+    real_show = display.show
+
+    def recording_show(force=False):
+        shown.append(bytes(display.fb))
+        return real_show(force)
+
+    display.show = recording_show
+
+    messages = []  # Frames queued for each message
+    put = presenter.put
+    scroll_message = pumpkin.scroll_message
+    in_message = [None]
+
+    def draw(ms):
+        # Short of the time limit, which is for the event loop to stop at
+        clock.advance(min(ms * 1000, clock.limit_us - clock.now_us - 1))
+
+    async def recording_put(frame, hold_ms, brightness=pumpkin.NO_BRIGHTNESS, waiting=None):
+        if in_message[0] is not None:
+            in_message[0].append(bytes(frame))
+            draw(MESSAGE_DRAW_MS)
+        else:
+            # Letting the serial reader run, so commands arrive while the
+            # ring is nearly empty
+            await pumpkin.sleep_ms(ANIM_DRAW_MS)
+        await put(frame, hold_ms, brightness, waiting)
+
+    written = [line[4:] for _, line in MESSAGES]
+
+    async def recording_scroll(font, message, delay=0.04):
+        if message.strip() not in written:
+            # One of main_loop's own messages
+            await scroll_message(font, message, delay)
+            return
+        in_message[0] = []
+        messages.append((message.strip(), in_message[0]))
+        try:
+            await scroll_message(font, message, delay)
+        finally:
+            in_message[0] = None
+
+    presenter.put = recording_put
+    pumpkin.scroll_message = recording_scroll
+    try:
+        pumpkin.main()
+    except SystemExit:
+        pass
+    presenter.deinit()
+
+    failures = []
+    if len(messages) != len(MESSAGES):
+        failures.append(f"{len(messages)} of {len(MESSAGES)} messages played")
+    for message, frames in messages:
+        start = next(
+            (n for n in range(len(shown)) if shown[n : n + len(frames)] == frames), None
+        )
+        if start is None:
+            failures.append(f"'{message}': {len(frames)} frames queued but not all shown in order")
+        else:
+            print(f"'{message}': all {len(frames)} frames shown in order")
+    if failures:
+        for failure in failures:
+            print("FAILED: " + failure)
+        return 1
+    print("OK: preempting messages are shown from their first frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Virtual clock for the host simulator.
+
+install() swaps MicroPython's time functions (ticks_ms, sleep_ms, ...) and
+asyncio's event loop clock for a clock that only moves when the program
+sleeps. Sleeping costs no real time, so a whole playlist replays in
+milliseconds while ticks and deadlines behave as they would on the device.
+"""
+
+import asyncio
+import math
+import selectors
+import time
+
+TICKS_PERIOD = 1 << 30  # Same wraparound as MicroPython's ticks
+
+
+class SimulationDone(SystemExit):
+    """Raised when the clock reaches its time limit"""
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now_us = 0
+        self.limit_us = None
+        self._listeners = []
+        self.timers = []  # Objects with due_us and fire(), e.g. machine.Timer
+
+    def on_advance(self, callback):
+        """Call callback(now_us) every time the clock moves"""
+        self._listeners.append(callback)
+
+    def advance_to(self, target_us):
+        """Move time forward to target_us, stopping early at the limit"""
+        # Timers due part way through a long sleep fire at their own time,
+        # so time moves in steps from one timer to the next
+        while self.now_us < target_us:
+            step_to = target_us
+            if self.limit_us is not None and step_to > self.limit_us:
+                step_to = self.limit_us
+            for timer in self.timers:
+                if timer.due_us is not None and timer.due_us < step_to:
+                    step_to = max(timer.due_us, self.now_us)
+            self.now_us = step_to
+            for callback in self._listeners:
+                callback(self.now_us)
+            for timer in list(self.timers):
+                if timer.due_us is not None and timer.due_us <= self.now_us:
+                    timer.fire()
+            if self.limit_us is not None and self.now_us >= self.limit_us:
+                raise SimulationDone()
+
+    def advance(self, us):
+        self.advance_to(self.now_us + max(0, int(us)))
+
+    # MicroPython time API
+
+    def ticks_ms(self):
+        return (self.now_us // 1000) % TICKS_PERIOD
+
+    def ticks_us(self):
+        return self.now_us % TICKS_PERIOD
+
+    def ticks_cpu(self):
+        return self.ticks_us()
+
+    @staticmethod
+    def ticks_add(ticks, delta):
+        return (ticks + delta) % TICKS_PERIOD
+
+    @staticmethod
+    def ticks_diff(end, start):
+        diff = (end - start) % TICKS_PERIOD
+        if diff >= TICKS_PERIOD // 2:
+            diff -= TICKS_PERIOD
+        return diff
+
+    def sleep(self, seconds):
+        self.advance(seconds * 1000000)
+
+    def sleep_ms(self, ms):
+        self.advance(ms * 1000)
+
+    def sleep_us(self, us):
+        self.advance(us)
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Moves the virtual clock instead of blocking while asyncio waits"""
+
+    def __init__(self, clock):
+        super().__init__()
+        self._clock = clock
+
+    def select(self, timeout=None):
+        ready = super().select(0)
+        if not ready:
+            if timeout is None:
+                # Nothing is scheduled, so nothing will ever happen
+                raise SimulationDone()
+            # Round up, or a timer due within the microsecond never fires
+            self._clock.advance(math.ceil(timeout * 1000000))
+        return ready
+
+
+class _VirtualEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock):
+        super().__init__(_VirtualSelector(clock))
+        self._clock = clock
+
+    def time(self):
+        return self._clock.now_us / 1000000
+
+
+class _VirtualPolicy(asyncio.DefaultEventLoopPolicy):
+    def __init__(self, clock):
+        super().__init__()
+        self._clock = clock
+
+    def new_event_loop(self):
+        return _VirtualEventLoop(self._clock)
+
+
+clock = VirtualClock()
+
+
+def install():
+    """Point time and asyncio at the virtual clock"""
+    for name in (
+        "ticks_ms",
+        "ticks_us",
+        "ticks_cpu",
+        "ticks_add",
+        "ticks_diff",
+        "sleep",
+        "sleep_ms",
+        "sleep_us",
+    ):
+        setattr(time, name, getattr(clock, name))
+    asyncio.set_event_loop_policy(_VirtualPolicy(clock))
+    return clock
@@ -0,0 +1,46 @@
+"""
+MicroPython's gc.mem_alloc(), gc.mem_free() and gc.threshold() on the
+host, added to CPython's gc module.
+
+Allocation comes from tracemalloc, so it reads 0 unless tracemalloc is
+tracing (run.py --heap starts it). CPython has no heap budget to set, so
+threshold() only remembers its value. collect() stops short of a full
+collection: that also empties CPython's free lists, and refilling them
+would show up in tracemalloc as allocation the device never makes.
+"""
+
+import gc
+import tracemalloc
+
+HEAP_BYTES = 192 * 1024  # About what MicroPython has free on a Pico
+
+_threshold = -1
+_collect = gc.collect
+
+
+def mem_alloc():
+    if not tracemalloc.is_tracing():
+        return 0
+    return tracemalloc.get_traced_memory()[0]
+
+
+def mem_free():
+    return max(0, HEAP_BYTES - mem_alloc())
+
+
+def threshold(amount=None):
+    global _threshold
+    if amount is None:
+        return _threshold
+    _threshold = amount
+
+
+def collect():
+    return _collect(1)
+
+
+def install():
+    for function in (mem_alloc, mem_free, threshold):
+        if not hasattr(gc, function.__name__):
+            setattr(gc, function.__name__, function)
+    gc.collect = collect
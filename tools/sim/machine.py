@@ -0,0 +1,208 @@
+"""
+Stand-in for MicroPython's machine module on the host.
+
+Pins remember their level and tell listeners when it changes. SPI buses
+hand every write to the devices attached to them, such as the MAX7219
+chain model in max7219_sim.py. ADCs play back sample arrays fed to them.
+"""
+
+from clock import clock
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    _listeners = {}  # Pin id: callbacks taking (pin id, level)
+    _levels = {}  # Pin id: level, shared by every Pin object for that id
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        Pin._levels.setdefault(id, 0)
+        if value is not None:
+            self.value(value)
+
+    @classmethod
+    def listen(cls, id, callback):
+        """Call callback(id, level) whenever pin id changes level"""
+        cls._listeners.setdefault(id, []).append(callback)
+
+    @classmethod
+    def reset_all(cls):
+        cls._listeners = {}
+        cls._levels = {}
+
+    def value(self, level=None):
+        if level is None:
+            return Pin._levels[self.id]
+        level = 1 if level else 0
+        if Pin._levels[self.id] != level:
+            Pin._levels[self.id] = level
+            for callback in Pin._listeners.get(self.id, ()):
+                callback(self.id, level)
+        return None
+
+    __call__ = value
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def __repr__(self):
+        return f"Pin({self.id})"
+
+
+class SPI:
+    _devices = {}  # Bus id: devices with a spi_write(data) method
+
+    def __init__(self, id, baudrate=1000000, polarity=0, phase=0, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.writes = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def attach(cls, id, device):
+        cls._devices.setdefault(id, []).append(device)
+
+    @classmethod
+    def reset_all(cls):
+        cls._devices = {}
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None:
+            self.baudrate = baudrate
+
+    def write(self, buf):
+        data = bytes(buf)
+        self.writes += 1
+        self.bytes_written += len(data)
+        for device in SPI._devices.get(self.id, ()):
+            device.spi_write(data)
+
+    def deinit(self):
+        pass
+
+
+class ADC:
+    """Reads from sample arrays played back on the virtual clock, like a
+    microphone listening to a WAV file. Unfed pins read mid scale."""
+
+    _sources = {}  # Pin id: (u16 samples, samples per second, start in us)
+
+    def __init__(self, pin, **kwargs):
+        self.id = getattr(pin, "id", pin)
+
+    @classmethod
+    def feed(cls, id, samples, rate_hz, start_us=None):
+        """Play samples on pin id from start_us, or from now"""
+        start_us = clock.now_us if start_us is None else start_us
+        cls._sources[id] = (samples, rate_hz, start_us)
+
+    @classmethod
+    def reset_all(cls):
+        cls._sources.clear()
+
+    def read_u16(self):
+        source = ADC._sources.get(self.id)
+        if source is None:
+            return 32768
+        samples, rate_hz, start_us = source
+        n = (clock.now_us - start_us) * rate_hz // 1000000
+        if 0 <= n < len(samples):
+            return samples[n]
+        return 32768
+
+
+class PWM:
+    def __init__(self, pin, freq=1000, duty_u16=0, **kwargs):
+        self.pin = pin
+        self._freq = freq
+        self._duty_u16 = duty_u16
+        self.changes = 0
+
+    def freq(self, hz=None):
+        if hz is None:
+            return self._freq
+        self._freq = hz
+        return None
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty_u16
+        if value != self._duty_u16:
+            self.changes += 1
+        self._duty_u16 = value
+        return None
+
+    def deinit(self):
+        self._duty_u16 = 0
+
+
+class Timer:
+    """Fires its callback from the virtual clock at the requested period"""
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self.due_us = None
+        self.period_us = 0
+        self.mode = Timer.PERIODIC
+        self.callback = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=None, period=None, callback=None):
+        if freq is not None:
+            self.period_us = max(1, int(1000000 / freq))
+        else:
+            self.period_us = max(1, int(period) * 1000)
+        self.mode = mode
+        self.callback = callback
+        self.due_us = clock.now_us + self.period_us
+        if self not in clock.timers:
+            clock.timers.append(self)
+
+    def fire(self):
+        if self.mode == Timer.PERIODIC:
+            self.due_us += self.period_us
+        else:
+            self.deinit()
+        if self.callback is not None:
+            self.callback(self)
+
+    def deinit(self):
+        self.due_us = None
+        if self in clock.timers:
+            clock.timers.remove(self)
+
+
+def freq(hz=None):
+    return 160000000 if hz is None else None
+
+
+def idle():
+    pass
+
+
+def lightsleep(ms=None):
+    if ms is not None:
+        clock.sleep_ms(ms)
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+def unique_id():
+    return b"\x00sim\x00"
@@ -0,0 +1,159 @@
+"""
+Model of a chain of MAX7219 8x8 modules for the host simulator.
+
+Listens to an SPI bus and its CS pin. Bytes clocked in while CS is low
+shift along the chain. When CS goes high, each device latches the 16 bit
+packet sitting in it: the nearest device gets the last two bytes written,
+the next one the two before, and so on. The decoded digit registers are
+laid out as a canvas the same way max7219_matrix lays out its framebuffer.
+"""
+
+from clock import clock
+from machine import SPI, Pin
+
+NOOP = 0
+DECODEMODE = 9
+INTENSITY = 10
+SCANLIMIT = 11
+SHUTDOWN = 12
+DISPLAYTEST = 15
+
+
+class Device:
+    def __init__(self):
+        self.digits = bytearray(8)
+        self.intensity = 0
+        self.scan_limit = 7
+        self.decode_mode = 0
+        self.shutdown = True  # Power-on state
+        self.display_test = False
+
+    def latch(self, register, data):
+        if 1 <= register <= 8:
+            self.digits[register - 1] = data
+        elif register == INTENSITY:
+            self.intensity = data & 0x0F
+        elif register == SHUTDOWN:
+            self.shutdown = not data & 1
+        elif register == SCANLIMIT:
+            self.scan_limit = data & 0x07
+        elif register == DECODEMODE:
+            self.decode_mode = data
+        elif register == DISPLAYTEST:
+            self.display_test = bool(data & 1)
+
+
+class Max7219Chain:
+    """Decodes MAX7219 register traffic into a framebuffer.
+    Counts SPI transactions, bytes and CS toggles, and keeps a log of
+    (time in ms, frame) whenever what the chain displays changes. Changes
+    made without time passing in between, like the rows of one show(),
+    count as a single frame."""
+
+    def __init__(self, spi_id=0, cs_pin=5, cols=2, rows=1, on_frame=None):
+        self.cols = cols
+        self.rows = rows
+        self.devices = [Device() for _ in range(cols * rows)]
+        self.on_frame = on_frame
+        self.record_frames = True  # Turn off to stop frames piling up in long runs
+        self.frames = []
+        self.transactions = 0
+        self.bytes_written = 0
+        self.cs_toggles = 0
+        self._selected = False
+        self._shift = bytearray()
+        self._last_frame = None
+        self._dirty_at_ms = None
+        SPI.attach(spi_id, self)
+        Pin.listen(cs_pin, self._cs_changed)
+        clock.on_advance(self._time_passed)
+
+    def reset_counts(self):
+        self.transactions = 0
+        self.bytes_written = 0
+        self.cs_toggles = 0
+
+    def spi_write(self, data):
+        if self._selected:
+            self._shift += data
+        self.bytes_written += len(data)
+
+    def _cs_changed(self, pin_id, level):
+        self.cs_toggles += 1
+        if level == 0:
+            self._selected = True
+            self._shift = bytearray()
+            return
+        self._selected = False
+        self.transactions += 1
+        self._latch()
+
+    def _latch(self):
+        data = self._shift
+        end = len(data)
+        # The chain is as long as the longest transaction says it is
+        while len(self.devices) < end // 2:
+            self.devices.append(Device())
+        for device in self.devices:
+            if end < 2:
+                break
+            device.latch(data[end - 2], data[end - 1])
+            end -= 2
+        if self._dirty_at_ms is None:
+            self._dirty_at_ms = clock.now_us // 1000
+
+    def lit(self, device):
+        """Digit rows a device is showing, taking shutdown and test into account"""
+        if device.display_test:
+            return bytes([0xFF] * 8)
+        if device.shutdown:
+            return bytes(8)
+        rows = bytearray(device.digits)
+        for row in range(device.scan_limit + 1, 8):
+            rows[row] = 0
+        return bytes(rows)
+
+    def frame(self):
+        """Canvas rows, cols bytes per row, MSB leftmost"""
+        cols = self.cols
+        canvas = bytearray(len(self.devices) * 8)
+        for number, device in enumerate(self.devices):
+            rows = self.lit(device)
+            base = (number // cols) * 8 * cols + number % cols
+            for row in range(8):
+                canvas[base + row * cols] = rows[row]
+        return bytes(canvas)
+
+    def intensities(self):
+        return [device.intensity for device in self.devices]
+
+    def _time_passed(self, now_us):
+        self.flush()
+
+    def flush(self):
+        """Record the frame made by the latest register writes, if it changed"""
+        if self._dirty_at_ms is None or not self.record_frames:
+            self._dirty_at_ms = None
+            return
+        at_ms = self._dirty_at_ms
+        self._dirty_at_ms = None
+        frame = self.frame()
+        state = (frame, tuple(self.intensities()))
+        if state == self._last_frame:
+            return
+        self._last_frame = state
+        entry = (at_ms, frame, state[1])
+        self.frames.append(entry)
+        if self.on_frame is not None:
+            self.on_frame(self, entry)
+
+    def render(self, frame=None, on="##", off=".."):
+        """Text picture of a frame, the current one by default"""
+        frame = self.frame() if frame is None else frame
+        lines = []
+        for y in range(self.rows * 8):
+            row = frame[y * self.cols : (y + 1) * self.cols]
+            lines.append(
+                "".join(on if byte & (0x80 >> bit) else off for byte in row for bit in range(8))
+            )
+        return "\n".join(lines)
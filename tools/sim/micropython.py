@@ -0,0 +1,28 @@
+"""Stand-in for MicroPython's micropython module on the host"""
+
+
+def const(value):
+    return value
+
+
+def native(function):
+    return function
+
+
+viper = native
+
+
+def schedule(function, arg):
+    function(arg)
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def mem_info(verbose=False):
+    print("mem: simulated")
+
+
+def opt_level(level=None):
+    return 0 if level is None else None
@@ -0,0 +1,109 @@
+"""
+Run main.py on the host with fake machine/micropython modules.
+
+Time is virtual, so a full pass of the main loop takes well under a
+second. Frames decoded from the MAX7219 register traffic are drawn in the
+terminal with ANSI codes and/or written to a frame log.
+
+Usage: python tools/sim/run.py [--seconds 120] [--ansi] [--log frames.txt] [--heap]
+
+Other tools can call setup() and then import the device modules, e.g. to
+profile rendering with cProfile or check frames in a regression script.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(SIM_DIR, "..", ".."))
+
+
+def setup(spi_id=0, cs_pin=5, cols=2, rows=1, on_frame=None):
+    """Put the fakes and the device code on sys.path, switch to the
+    virtual clock and wire up a MAX7219 chain. Returns (clock, chain)."""
+    for path in (ROOT, SIM_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    import clock
+    import gc_sim
+    from max7219_sim import Max7219Chain
+
+    gc_sim.install()
+    virtual_clock = clock.install()
+    chain = Max7219Chain(spi_id, cs_pin, cols, rows, on_frame)
+    return virtual_clock, chain
+
+
+def _ansi_frame(chain, entry):
+    at_ms, frame, intensities = entry
+    sys.stdout.write("\x1b[H\x1b[2J")
+    sys.stdout.write(chain.render(frame) + "\n")
+    sys.stdout.write(f"t={at_ms / 1000:8.3f}s  intensity={intensities}\n")
+    sys.stdout.flush()
+
+
+def write_log(chain, log_file):
+    """Write every recorded frame with its time stamp"""
+    for at_ms, frame, intensities in chain.frames:
+        log_file.write(f"t={at_ms}ms intensity={list(intensities)}\n")
+        log_file.write(chain.render(frame) + "\n\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=120, help="virtual seconds to run")
+    parser.add_argument("--ansi", action="store_true", help="draw frames in the terminal")
+    parser.add_argument("--log", help="write a frame log to this file")
+    parser.add_argument("--spi", type=int, default=0, help="SPI bus of the chain")
+    parser.add_argument("--cs", type=int, default=5, help="CS pin of the chain")
+    parser.add_argument(
+        "--heap", action="store_true", help="trace allocations and print heap.report() at the end"
+    )
+    args = parser.parse_args(argv)
+
+    clock, chain = setup(args.spi, args.cs, on_frame=_ansi_frame if args.ansi else None)
+    clock.limit_us = int(args.seconds * 1000000)
+    # The frame log would count towards every high-water mark
+    chain.record_frames = not args.heap or bool(args.log or args.ansi)
+
+    started = time.perf_counter()
+    if args.heap:
+        tracemalloc.start()
+    try:
+        import main as pumpkin
+        import telemetry
+
+        telemetry.enable(args.heap)
+
+        chain.cols = pumpkin.MATRIX_COLS
+        chain.rows = pumpkin.MATRIX_ROWS
+        pumpkin.main()
+    except SystemExit:  # The clock's time limit, see clock.SimulationDone
+        pass
+    wall = time.perf_counter() - started
+    chain.flush()
+    if args.heap:
+        import heap
+
+        # CPython frees most memory by reference count as it goes, which
+        # looks just like a collection inside a frame, so those are left out
+        heap.report(in_frames=False)
+
+    if args.log:
+        with open(args.log, "w", encoding="utf-8") as log_file:
+            write_log(chain, log_file)
+
+    print(
+        f"Simulated {clock.now_us / 1000000:.1f}s in {wall:.2f}s: "
+        + (f"{len(chain.frames)} frames, " if chain.record_frames else "")
+        + f"{chain.transactions} SPI transactions, "
+        + f"{chain.bytes_written} bytes"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# Description: Slide, wipe, dissolve and iris frames between two glyphs, cached for replays
+#
+# Each transition is worked out once with bitboards and kept as one bytes
+# object of steps glyphs, 8 rows each, so playing it again is just slicing.
+# The last frame is always the new glyph itself.
+
+from collections import OrderedDict
+
+import bitboard
+
+TRANSITION_CACHE_BYTES = 1024  # Total size of transition frames kept for reuse
+
+KINDS = ("slide", "wipe", "dissolve", "iris")
+
+
+def _dissolve_order():
+    """The 64 pixels in a fixed scrambled order, so a dissolve looks random
+    but is the same every time"""
+    order = bytearray(range(64))
+    seed = 0x2545
+    for p in range(63, 0, -1):
+        # xorshift16
+        seed ^= (seed << 7) & 0xFFFF
+        seed ^= seed >> 9
+        seed ^= (seed << 8) & 0xFFFF
+        q = seed % (p + 1)
+        order[p], order[q] = order[q], order[p]
+    return bytes(order)
+
+
+_DISSOLVE_ORDER = _dissolve_order()
+
+# Squared distance of each pixel from the centre, in half pixels
+_IRIS_DISTANCE = bytes((2 * x - 7) ** 2 + (2 * y - 7) ** 2 for y in range(8) for x in range(8))
+_IRIS_MAX = max(_IRIS_DISTANCE)
+
+
+def _pixel(p):
+    """Board bit of pixel p, counted along the rows from the top left"""
+    return 1 << (63 - p)
+
+
+def _mask(kind, step, steps):
+    """Pixels showing the new glyph at step out of steps"""
+    if kind == "wipe":
+        return bitboard.rect(0, 0, 8 * step // steps, 8)
+    mask = 0
+    if kind == "dissolve":
+        for p in _DISSOLVE_ORDER[: 64 * step // steps]:
+            mask |= _pixel(p)
+    elif kind == "iris":
+        for p in range(64):
+            if _IRIS_DISTANCE[p] * steps <= _IRIS_MAX * step:
+                mask |= _pixel(p)
+    else:
+        raise ValueError("Unknown transition: " + kind)
+    return mask
+
+
+def render(start, end, kind, steps):
+    """Frames from start to end, as boards, joined into one bytes object"""
+    frames = bytearray(8 * steps)
+    rows = memoryview(frames)
+    for step in range(1, steps + 1):
+        if kind == "slide":
+            # end pushes start off to the left
+            board = bitboard.scroll_pair(start, end, 8 * step // steps)
+        else:
+            board = bitboard.layer(start, end, _mask(kind, step, steps))
+        bitboard.to_rows(board, rows[8 * (step - 1) : 8 * step])
+    return bytes(frames)
+
+
+class TransitionCache:
+    """Rendered transitions in least-recently-used order, bounded in bytes"""
+
+    def __init__(self, max_bytes=TRANSITION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+
+    def get(self, start, end, kind, steps):
+        """Frames for the transition between two boards, rendering them if
+        they are not cached"""
+        key = (start, end, kind, steps)
+        frames = self._frames.pop(key, None)
+        if frames is None:
+            self.misses += 1
+            frames = render(start, end, kind, steps)
+        else:
+            self.hits += 1
+            self.used_bytes -= len(frames)
+        if len(frames) <= self.max_bytes:
+            while self.used_bytes + len(frames) > self.max_bytes:
+                oldest = next(iter(self._frames))
+                self.used_bytes -= len(self._frames.pop(oldest))
+            self._frames[key] = frames
+            self.used_bytes += len(frames)
+        return frames
+
+    def clear(self):
+        self._frames = OrderedDict()
+        self.used_bytes = 0
+
+
+transition_cache = TransitionCache()
+
+
+def frames(start, end, kind="wipe", steps=8, cache=transition_cache):
+    """Yield the glyphs of a transition from glyph start to glyph end"""
+    rendered = memoryview(cache.get(bitboard.pack(start), bitboard.pack(end), kind, steps))
+    for step in range(steps):
+        yield rendered[8 * step : 8 * step + 8]